@@ -1,13 +1,162 @@
 """FastAPI 로 구현한 RESTful 서비스 앱."""
-from typing import Any, Callable
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Callable, Optional
 
 import httpx
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from fastmsa.core import AbstractFastMSA
+from fastmsa.event import (
+    BackgroundDrainer,
+    MessageBus,
+    defer_events,
+    messagebus,
+    request_idempotency_key,
+)
+from fastmsa.instrument import sql_stats
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyKeyMiddleware:
+    """``Idempotency-Key`` 요청 헤더를 :data:`request_idempotency_key` 에 설정합니다.
+
+    요청을 처리하는 동안 메세지 버스가 처음 처리하는 커맨드의 멱등성 키로
+    사용됩니다. (:mod:`fastmsa.idempotency`)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = scope["type"] == "http" and Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if not key:
+            return await self.app(scope, receive, send)
+        token = request_idempotency_key.set(key)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_idempotency_key.reset(token)
+
 
 # globals
 app: FastAPI = FastAPI(title=__name__)  # pylint:
+app.add_middleware(IdempotencyKeyMiddleware)
+
+admin_router = APIRouter(prefix="/_fastmsa", tags=["fastmsa"])
+"""프레임워크 운영용 엔드포인트. :meth:`FastMSA.init_fastapi` 에서 앱에 추가됩니다."""
+
+
+def mount_admin_routes(app: FastAPI) -> None:
+    """:data:`admin_router` 를 앱에 한 번만 추가합니다."""
+    paths = {getattr(r, "path", None) for r in app.routes}
+    if not any(r.path in paths for r in admin_router.routes):
+        app.include_router(admin_router)
+
+
+@admin_router.get("/stats/sql")
+def get_sql_stats(reset: bool = False) -> dict[str, Any]:
+    """SQL 실행 통계와 느린 쿼리 로그를 조회합니다.
+
+    ``reset=true`` 로 요청하면 조회 후 통계를 초기화합니다.
+    """
+    snapshot = sql_stats.snapshot()
+    if reset:
+        sql_stats.reset()
+    return snapshot
+
+
+@admin_router.get("/stats/drainer")
+def get_drainer_stats() -> dict[str, Any]:
+    """백그라운드 이벤트 드레이너의 처리 통계를 조회합니다."""
+    drainer = messagebus.drainer
+    if not drainer:
+        return {}
+    return {
+        **asdict(drainer.stats),
+        "pending": drainer.pending,
+        "workers": drainer.num_workers,
+    }
+
+
+async def deferred_events() -> AsyncIterator[None]:
+    """요청 처리 중 발생한 후속 이벤트를 응답 후 백그라운드에서 처리하게 합니다.
+
+    커맨드 핸들러가 커밋하면 바로 응답을 돌려주고, 이메일 발송이나 읽기 모델
+    갱신 같은 후속 이벤트는 :attr:`MessageBus.drainer` 의 워커 스레드에서
+    처리됩니다. :func:`install_deferred_events` 로 드레이너를 먼저 설치해야
+    합니다. ::
+
+        @app.post("/batches/allocate", dependencies=[Depends(deferred_events)])
+        def post_allocate_batch(req: BatchAllocateSchema):
+            ...
+
+    비동기 의존성이므로 컨텍스트 변수가 동기 엔드포인트를 실행하는 스레드에도
+    전달됩니다.
+    """
+    token = defer_events.set(True)
+    try:
+        yield
+    finally:
+        defer_events.reset(token)
+
+
+def install_deferred_events(
+    app: FastAPI,
+    bus: Optional[MessageBus] = None,
+    workers: int = 2,
+    maxsize: int = 10_000,
+    drain_timeout: float = 30.0,
+) -> BackgroundDrainer:
+    """메세지 버스에 :class:`BackgroundDrainer` 를 설치합니다.
+
+    앱이 종료될 때 큐에 남은 이벤트를 ``drain_timeout`` 초 동안 처리합니다.
+    처리 통계는 ``GET /_fastmsa/stats/drainer`` 로 조회할 수 있습니다.
+
+    Args:
+        workers: 이벤트를 처리할 워커 스레드 수.
+        maxsize: 큐의 최대 크기. 가득 차면 요청 스레드에서 바로 처리합니다.
+    """
+    bus = bus or messagebus
+    if not bus.drainer:
+        bus.drainer = BackgroundDrainer(bus, workers=workers, maxsize=maxsize)
+    drainer = bus.drainer
+
+    @app.on_event("shutdown")
+    def _close_drainer():
+        drainer.close(drain_timeout)
+
+    return drainer
+
+
+@admin_router.get("/stats/scheduler")
+def get_scheduler_stats() -> dict[str, Any]:
+    """예약된 메세지의 처리 통계를 조회합니다."""
+    scheduler = messagebus.scheduler
+    if not scheduler:
+        return {}
+    return {**asdict(scheduler.stats), "pending": scheduler.pending}
+
+
+def install_scheduler(app: FastAPI, bus: Optional[MessageBus] = None) -> None:
+    """앱이 시작할 때 메세지 버스의 스케줄러를 시작하고 종료할 때 멈춥니다.
+
+    저장소를 사용하는 스케줄러는 다른 프로세스나 이전 실행에서 예약된 메세지를
+    처리하기 위해 :meth:`MessageBus.schedule` 호출 전에도 실행되어야 합니다.
+    """
+    bus = bus or messagebus
+
+    @app.on_event("startup")
+    def _start_scheduler():
+        if bus.scheduler:
+            bus.scheduler.start()
+
+    @app.on_event("shutdown")
+    def _close_scheduler():
+        if bus.scheduler:
+            bus.scheduler.close()
 
 
 def init_app(
@@ -0,0 +1,279 @@
+"""FastMSA 프레임워크 자체의 오버헤드를 측정하는 벤치마크 모음(``msa bench``).
+
+벤치마크는 :func:`benchmark` 데코레이터로 등록하는 제너레이터 함수입니다. ``yield``
+전에 준비 작업을 하고, 측정할 연산(동기 함수 또는 코루틴 함수)을 ``yield`` 하면
+러너가 반복 실행하여 연산 1회당 시간을 측정합니다. ``yield`` 이후는 정리 작업입니다.
+
+Example: ::
+
+    @benchmark("bus.dispatch")
+    def bus_dispatch():
+        bus = make_bus()
+        yield lambda: bus.handle(Noop())
+
+결과는 JSON 으로 저장할 수 있고, 저장된 기준 결과(baseline)와 비교하여 성능이
+나빠진 벤치마크를 찾을 수 있습니다.
+
+- :mod:`fastmsa.bench.micro`: 메세지 버스, DI, UoW, 레포지터리 마이크로 벤치마크.
+- :mod:`fastmsa.bench.macro`: 브로커 publish/consume, API 엔드투엔드 벤치마크.
+"""
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Literal, Optional
+
+SUITES = ["fastmsa.bench.micro", "fastmsa.bench.macro"]
+"""``msa bench`` 가 로드하는 벤치마크 모듈 목록."""
+
+BenchGroup = Literal["micro", "macro"]
+
+
+@dataclass
+class Benchmark:
+    """등록된 벤치마크."""
+
+    name: str
+    group: BenchGroup
+    setup: Callable[[], Any]
+    """측정할 연산을 ``yield`` 하는 컨텍스트 매니저 팩토리."""
+    requires: Optional[Callable[[], Optional[str]]] = None
+    """실행할 수 없으면 그 이유를 리턴하는 함수. (예: Redis 서버 없음)"""
+
+    def skip_reason(self) -> Optional[str]:
+        return self.requires() if self.requires else None
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+"""이름별 벤치마크 레지스트리."""
+
+
+def benchmark(
+    name: str,
+    group: BenchGroup = "micro",
+    requires: Optional[Callable[[], Optional[str]]] = None,
+) -> Callable[[Callable[..., Generator]], Callable[..., Generator]]:
+    """벤치마크 등록 데코레이터."""
+
+    def _wrapper(func: Callable[..., Generator]) -> Callable[..., Generator]:
+        BENCHMARKS[name] = Benchmark(name, group, contextmanager(func), requires)
+        return func
+
+    return _wrapper
+
+
+@dataclass
+class BenchResult:
+    """벤치마크 결과. 시간 단위는 초입니다."""
+
+    name: str
+    group: str
+    iterations: int
+    """반복 1회당 연산 실행 횟수."""
+    repeat: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+
+    @property
+    def ops(self) -> float:
+        """초당 연산 수. (중앙값 기준)"""
+        return 1 / self.median if self.median else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "ops": self.ops}
+
+
+def load_suites(suites: Iterable[str] = SUITES) -> dict[str, Benchmark]:
+    """벤치마크 모듈들을 임포트해서 등록된 벤치마크를 리턴합니다."""
+    for suite in suites:
+        importlib.import_module(suite)
+    return BENCHMARKS
+
+
+def select(
+    patterns: Iterable[str] = (), group: Optional[BenchGroup] = None
+) -> list[Benchmark]:
+    """이름 패턴(glob)과 그룹으로 벤치마크를 고릅니다."""
+    patterns = list(patterns) or ["*"]
+    return [
+        b
+        for name, b in BENCHMARKS.items()
+        if (not group or b.group == group)
+        and any(fnmatch.fnmatch(name, p) for p in patterns)
+    ]
+
+
+def _summarize(
+    bench: Benchmark, iterations: int, timings: list[float]
+) -> BenchResult:
+    per_op = [t / iterations for t in timings]
+    return BenchResult(
+        name=bench.name,
+        group=bench.group,
+        iterations=iterations,
+        repeat=len(per_op),
+        min=min(per_op),
+        median=statistics.median(per_op),
+        mean=statistics.fmean(per_op),
+        stdev=statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+    )
+
+
+def _measure(op: Callable[[], Any], min_time: float, repeat: int):
+    """``min_time`` 이상 걸리는 반복 횟수를 정한 뒤 ``repeat`` 번 측정합니다."""
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 2 if elapsed < min_time / 10 else 10
+
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            op()
+        timings.append(time.perf_counter() - started)
+    return iterations, timings
+
+
+async def _measure_async(op: Callable[[], Any], min_time: float, repeat: int):
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 2 if elapsed < min_time / 10 else 10
+
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await op()
+        timings.append(time.perf_counter() - started)
+    return iterations, timings
+
+
+def run_benchmark(bench: Benchmark, min_time=0.2, repeat=5) -> BenchResult:
+    """벤치마크 하나를 실행합니다.
+
+    Args:
+        min_time: 반복 1회에 걸릴 최소 시간(초). 연산 실행 횟수를 여기에 맞춥니다.
+        repeat: 반복 횟수. 결과는 반복별 연산 1회당 시간의 통계입니다.
+    """
+    with bench.setup() as op:
+        if asyncio.iscoroutinefunction(op):
+            iterations, timings = asyncio.run(_measure_async(op, min_time, repeat))
+        else:
+            iterations, timings = _measure(op, min_time, repeat)
+    return _summarize(bench, iterations, timings)
+
+
+def run(
+    benchmarks: Iterable[Benchmark],
+    min_time=0.2,
+    repeat=5,
+    on_result: Optional[Callable[[Benchmark, Optional[BenchResult], str], Any]] = None,
+) -> dict[str, Any]:
+    """벤치마크들을 실행하고 JSON 으로 저장 가능한 결과를 리턴합니다.
+
+    Args:
+        on_result: 벤치마크마다 ``(benchmark, result, skip_reason)`` 으로 호출됩니다.
+    """
+    from fastmsa import __version__
+
+    results: dict[str, Any] = {}
+    skipped: dict[str, str] = {}
+    for bench in benchmarks:
+        reason = bench.skip_reason()
+        result = None
+        if reason:
+            skipped[bench.name] = reason
+        else:
+            result = run_benchmark(bench, min_time, repeat)
+            results[bench.name] = result.to_dict()
+        if on_result:
+            on_result(bench, result, reason or "")
+
+    return {
+        "meta": {
+            "fastmsa": __version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "min_time": min_time,
+            "repeat": repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def save_results(results: dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(results, indent=2), encoding="utf8")
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf8"))
+
+
+@dataclass
+class Comparison:
+    """기준 결과와의 비교."""
+
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    status: Literal["ok", "regression", "improvement", "new", "missing"]
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """현재 / 기준 시간 비율. 1보다 크면 느려진 것입니다."""
+        if self.baseline and self.current:
+            return self.current / self.baseline
+        return None
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold=0.1
+) -> list[Comparison]:
+    """두 결과의 중앙값을 비교합니다.
+
+    Args:
+        threshold: 이 비율 이상 느려지면 ``regression``, 빨라지면 ``improvement``.
+    """
+    cur, base = current["results"], baseline["results"]
+    comparisons = []
+    for name in sorted(cur.keys() | base.keys()):
+        c = cur.get(name, {}).get("median")
+        b = base.get(name, {}).get("median")
+        if b is None:
+            status = "new"
+        elif c is None:
+            status = "missing"
+        elif c > b * (1 + threshold):
+            status = "regression"
+        elif c < b * (1 - threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        comparisons.append(Comparison(name, b, c, status))  # type: ignore
+    return comparisons
@@ -0,0 +1,183 @@
+"""벤치마크용 최소 도메인과 앱.
+
+사용자 앱과 무관하게 프레임워크 오버헤드만 측정할 수 있도록, 재고(:class:`Stock`)
+하나로 이루어진 작은 도메인과 ``POST /batches``, ``POST /batches/allocate``
+엔드포인트를 가진 FastAPI 앱을 제공합니다.
+"""
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, inspect
+from sqlalchemy.orm import mapper, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from fastmsa.core import Aggregate, Command, Event
+from fastmsa.event import MessageBus
+from fastmsa.orm import SessionMaker
+from fastmsa.repo import SqlAlchemyRepository
+from fastmsa.uow import SqlAlchemyUnitOfWork
+
+POSTGRES_ENV = "FASTMSA_BENCH_POSTGRES_URL"
+"""Postgres 벤치마크에 사용할 DB URL 환경변수."""
+
+REDIS_ENV = "FASTMSA_BENCH_REDIS"
+"""브로커 벤치마크에 사용할 Redis ``host:port`` 환경변수. (기본값 localhost:6379)"""
+
+
+class OutOfStock(Exception):
+    ...
+
+
+class Stock(Aggregate):
+    """상품 하나의 재고."""
+
+    version_field = "version_number"
+
+    def __init__(self, sku: str, qty: int = 0, version_number: int = 0):
+        self.sku = sku
+        self.qty = qty
+        self.version_number = version_number
+
+    @property
+    def id(self) -> str:
+        return self.sku
+
+    def add(self, qty: int):
+        self.qty += qty
+        self.version_number += 1
+
+    def reserve(self, orderid: str, qty: int):
+        if qty > self.qty:
+            raise OutOfStock(self.sku)
+        self.qty -= qty
+        self.version_number += 1
+        self.messages.append(Reserved(orderid, self.sku, qty))
+
+
+@dataclass
+class AddStock(Command):
+    sku: str
+    qty: int
+
+
+@dataclass
+class Reserve(Command):
+    orderid: str
+    sku: str
+    qty: int
+
+
+@dataclass
+class Reserved(Event):
+    orderid: str
+    sku: str
+    qty: int
+
+
+def init_mappers(metadata: MetaData) -> MetaData:
+    table = Table(
+        "fastmsa_bench_stock",
+        metadata,
+        Column("sku", String(255), primary_key=True),
+        Column("qty", Integer, nullable=False),
+        Column("version_number", Integer, nullable=False),
+    )
+    if not inspect(Stock, raiseerr=False):
+        mapper(Stock, table)
+    return metadata
+
+
+def make_sessionmaker(url: str = "sqlite://") -> SessionMaker:
+    """벤치마크용 테이블을 새로 만들고 세션 팩토리를 리턴합니다."""
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(url)
+    metadata = init_mappers(MetaData())
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    return sessionmaker(engine)
+
+
+def make_uow(get_session: SessionMaker) -> SqlAlchemyUnitOfWork:
+    return SqlAlchemyUnitOfWork([Stock], get_session)
+
+
+def add_stock(cmd: AddStock, uow: SqlAlchemyUnitOfWork):
+    with uow:
+        stock = uow[Stock].get(cmd.sku)
+        if not stock:
+            stock = Stock(cmd.sku)
+            uow[Stock].add(stock)
+        stock.add(cmd.qty)
+        uow.commit()
+
+
+def reserve(cmd: Reserve, uow: SqlAlchemyUnitOfWork) -> str:
+    with uow:
+        stock = uow[Stock].get(cmd.sku)
+        if not stock:
+            raise OutOfStock(cmd.sku)
+        stock.reserve(cmd.orderid, cmd.qty)
+        uow.commit()
+        return stock.sku
+
+
+def on_reserved(e: Reserved):
+    ...
+
+
+def make_bus(get_session: SessionMaker) -> MessageBus:
+    """벤치마크 도메인의 핸들러가 등록된 메세지 버스를 만듭니다."""
+    bus = MessageBus(defaultdict(list), uow=make_uow(get_session))
+    bus.register(AddStock, add_stock)
+    bus.register(Reserve, reserve)
+    bus.register(Reserved, on_reserved)
+    return bus
+
+
+class BatchAdd(BaseModel):
+    ref: str
+    sku: str
+    qty: int
+    eta: Optional[datetime] = None
+
+
+class BatchAllocate(BaseModel):
+    orderid: str
+    sku: str
+    qty: int
+
+
+def make_api(bus: MessageBus) -> FastAPI:
+    """:class:`fastmsa.api.AsyncAPIClient` 로 호출할 수 있는 API 앱을 만듭니다."""
+    app = FastAPI(title="fastmsa-bench")
+
+    @app.post("/batches", status_code=201)
+    def add_batch(req: BatchAdd):
+        bus.handle(AddStock(req.sku, req.qty))
+
+    @app.post("/batches/allocate", status_code=201)
+    def allocate(req: BatchAllocate):
+        [batchref] = bus.handle(Reserve(req.orderid, req.sku, req.qty))
+        return {"batchref": batchref}
+
+    return app
+
+
+def postgres_url() -> Optional[str]:
+    return os.environ.get(POSTGRES_ENV)
+
+
+def redis_address() -> tuple[str, int]:
+    host, _, port = os.environ.get(REDIS_ENV, "localhost:6379").partition(":")
+    return host, int(port or 6379)
@@ -0,0 +1,80 @@
+"""매크로 벤치마크: 외부 메세지 브로커, API 엔드투엔드."""
+from __future__ import annotations
+
+import itertools
+from typing import Any, Optional
+
+from fastmsa.bench import benchmark
+from fastmsa.bench.app import (
+    AddStock,
+    make_api,
+    make_bus,
+    make_sessionmaker,
+    redis_address,
+)
+
+BENCH_CHANNEL = "fastmsa_bench"
+
+
+def _requires_redis() -> Optional[str]:
+    from fastmsa.test.e2e import check_port_opened
+
+    host, port = redis_address()
+    if check_port_opened(port, host):
+        return None
+    return f"Redis is not running at {host}:{port}"
+
+
+@benchmark("broker.redis.roundtrip", "macro", requires=_requires_redis)
+def broker_redis_roundtrip():
+    """Redis 채널에 메세지를 발행하고 구독한 채널에서 받기까지."""
+    from fastmsa.redis import AsyncRedisClient, RedisConnectInfo
+
+    client = AsyncRedisClient(RedisConnectInfo(*redis_address()))
+    state: dict[str, Any] = {}
+
+    async def op():
+        if "channel" not in state:
+            await client.subscribe_to(BENCH_CHANNEL)
+            state["channel"] = client.channels[0]
+        await client.publish_message(BENCH_CHANNEL, {"sku": "SKU-1", "qty": 1})
+        await state["channel"].get(encoding="utf8")
+
+    yield op
+
+    if client.redis:
+        client.redis.close()
+
+
+def _api_client(bus):
+    from httpx import AsyncClient
+
+    from fastmsa.api import AsyncAPIClient
+
+    return AsyncAPIClient(AsyncClient(app=make_api(bus), base_url="http://bench"))
+
+
+@benchmark("api.add_batch", "macro")
+def api_add_batch():
+    """``POST /batches`` 엔드투엔드. (AsyncAPIClient, SQLite 메모리 DB)"""
+    api = _api_client(make_bus(make_sessionmaker("sqlite://")))
+    counter = itertools.count()
+
+    async def op():
+        await api.post_to_add_batch(f"b{next(counter)}", "SKU-1", 10, eta=None)
+
+    yield op
+
+
+@benchmark("api.allocate", "macro")
+def api_allocate():
+    """``POST /batches/allocate`` 엔드투엔드. (AsyncAPIClient, SQLite 메모리 DB)"""
+    bus = make_bus(make_sessionmaker("sqlite://"))
+    bus.handle(AddStock("SKU-1", 10 ** 9))
+    api = _api_client(bus)
+    counter = itertools.count()
+
+    async def op():
+        await api.post_to_allocate(f"o{next(counter)}", "SKU-1", 1)
+
+    yield op
@@ -0,0 +1,175 @@
+"""마이크로 벤치마크: 메세지 버스, DI, UoW, 레포지터리."""
+from __future__ import annotations
+
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass
+
+from fastmsa.bench import benchmark
+from fastmsa.bench.app import (
+    AddStock,
+    Stock,
+    make_bus,
+    make_sessionmaker,
+    make_uow,
+    postgres_url,
+)
+from fastmsa.core import Command, Event
+from fastmsa.event import MessageBus
+from fastmsa.test.unit import FakeUnitOfWork
+
+
+@dataclass
+class Noop(Command):
+    ...
+
+
+@dataclass
+class NoopEvent(Event):
+    ...
+
+
+def _fake_bus() -> MessageBus:
+    return MessageBus(defaultdict(list), uow=FakeUnitOfWork({Stock: "sku"}))
+
+
+@benchmark("bus.command")
+def bus_command():
+    """커맨드 하나를 핸들러에 전달하는 메세지 버스 오버헤드."""
+    bus = _fake_bus()
+    bus.register(Noop, lambda cmd: None)
+    yield lambda: bus.handle(Noop())
+
+
+@benchmark("bus.event")
+def bus_event():
+    """이벤트 하나를 핸들러에 전달하는 메세지 버스 오버헤드."""
+    bus = _fake_bus()
+    bus.register(NoopEvent, lambda e: None)
+    yield lambda: bus.handle(NoopEvent())
+
+
+@benchmark("di.no_params")
+def di_no_params():
+    """의존성 없는 핸들러 호출."""
+    bus = _fake_bus()
+    uow = bus.uow
+
+    def handler(cmd):
+        ...
+
+    bus.register(Noop, handler)
+    message = Noop()
+    yield lambda: bus.call_handler(message, handler, uow)  # type: ignore
+
+
+@benchmark("di.uow_broker")
+def di_uow_broker():
+    """``uow``, ``broker`` 를 주입받는 핸들러 호출."""
+    bus = _fake_bus()
+    bus.broker = object()  # type: ignore
+    uow = bus.uow
+
+    def handler(cmd, uow, broker):
+        ...
+
+    bus.register(Noop, handler)
+    message = Noop()
+    yield lambda: bus.call_handler(message, handler, uow)  # type: ignore
+
+
+@benchmark("uow.fake")
+def uow_fake():
+    """FakeUnitOfWork 진입/종료."""
+    uow = FakeUnitOfWork({Stock: "sku"})
+
+    def op():
+        with uow:
+            ...
+
+    yield op
+
+
+def _uow_enter_exit(url: str):
+    uow = make_uow(make_sessionmaker(url))
+
+    def op():
+        with uow:
+            ...
+
+    return op
+
+
+def _repo_get(url: str):
+    get_session = make_sessionmaker(url)
+    seed = make_uow(get_session)
+    with seed:
+        seed[Stock].add(Stock("SKU-1", 100))
+        seed.commit()
+
+    uow = make_uow(get_session)
+
+    def op():
+        with uow:
+            uow[Stock].get("SKU-1")
+
+    return op
+
+
+def _repo_add(url: str):
+    uow = make_uow(make_sessionmaker(url))
+    counter = itertools.count()
+
+    def op():
+        with uow:
+            uow[Stock].add(Stock(f"SKU-{next(counter)}", 1))
+            uow.commit()
+
+    return op
+
+
+def _requires_postgres():
+    return None if postgres_url() else "set FASTMSA_BENCH_POSTGRES_URL"
+
+
+@benchmark("uow.sqlite")
+def uow_sqlite():
+    """SqlAlchemyUnitOfWork 진입/종료. (SQLite 메모리 DB)"""
+    yield _uow_enter_exit("sqlite://")
+
+
+@benchmark("repo.sqlite.get")
+def repo_sqlite_get():
+    """UoW 안에서 Aggregate 하나 조회. (SQLite 메모리 DB)"""
+    yield _repo_get("sqlite://")
+
+
+@benchmark("repo.sqlite.add")
+def repo_sqlite_add():
+    """UoW 안에서 Aggregate 하나 추가 후 커밋. (SQLite 메모리 DB)"""
+    yield _repo_add("sqlite://")
+
+
+@benchmark("uow.postgres", requires=_requires_postgres)
+def uow_postgres():
+    """SqlAlchemyUnitOfWork 진입/종료. (Postgres)"""
+    yield _uow_enter_exit(postgres_url() or "")
+
+
+@benchmark("repo.postgres.get", requires=_requires_postgres)
+def repo_postgres_get():
+    """UoW 안에서 Aggregate 하나 조회. (Postgres)"""
+    yield _repo_get(postgres_url() or "")
+
+
+@benchmark("repo.postgres.add", requires=_requires_postgres)
+def repo_postgres_add():
+    """UoW 안에서 Aggregate 하나 추가 후 커밋. (Postgres)"""
+    yield _repo_add(postgres_url() or "")
+
+
+@benchmark("bus.command.sqlite")
+def bus_command_sqlite():
+    """핸들러에서 UoW 로 Aggregate 를 수정하는 커맨드 처리. (SQLite 메모리 DB)"""
+    bus = make_bus(make_sessionmaker("sqlite://"))
+    yield lambda: bus.handle(AddStock("SKU-1", 1))
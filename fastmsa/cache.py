@@ -0,0 +1,295 @@
+"""이벤트로 무효화되는 뷰 함수 캐시.
+
+읽기 모델을 조회하는 뷰 함수의 결과를 인자별로 캐시하고, 데이터를 바꾸는
+이벤트가 메세지 버스에서 처리될 때 관련된 항목만 지웁니다. ::
+
+    @cached_view(
+        invalidate_on={
+            events.Allocated: "orderid",
+            events.Deallocated: "orderid",
+        }
+    )
+    def get_allocations_by(orderid: str, uow: SqlAlchemyUnitOfWork):
+        ...
+
+무효화 규칙은 이벤트 타입별로 다음 중 하나를 지정합니다.
+
+- ``None``: 뷰의 모든 항목을 지웁니다.
+- 필드 이름 또는 이름 목록: 이벤트 필드와 같은 이름의 뷰 인자가 같은 항목을
+  지웁니다.
+- ``{"뷰 인자": "이벤트 필드"}``: 이름이 다른 경우.
+- 이벤트를 받아 ``{"뷰 인자": 값}`` 을 리턴하는 함수. ``None`` 을 리턴하면 모든
+  항목을 지웁니다.
+
+``uow``, ``msa``, ``broker``, ``pubsub`` 인자는 주입되는 의존성이므로 캐시 키에서
+제외됩니다. 캐시된 결과는 여러 호출에서 공유되므로 수정하지 않아야 합니다.
+
+기본 저장소는 뷰마다 프로세스 메모리의 :class:`LRUCache` 입니다. 여러 프로세스가
+같은 캐시를 공유하려면 :class:`RedisCache` 를 사용합니다. 이 경우 이벤트를
+처리한 프로세스가 지운 항목은 모든 프로세스에서 지워집니다.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from inspect import signature
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from fastmsa.core import Event, FastMSAError
+
+if TYPE_CHECKING:
+    from fastmsa.event import MessageBus
+
+F = TypeVar("F", bound=Callable[..., Any])
+Key = tuple[Any, ...]
+Match = Optional[dict[int, Any]]
+"""무효화할 항목의 조건. ``{인자 위치: 값}``, ``None`` 이면 모든 항목."""
+Rule = Union[
+    None, str, Sequence[str], Mapping[str, str], Callable[[Any], Optional[dict]]
+]
+
+DEPENDENCY_PARAMS = frozenset(["uow", "msa", "broker", "pubsub"])
+"""메세지 버스가 주입하는 의존성 인자 이름. 캐시 키에서 제외됩니다."""
+
+MISS = object()
+
+
+class CacheBackend(Protocol):
+    """뷰 캐시 저장소."""
+
+    def get(self, view: str, key: Key) -> Any:
+        """캐시된 값. 없으면 :data:`MISS`."""
+        ...
+
+    def set(self, view: str, key: Key, value: Any, ttl: Optional[float]) -> None:
+        ...
+
+    def delete(self, view: str, key: Key) -> int:
+        ...
+
+    def invalidate(self, view: str, match: Match) -> int:
+        """조건에 맞는 항목을 지우고 지운 개수를 리턴합니다."""
+        ...
+
+
+class LRUCache:
+    """프로세스 메모리의 LRU 캐시."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple[str, Key], tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, view: str, key: Key) -> Any:
+        with self._lock:
+            item = self._data.get((view, key))
+            if item is None:
+                return MISS
+            value, expires = item
+            if expires and expires < time.monotonic():
+                del self._data[(view, key)]
+                return MISS
+            self._data.move_to_end((view, key))
+            return value
+
+    def set(self, view: str, key: Key, value: Any, ttl: Optional[float]) -> None:
+        expires = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            self._data[(view, key)] = (value, expires)
+            self._data.move_to_end((view, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, view: str, key: Key) -> int:
+        with self._lock:
+            return 1 if self._data.pop((view, key), None) else 0
+
+    def invalidate(self, view: str, match: Match) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k[0] == view and _matches(k[1], match)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+
+class RedisCache:
+    """Redis 캐시. 값은 pickle 로 저장됩니다.
+
+    ``client`` 는 ``get``, ``set(ex=)``, ``delete``, ``scan_iter`` 를 제공하는
+    동기식 Redis 클라이언트입니다. (예: ``redis.Redis``)
+    """
+
+    def __init__(self, client: Any, prefix: str = "fastmsa:view:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, view: str, key: Key) -> str:
+        return self.prefix + view + ":" + json.dumps(key, default=repr)
+
+    def get(self, view: str, key: Key) -> Any:
+        data = self.client.get(self._key(view, key))
+        return MISS if data is None else pickle.loads(data)
+
+    def set(self, view: str, key: Key, value: Any, ttl: Optional[float]) -> None:
+        ex = max(1, int(ttl)) if ttl else None
+        self.client.set(self._key(view, key), pickle.dumps(value), ex=ex)
+
+    def delete(self, view: str, key: Key) -> int:
+        return self.client.delete(self._key(view, key))
+
+    def invalidate(self, view: str, match: Match) -> int:
+        prefix = self.prefix + view + ":"
+        if match is not None:
+            # 키와 같은 형식으로 비교하기 위해 JSON 으로 변환합니다.
+            match = {
+                i: json.loads(json.dumps(v, default=repr)) for i, v in match.items()
+            }
+        keys = []
+        for k in self.client.scan_iter(match=_glob_escape(prefix) + "*"):
+            key = k.decode() if isinstance(k, bytes) else k
+            if _matches(tuple(json.loads(key[len(prefix) :])), match):
+                keys.append(k)
+        return self.client.delete(*keys) if keys else 0
+
+
+def _matches(key: Key, match: Match) -> bool:
+    if match is None:
+        return True
+    return all(i < len(key) and key[i] == v for i, v in match.items())
+
+
+def _glob_escape(s: str) -> str:
+    return "".join("\\" + c if c in "*?[]\\" else c for c in s)
+
+
+@dataclass
+class CacheInfo:
+    """뷰 캐시 통계."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    """무효화 규칙이 실행된 횟수."""
+
+
+def _compile_rule(
+    rule: Rule, params: Sequence[str]
+) -> Callable[[Any], Optional[dict[str, Any]]]:
+    if rule is None:
+        return lambda e: None
+    if callable(rule):
+        return rule  # type: ignore
+    if isinstance(rule, str):
+        mapping = {rule: rule}
+    elif isinstance(rule, Mapping):
+        mapping = dict(rule)
+    else:
+        mapping = {name: name for name in rule}
+    unknown = set(mapping) - set(params)
+    if unknown:
+        raise FastMSAError(f"invalidation rule refers to unknown params: {unknown}")
+    return lambda e: {param: getattr(e, field) for param, field in mapping.items()}
+
+
+def cached_view(
+    invalidate_on: Mapping[Type[Event], Rule],
+    maxsize: int = 1024,
+    ttl: Optional[float] = None,
+    backend: Optional[CacheBackend] = None,
+    bus: Optional[MessageBus] = None,
+) -> Callable[[F], F]:
+    """뷰 함수의 결과를 인자별로 캐시하는 데코레이터.
+
+    Args:
+        invalidate_on: 이벤트 타입별 무효화 규칙. (모듈 설명 참고)
+        maxsize: 기본 :class:`LRUCache` 의 최대 항목 수.
+        ttl: 지정하면 항목이 이 시간(초)이 지나면 만료됩니다.
+        backend: 캐시 저장소. 지정하지 않으면 뷰마다 :class:`LRUCache` 를 만듭니다.
+        bus: 무효화 핸들러를 등록할 메세지 버스. 기본값은 전역 메세지 버스입니다.
+    """
+
+    def _wrapper(func: F) -> F:
+        from fastmsa.event import messagebus
+
+        view = f"{func.__module__}.{func.__qualname__}"
+        sig = signature(func)
+        params = [p for p in sig.parameters if p not in DEPENDENCY_PARAMS]
+        cache: CacheBackend = backend or LRUCache(maxsize)
+        info = CacheInfo()
+        rules = {
+            etype: _compile_rule(rule, params) for etype, rule in invalidate_on.items()
+        }
+        # 무효화할 때마다 증가합니다. 계산 중에 무효화된 결과는 캐시하지 않습니다.
+        generation = 0
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments[p] for p in params)
+            value = cache.get(view, key)
+            if value is not MISS:
+                info.hits += 1
+                return value
+            info.misses += 1
+            started = generation
+            value = func(*args, **kwargs)
+            if generation == started:
+                cache.set(view, key, value, ttl)
+                if generation != started:
+                    # 확인과 저장 사이에 무효화된 경우 저장한 항목을 직접 지웁니다.
+                    cache.delete(view, key)
+            return value
+
+        def bump():
+            nonlocal generation
+            with lock:
+                generation += 1
+
+        def invalidate(event: Event) -> int:
+            """이벤트에 해당하는 항목을 지웁니다."""
+            info.invalidations += 1
+            bump()
+            values = rules[type(event)](event)
+            if values is None:
+                return cache.invalidate(view, None)
+            match = {params.index(k): v for k, v in values.items()}
+            if len(match) == len(params):
+                return cache.delete(view, tuple(match[i] for i in range(len(params))))
+            return cache.invalidate(view, match)
+
+        wrapper.cache = cache  # type: ignore
+        wrapper.cache_info = lambda: info  # type: ignore
+        def cache_clear() -> int:
+            bump()
+            return cache.invalidate(view, None)
+
+        wrapper.cache_clear = cache_clear  # type: ignore
+        wrapper.invalidate = invalidate  # type: ignore
+
+        for etype in rules:
+            (bus or messagebus).register(etype, invalidate)
+
+        return wrapper  # type: ignore
+
+    return _wrapper
@@ -1,26 +1,37 @@
-"""Command line script for FastMSA."""
-import glob
+"""Command line script for FastMSA.
+
+무거운 의존성(uvicorn, jinja2, SqlAlchemy 등)은 실제로 필요한 명령어에서만
+임포트합니다.
+"""
+from __future__ import annotations
+
 import importlib
+import json
 import os
 import sys
 from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
-from inspect import getmembers
 from pathlib import Path
 from textwrap import dedent
-from typing import Any, Optional, Sequence, cast
-
-import jinja2
-import uvicorn
-from pkg_resources import resource_string
-from sqlalchemy.sql.schema import MetaData
-from starlette.routing import BaseRoute
+from typing import TYPE_CHECKING, Any, Optional, Sequence, cast
 
 from fastmsa.config import FastMSA
-from fastmsa.core import AbstractFastMSA, FastMSAError, FastMSAInitError
-from fastmsa.event import MessageHandlerMap
+from fastmsa.core import (
+    AbstractFastMSA,
+    FastMSAError,
+    FastMSAInitError,
+    MessageHandlerMap,
+)
 from fastmsa.logging import get_logger
+from fastmsa.manifest import AppManifest, load_manifest
+from fastmsa.server import PROD_ENV, install_prod_hooks, is_prod
 from fastmsa.utils import Fore, Style, bold, cwd, fg, scan_resource_dir
 
+if TYPE_CHECKING:
+    from sqlalchemy.sql.schema import MetaData
+    from starlette.routing import BaseRoute
+
+    from fastmsa.profiling import ProfileReport
+
 YELLOW, CYAN, RED, GREEN, WHITE = (
     Fore.YELLOW,
     Fore.CYAN,
@@ -49,6 +60,7 @@ class FastMSACommand:
         """
         self.path = Path(os.path.abspath("."))
         self.msa = cast(FastMSA, FastMSA.load_from_config(self.path))
+        self._manifest: Optional[AppManifest] = None
 
         if self.msa.is_implicit_name:
             # 앞에서 어떤 경우에도 이름을 못얻으면 현재 경로를 암시적으로
@@ -77,6 +89,9 @@ class FastMSACommand:
             else:
                 raise FastMSAInitError(f"project already initialized at: {self.path}")
 
+        import jinja2
+        from pkg_resources import resource_string
+
         with cwd(self.path):
             res_names = scan_resource_dir(TEMPLATE_DIR)
 
@@ -108,6 +123,8 @@ class FastMSACommand:
 
     def init_app(self, init_routes=True):
         """FastMSA 앱을 초기화 합니다."""
+        from fastmsa.event import messagebus
+
         logger.info(bold("Load config and initialize app..."))
         bullet = bold("✓" if os.name != "nt" else "v", GREEN)
 
@@ -129,12 +146,44 @@ class FastMSACommand:
 
             self.msa.init_fastapi()
 
+            if is_prod():
+                install_prod_hooks(self.msa.api, self.msa)
+
         msg_handlers = self.load_msg_handlers()
         logger.info(
             f"{bullet} init {fg('event handlers', CYAN)}.. %s handlers mounted.",
             bold(f"{len(msg_handlers)}", YELLOW),
         )
 
+        journal_dir = self.msa.get_journal_dir()
+        if journal_dir:
+            self.open_journal(journal_dir)
+            logger.info(
+                f"{bullet} init {fg('message journal', CYAN)}. %s",
+                bold(f"{journal_dir}", YELLOW),
+            )
+
+        messagebus.idempotency = self.msa.get_idempotency_store()
+        if messagebus.idempotency:
+            logger.info(
+                f"{bullet} init {fg('idempotency', CYAN)}..... %s",
+                bold(type(messagebus.idempotency).__name__, YELLOW),
+            )
+
+        schedule_store = self.msa.get_schedule_store()
+        if schedule_store:
+            from fastmsa.scheduler import MessageScheduler
+
+            messagebus.scheduler = MessageScheduler(messagebus, schedule_store)
+            if init_routes:
+                from fastmsa.api import install_scheduler
+
+                install_scheduler(self.msa.api)
+            logger.info(
+                f"{bullet} init {fg('scheduler', CYAN)}....... %s",
+                bold(type(schedule_store).__name__, YELLOW),
+            )
+
         logger.info(
             f"{bullet} init {fg('database', CYAN)}........ %s",
             bold(f"{self.msa.get_db_url()}", YELLOW),
@@ -167,9 +216,20 @@ class FastMSACommand:
         dry_run=False,
         reload=True,
         banner=True,
+        prod=False,
+        workers: Optional[int] = None,
+        uds: Optional[str] = None,
+        loop="auto",
+        http="auto",
+        keep_alive=5,
         **kwargs,
-    ):
-        """FastMSA 애플리케이션을 실행합니다."""
+    ) -> dict[str, Any]:
+        """FastMSA 애플리케이션을 실행합니다.
+
+        `--prod` 로 실행하면 자동 리로드 없이 `--workers` 개의 워커 프로세스를
+        띄웁니다. 각 워커는 시작시 DB 커넥션 풀과 핸들러를 미리 준비하고,
+        SIGTERM 을 받으면 처리 중인 메세지를 마친 뒤 종료합니다.
+        """
         if banner:
             msg = "".join(
                 [
@@ -182,7 +242,24 @@ class FastMSACommand:
         if not app_name:
             app_name = f"{self.msa.module_name}.__main__:app"
 
+        options: dict[str, Any] = dict(
+            host=self.msa.get_api_host(),
+            port=self.msa.get_api_port(),
+            reload=reload and not prod,
+            loop=loop,
+            http=http,
+            timeout_keep_alive=keep_alive,
+            uds=uds,
+        )
+        if prod:
+            # 워커 프로세스가 `init_app()` 에서 프로덕션 훅을 설치하도록 알립니다.
+            os.environ[PROD_ENV] = "1"
+            options.update(workers=workers or os.cpu_count() or 1, access_log=False)
+        options.update(kwargs)
+
         if not dry_run:
+            import uvicorn
+
             sys.path.insert(0, str(self.path))
             if os.name == "nt":
                 content = (uvicorn_init := Path(uvicorn.__file__)).read_text()
@@ -190,56 +267,261 @@ class FastMSACommand:
                     uvicorn_init.write_text(
                         content + "\nfrom colorama import init; init()"
                     )
-            uvicorn.run(app_name, reload=reload, port=self.msa.get_api_port())
+            uvicorn.run(app_name, **options)
 
-    def load_domain(self) -> list[type]:
-        """도메인 클래스를 로드합니다.
+        return options
+
+    def worker(self, concurrency=4, processes=1, report_interval=10.0):
+        """외부 메세지 브로커 컨슈머를 API 와 별도의 워커로 실행합니다.
 
-        ./<package_dir>/domain/**/*.py 파일을 읽어서 클래스 타입 리스트를 리턴합니다.
+        라우트와 FastAPI 없이 도메인, ORM, 핸들러만 초기화하고 브로커 채널을
+        구독합니다. `--processes` 개의 프로세스가 각각 `--concurrency` 개의
+        메세지를 동시에 처리하며, 주기적으로 처리량을 출력합니다.
         """
-        domains = list[type]()
+        from fastmsa.worker import run_workers
 
-        for fname in glob.glob("./" + str(self.msa.module_path) + "/domain/*.py"):
-            if Path(fname).name.startswith("_"):
-                continue
-            module_name = fname[2:-3].replace("/", ".").replace("\\", ".")
-            module = importlib.import_module(module_name)
+        run_workers(self.path, processes, concurrency, report_interval)
 
-            members = getmembers(module)
-            for name, member in members:
-                if name.startswith("_"):
-                    continue
-                if type(member) != type:
-                    continue
-                if member.__module__ != module_name:
-                    continue
-                domains.append(member)
+    def bench(
+        self,
+        patterns: Sequence[str] = (),
+        group: Optional[str] = None,
+        output: Optional[Path] = None,
+        baseline: Optional[Path] = None,
+        threshold=0.1,
+        min_time=0.2,
+        repeat=5,
+    ) -> list[Any]:
+        """프레임워크 오버헤드 벤치마크를 실행합니다.
+
+        메세지 버스, DI, UoW, 레포지터리 마이크로 벤치마크와 브로커, API 엔드투엔드
+        매크로 벤치마크를 실행합니다. `--output` 으로 결과를 JSON 으로 저장하고,
+        `--compare` 로 저장된 기준 결과와 비교해서 느려진 벤치마크를 표시합니다.
+
+        Returns:
+            기준 결과보다 느려진 벤치마크의 :class:`~fastmsa.bench.Comparison` 목록.
+        """
+        from fastmsa import bench
+
+        bench.load_suites()
+
+        def on_result(b, result, reason):
+            if result:
+                print(
+                    f"{b.name:<28} {result.median * 1e6:12.1f} us/op",
+                    f"{result.ops:12.0f} ops/s",
+                    fg(f"± {result.stdev / result.median:.1%}", WHITE_EX),
+                )
+            else:
+                print(f"{b.name:<28} {fg('skipped: ' + reason, YELLOW)}")
+
+        results = bench.run(
+            bench.select(patterns, group),  # type: ignore
+            min_time,
+            repeat,
+            on_result,
+        )
+        if output:
+            bench.save_results(results, output)
+            print(f"results saved to {bold(output, WHITE)}")
+
+        if not baseline:
+            return []
+
+        colors = {"regression": RED, "improvement": GREEN, "ok": WHITE_EX}
+        comparisons = bench.compare(results, bench.load_results(baseline), threshold)
+        print(f"\n{bold('Compare with')} {baseline} (threshold {threshold:.0%})")
+        for c in comparisons:
+            ratio = f"{c.ratio:6.2f}x" if c.ratio else " " * 7
+            print(f"{c.name:<28} {ratio} {fg(c.status, colors.get(c.status, CYAN))}")
+        return [c for c in comparisons if c.status == "regression"]
+
+    def profile(
+        self,
+        message: Optional[str] = None,
+        data: Optional[dict[str, Any]] = None,
+        file: Optional[Path] = None,
+        route: Optional[str] = None,
+        runs=100,
+        db="clone",
+        setup: Optional[Path] = None,
+        output: Optional[Path] = None,
+        trace_alloc=True,
+    ) -> ProfileReport:
+        """핸들러나 API 라우트를 반복 실행하며 프로파일링합니다.
+
+        메세지(`message` 와 `--data`, 또는 `--file` 로 기록된 메세지들)를
+        `messagebus.handle` 로, 또는 `--route "POST /path"` 요청을 `--runs` 번
+        실행하고 cProfile 통계, collapsed stack, 메모리 할당, SQL 통계를 출력합니다.
+
+        `--db` 로 실행할 DB 를 고릅니다.
+          clone      : 설정된 DB 를 메모리 SQLite 로 복사해서 사용 (기본값)
+          empty      : 빈 메모리 SQLite 스키마를 사용
+          configured : 설정된 DB 를 그대로 사용
+        """
+        from sqlalchemy.orm import sessionmaker
+
+        from fastmsa import serialize
+        from fastmsa.event import messagebus
+        from fastmsa.orm import init_engine, set_default_sessionmaker
+        from fastmsa.profiling import clone_database, profile
+
+        # UoW 가 만들어지기 전에 사용할 DB 를 정해야 하므로 `init_app()` 과 같은
+        # 순서로 직접 초기화합니다.
+        domains = self.load_domain()
+        metadata = self.load_orm_mappers()
+        if db == "configured":
+            engine = init_engine(
+                metadata,
+                self.msa.get_db_url(),
+                connect_args=self.msa.get_db_connect_args(),
+            )
+        else:
+            engine = clone_database(
+                self.msa.get_db_url(), metadata, copy_data=db == "clone"
+            )
+        set_default_sessionmaker(sessionmaker(engine))
+        if route:
+            self.load_routes()
+            self.msa.init_fastapi()
+        self.load_msg_handlers()
+
+        if setup:
+            for msg in serialize.load_messages(setup.read_text(), domains):
+                messagebus.handle(msg)
+
+        errors = 0
+        if route:
+            from fastapi.testclient import TestClient
+
+            method, _, path = route.partition(" ")
+            client = TestClient(self.msa.api, raise_server_exceptions=False)
+
+            def op():
+                nonlocal errors
+                if client.request(method, path.strip(), json=data).is_error:
+                    errors += 1
+
+        else:
+            if file:
+                messages = serialize.load_messages(file.read_text(), domains)
+            elif message:
+                cls = serialize.resolve_type(message, domains)
+                messages = [serialize.build(cls, data or {})]
+            else:
+                raise FastMSAError("message type, --file or --route is required")
+
+            def op():
+                nonlocal errors
+                for msg in messages:
+                    try:
+                        messagebus.handle(msg)
+                    except Exception:  # pylint: disable=broad-except
+                        errors += 1
+
+        report = profile(op, runs, trace_alloc=trace_alloc)
+
+        print(
+            f"{bold('Profiled', CYAN)} {runs} runs:",
+            f"{report.per_run * 1000:.3f} ms/run,",
+            fg(f"{errors} errors", RED if errors else WHITE_EX),
+        )
+        print(report.stats_text(limit=15))
+        if trace_alloc:
+            print(bold("Top allocations", CYAN))
+            print(report.allocations_text(limit=5))
+        print(bold("SQL statements (by total time)", CYAN))
+        for statement, st in report.sql_breakdown(limit=5):
+            print(
+                f"  {st['count']:6d}x {st['total'] * 1000:9.2f} ms",
+                f"{st['avg'] * 1e6:9.1f} us/op  {statement[:80]}",
+            )
+        if output:
+            for path in report.save(output):
+                print(f"saved {bold(path, WHITE)}")
+        return report
+
+    def open_journal(self, journal_dir: Path):
+        """메세지 버스에 저널을 연결합니다. 프로세스가 끝날 때 저널을 닫습니다."""
+        import atexit
+
+        from fastmsa.event import messagebus
+        from fastmsa.journal import JournalWriter
+
+        messagebus.journal = JournalWriter(journal_dir)
+        atexit.register(messagebus.journal.close)
+
+    def replay(self, path: Path, speed: Optional[float] = None, limit=None):
+        """기록된 메세지 저널을 메세지 버스로 다시 실행합니다.
+
+        `--speed` 를 지정하지 않으면 최대한 빠르게, 지정하면 기록된 시간 간격을
+        `--speed` 배 빠르게 재현합니다. (1.0 은 기록된 속도 그대로)
+        운영 환경의 부하를 로컬에서 재현할 때 사용합니다.
+        """
+        from fastmsa.event import messagebus
+        from fastmsa.journal import JournalReader, replay
+
+        self.init_app(init_routes=False)
+        reader = JournalReader(path, self.load_domain())
+        stats = replay(reader, messagebus.handle, speed=speed, limit=limit)
+        messagebus.drain()
+        print(
+            f"{bold('Replayed', CYAN)} {stats.messages} messages",
+            f"in {stats.elapsed:.3f}s ({stats.rate:.0f} msg/s),",
+            fg(f"{stats.errors} errors", RED if stats.errors else WHITE_EX),
+        )
+        return stats
+
+    def db_sync(self, force=True):
+        """DB 스키마를 현재 ORM 매핑과 동기화합니다.
+
+        앱 시작시에는 스키마 지문이 바뀐 경우에만 테이블을 생성하므로, 배포 단계에서
+        이 명령어로 스키마를 미리 생성해두면 워커들이 빠르게 시작할 수 있습니다.
+        """
+        from sqlalchemy import create_engine
+
+        from fastmsa.orm import schema_fingerprint, sync_schema
+
+        self.load_domain()
+        metadata = self.load_orm_mappers()
+        engine = create_engine(
+            self.msa.get_db_url(), connect_args=self.msa.get_db_connect_args()
+        )
+        created = sync_schema(engine, metadata, force=force)
+        status = bold("synced", GREEN) if created else bold("up to date", CYAN)
+        print(
+            f"{bold('Schema', WHITE)} {status}:",
+            f"{len(metadata.tables)} tables,",
+            f"fingerprint {fg(schema_fingerprint(metadata, engine)[:12], YELLOW)}",
+        )
+        engine.dispose()
+
+    @property
+    def manifest(self) -> AppManifest:
+        """앱 구성 모듈 매니페스트.
+
+        소스 파일의 수정 시각이 바뀌었을 때만 디렉토리를 다시 검색합니다.
+        """
+        if not self._manifest:
+            self._manifest = load_manifest(self.msa.module_name, self.msa.module_path)
+        return self._manifest
 
-        return domains
+    def load_domain(self) -> list[type]:
+        """도메인 클래스를 로드합니다.
+
+        매니페스트에 기록된 ./<package_dir>/domain/*.py 의 클래스 타입 리스트를
+        리턴합니다.
+        """
+        return self.manifest.load_domains()
 
     def load_orm_mappers(self) -> MetaData:
+        from sqlalchemy.sql.schema import MetaData
+
         fastmsa_orm = importlib.import_module("fastmsa.orm")
         metadata = MetaData()
         setattr(fastmsa_orm, "metadata", metadata)
 
-        mapper_file_path = self.msa.module_path / "adapters" / "orm.py"
-        mapper_paths = list[Path]()
-
-        if mapper_file_path.exists():
-            mapper_paths = [mapper_file_path]
-        else:
-            mapper_paths = [
-                Path(p) for p in glob.glob(f"{self.msa.module_path}/adapters/orm/*.py")
-            ]
-
-        mapper_paths = [p.relative_to(self.msa.module_path) for p in mapper_paths]
-
-        for path in mapper_paths:
-            if path.name.startswith("_"):
-                continue
-            mapper_modname = ".".join(
-                [self.msa.module_name or self.msa.name] + list(path.parts)
-            )[:-3]
+        for mapper_modname in self.manifest.mappers:
             module = importlib.import_module(mapper_modname)
             # 모듈에 `init_mappers()` 함수가 있다면 호출합니다.
             init_mappers = getattr(module, "init_mappers", None)
@@ -251,16 +533,9 @@ class FastMSACommand:
     def load_routes(self) -> list[BaseRoute]:
         from fastmsa.api import app
 
-        modules = []
-
-        for fname in glob.glob(f"./{self.msa.module_path}/routes/*.py"):
-            if Path(fname).name.startswith("_"):
-                continue
-            module_name = fname[2:-3].replace("/", ".").replace("\\", ".")
-            if sys.modules.get(module_name):
-                continue
-            module = importlib.import_module(module_name)
-            modules.append(module)
+        for module_name in self.manifest.routes:
+            if not sys.modules.get(module_name):
+                importlib.import_module(module_name)
 
         routes: list[Any] = app.routes
         return [
@@ -274,19 +549,12 @@ class FastMSACommand:
     ) -> MessageHandlerMap:
         from fastmsa.event import MESSAGE_HANDLERS, messagebus
 
-        modules = []
+        for module_name in self.manifest.handlers:
+            if not sys.modules.get(module_name):
+                importlib.import_module(module_name)
 
-        for fname in glob.glob(f"./{self.msa.module_path}/handlers/*.py"):
-            if Path(fname).name.startswith("_"):
-                continue
-            module_name = fname[2:-3].replace("/", ".").replace("\\", ".")
-            if sys.modules.get(module_name):
-                continue
-            module = importlib.import_module(module_name)
-            modules.append(module)
-
-        messagebus.msa = msa or self.msa  # Dependency Injection
-        messagebus.uow = (msa and msa.uow) or self.msa.uow
+        # Dependency Injection. 메세지마다 `msa.uow` 로 새 UoW 를 만듭니다.
+        messagebus.msa = msa or self.msa
 
         return MESSAGE_HANDLERS
 
@@ -311,6 +579,10 @@ class FastMSACommandParser:
             self._cmd.info,
             self._cmd.init,
             self._cmd.run,
+            self._cmd.worker,
+            self._cmd.bench,
+            self._cmd.profile,
+            self._cmd.replay,
         ]:
             command = handler.__name__
             # 핸들러 함수의 주석을 커맨드라인 도움말로 변환하기 위한 작업입니다.
@@ -335,6 +607,95 @@ class FastMSACommandParser:
                 )
             if command == "run":
                 parser.add_argument("app_name", metavar="app_name", nargs="?")
+                parser.add_argument(
+                    "--prod", action="store_true", help="프로덕션 모드 (리로드 없음)"
+                )
+                parser.add_argument(
+                    "--workers", type=int, help="워커 프로세스 수 (기본값: CPU 수)"
+                )
+                parser.add_argument("--uds", help="TCP 대신 바인드할 UNIX 소켓 경로")
+                parser.add_argument(
+                    "--loop", default="auto", choices=["auto", "asyncio", "uvloop"]
+                )
+                parser.add_argument(
+                    "--http", default="auto", choices=["auto", "h11", "httptools"]
+                )
+                parser.add_argument(
+                    "--keep-alive",
+                    type=int,
+                    default=5,
+                    help="HTTP keep-alive 타임아웃(초)",
+                )
+            if command == "bench":
+                parser.add_argument(
+                    "patterns", nargs="*", help="실행할 벤치마크 이름 패턴 (glob)"
+                )
+                parser.add_argument("--group", choices=["micro", "macro"])
+                parser.add_argument("-o", "--output", type=Path, help="결과 JSON 파일")
+                parser.add_argument(
+                    "--compare", type=Path, help="비교할 기준 결과 JSON 파일"
+                )
+                parser.add_argument(
+                    "--threshold",
+                    type=float,
+                    default=0.1,
+                    help="이 비율 이상 느려지면 성능 저하로 판단 (기본값: 0.1)",
+                )
+                parser.add_argument("--min-time", type=float, default=0.2)
+                parser.add_argument("--repeat", type=int, default=5)
+            if command == "profile":
+                parser.add_argument(
+                    "message", nargs="?", help="메세지 타입 (클래스 이름 또는 경로)"
+                )
+                parser.add_argument(
+                    "--data", type=json.loads, help="메세지 필드나 요청 본문 JSON"
+                )
+                parser.add_argument("--file", type=Path, help="기록된 메세지 파일")
+                parser.add_argument("--route", help='API 라우트. 예: "POST /batches"')
+                parser.add_argument("-n", "--runs", type=int, default=100)
+                parser.add_argument(
+                    "--db", default="clone", choices=["clone", "empty", "configured"]
+                )
+                parser.add_argument(
+                    "--setup", type=Path, help="프로파일링 전에 한 번 처리할 메세지 파일"
+                )
+                parser.add_argument("-o", "--output", type=Path, help="결과 저장 경로")
+                parser.add_argument(
+                    "--no-alloc", action="store_true", help="메모리 할당 추적 끄기"
+                )
+            if command == "replay":
+                parser.add_argument("path", type=Path, help="저널 디렉토리 또는 파일")
+                parser.add_argument(
+                    "--speed", type=float, help="기록된 속도 대비 배속 (기본값: 최대)"
+                )
+                parser.add_argument("--limit", type=int, help="재생할 최대 메세지 수")
+            if command == "worker":
+                parser.add_argument(
+                    "--concurrency", type=int, default=4, help="프로세스당 동시 처리 수"
+                )
+                parser.add_argument(
+                    "--processes", type=int, default=1, help="워커 프로세스 수"
+                )
+                parser.add_argument(
+                    "--report-interval",
+                    type=float,
+                    default=10.0,
+                    help="처리량 출력 주기(초), 0 이면 출력하지 않음",
+                )
+
+        db_parser = self._subparsers.add_parser(
+            "db", description="DB 스키마 관리 명령어"
+        )
+        db_subparsers = db_parser.add_subparsers(dest="db_command")
+        sync_parser = db_subparsers.add_parser(
+            "sync",
+            description=dedent(self._cmd.db_sync.__doc__ or ""),
+            formatter_class=RawTextHelpFormatter,
+        )
+        sync_parser.add_argument(
+            "--check", action="store_true", help="스키마 지문이 같으면 생성을 건너뜀"
+        )
+        self._db_parser = db_parser
 
     def parse_args(self, args: Sequence[str]):
         """콘솔 명령어를 해석해서 적절한 작업을 수행합니다."""
@@ -363,7 +724,62 @@ class FastMSACommandParser:
 
     def run(self, ns: Namespace):
         """`run` 명령어 처리."""
-        self._cmd.run(app_name=ns.app_name)
+        self._cmd.run(
+            app_name=ns.app_name,
+            prod=ns.prod,
+            workers=ns.workers,
+            uds=ns.uds,
+            loop=ns.loop,
+            http=ns.http,
+            keep_alive=ns.keep_alive,
+        )
+
+    def worker(self, ns: Namespace):
+        """`worker` 명령어 처리."""
+        self._cmd.worker(
+            concurrency=ns.concurrency,
+            processes=ns.processes,
+            report_interval=ns.report_interval,
+        )
+
+    def bench(self, ns: Namespace):
+        """`bench` 명령어 처리. 성능 저하가 있으면 종료 코드 1 로 끝납니다."""
+        regressions = self._cmd.bench(
+            patterns=ns.patterns,
+            group=ns.group,
+            output=ns.output,
+            baseline=ns.compare,
+            threshold=ns.threshold,
+            min_time=ns.min_time,
+            repeat=ns.repeat,
+        )
+        if regressions:
+            sys.exit(1)
+
+    def profile(self, ns: Namespace):
+        """`profile` 명령어 처리."""
+        self._cmd.profile(
+            message=ns.message,
+            data=ns.data,
+            file=ns.file,
+            route=ns.route,
+            runs=ns.runs,
+            db=ns.db,
+            setup=ns.setup,
+            output=ns.output,
+            trace_alloc=not ns.no_alloc,
+        )
+
+    def replay(self, ns: Namespace):
+        """`replay` 명령어 처리."""
+        self._cmd.replay(ns.path, speed=ns.speed, limit=ns.limit)
+
+    def db(self, ns: Namespace):
+        """`db` 명령어 처리."""
+        if ns.db_command == "sync":
+            self._cmd.db_sync(force=not ns.check)
+        else:
+            self._db_parser.print_help()
 
 
 def console_main():
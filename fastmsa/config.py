@@ -7,12 +7,16 @@ import sys
 from configparser import ConfigParser
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional, Type, cast
-
-from sqlalchemy.pool import Pool, StaticPool
+from typing import TYPE_CHECKING, Any, Optional, Type, cast
 
 from fastmsa.core import AbstractFastMSA, AbstractMessageBroker
-from fastmsa.redis import RedisConnectInfo
+
+if TYPE_CHECKING:
+    from sqlalchemy.pool import Pool
+
+    from fastmsa.idempotency import IdempotencyStore
+    from fastmsa.redis import RedisConnectInfo
+    from fastmsa.scheduler import ScheduleStore
 
 
 @dataclass
@@ -28,7 +32,7 @@ def load_setupcfg(path: Path) -> Optional[FastMSASetupConfig]:
         # 현재 경로에 "setup.cfg" 파일이 있다면 [fastmsa] 섹션에서
         # name, module 등의 정보를 읽습니다.
         config = ConfigParser()
-        config.read("setup.cfg")
+        config.read(path / "setup.cfg")
         if "fastmsa" in config:
             return FastMSASetupConfig(**config["fastmsa"])
     return None
@@ -51,7 +55,25 @@ class FastMSA(AbstractFastMSA):
 
     @staticmethod
     def load_from_config(path=Path(".")) -> FastMSA:
-        """`name` 정보를 이용해  `config.py` 를 로드한다."""
+        """`name` 정보를 이용해  `config.py` 를 로드한다.
+
+        결과는 프로세스 전역으로 캐시되며, `setup.cfg` 나 앱의 `config.py` 가
+        바뀌었을 때만 다시 로드합니다. 바뀐 `config.py` 모듈은 다시 임포트합니다.
+        캐시를 비우려면 :func:`clear_config_cache` 를 호출합니다.
+        """
+        path = path.absolute()
+        cached = _config_cache.get(path)
+        if cached:
+            stamps, msa = cached
+            if stamps == _config_stamps(path, msa):
+                return msa
+
+        msa = FastMSA._load_from_config(path, reload=cached is not None)
+        _config_cache[path] = (_config_stamps(path, msa), msa)
+        return msa
+
+    @staticmethod
+    def _load_from_config(path: Path, reload: bool = False) -> FastMSA:
         cfg = load_setupcfg(path)
         if cfg:
             name = cfg.name
@@ -81,6 +103,8 @@ class FastMSA(AbstractFastMSA):
                 sys.path.insert(0, abs_path)
 
             conf_module = importlib.import_module(f"{module_name}.config")
+            if reload:
+                conf_module = importlib.reload(conf_module)
             # config.py 파일이 발견되면 이 설정을 로드합니다.
             UserConfig = cast(Type[FastMSA], getattr(conf_module, "Config"))
             title = cfg.title or UserConfig.title
@@ -151,6 +175,8 @@ class FastMSA(AbstractFastMSA):
 
     @property
     def redis_conn_info(self) -> RedisConnectInfo:
+        from fastmsa.redis import RedisConnectInfo
+
         return RedisConnectInfo(
             host="localhost",
             port=6379,
@@ -170,13 +196,67 @@ class FastMSA(AbstractFastMSA):
         """Get db poolclass arguemnt for SQLAlchemy's engine creation.
 
         Returns:
-            A pool class
+            A pool class. ``None`` 이면 DB URL 에 맞게 고릅니다.
+            (:func:`fastmsa.orm.default_poolclass`)
+        """
+        return None
+
+    def get_warmup_connections(self) -> int:
+        """프로덕션 워커가 시작할 때 미리 열어둘 DB 커넥션 수."""
+        return 5
 
+    def get_drain_timeout(self) -> float:
+        """프로덕션 워커 종료시 처리 중인 메세지를 기다릴 최대 시간(초)."""
+        return 30.0
+
+    def get_journal_dir(self) -> Optional[Path]:
+        """외부에서 들어온 메세지를 기록할 저널 디렉토리. ``None`` 이면 기록하지 않습니다.
+
+        :mod:`fastmsa.journal` 참고.
         """
-        return StaticPool
+        return None
+
+    def get_idempotency_store(self) -> Optional[IdempotencyStore]:
+        """멱등성 키가 있는 커맨드의 결과 저장소. ``None`` 이면 사용하지 않습니다.
+
+        :mod:`fastmsa.idempotency` 참고.
+        """
+        return None
+
+    def get_schedule_store(self) -> Optional[ScheduleStore]:
+        """예약된 메세지 저장소. ``None`` 이면 프로세스 메모리에만 유지합니다.
+
+        :mod:`fastmsa.scheduler` 참고.
+        """
+        return None
 
     def init_fastapi(self):
         """FastMSA 설정을 FastAPI 앱에 적용합니다."""
-        from fastmsa.api import app
+        from fastmsa.api import app, mount_admin_routes
 
         app.title = self.title
+        mount_admin_routes(app)
+
+
+_config_cache: dict[Path, tuple[tuple[Optional[int], ...], FastMSA]] = {}
+"""앱 경로별로 로드한 설정과 로드할 때의 설정 파일 수정 시각."""
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _config_stamps(path: Path, msa: FastMSA) -> tuple[Optional[int], ...]:
+    """설정에 영향을 주는 파일들(`setup.cfg`, `config.py`)의 수정 시각."""
+    return (
+        _mtime_ns(path / "setup.cfg"),
+        _mtime_ns(path / msa.module_path / "config.py"),
+    )
+
+
+def clear_config_cache() -> None:
+    """:meth:`FastMSA.load_from_config` 의 캐시를 비웁니다."""
+    _config_cache.clear()
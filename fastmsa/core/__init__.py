@@ -1,4 +1,4 @@
-from ._errors import FastMSAError, FastMSAInitError  # noqa
+from ._errors import ConcurrencyConflict, FastMSAError, FastMSAInitError  # noqa
 from ._models import (  # noqa
     AbstractChannelListener,
     AbstractFastMSA,
@@ -15,6 +15,7 @@ from ._models import (  # noqa
     Command,
     Entity,
     Event,
+    LockMode,
     Message,
     MessageHandlerMap,
 )
@@ -12,3 +12,9 @@ class FastMSAInitError(FastMSAError):
     """프로젝트 초기화 실패 에러."""
 
     ...
+
+
+class ConcurrencyConflict(FastMSAError):
+    """다른 트랜잭션이 먼저 Aggregate 를 변경하여 버전 검사에 실패했을 때 발생합니다."""
+
+    ...
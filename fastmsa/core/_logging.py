@@ -1,6 +1,25 @@
 import logging
+from typing import Any, Optional
 
-from uvicorn.logging import DefaultFormatter
+
+class DefaultFormatter(logging.Formatter):
+    """uvicorn 의 ``DefaultFormatter`` 를 처음 사용할 때 생성하는 포매터.
+
+    로거 생성만으로 uvicorn(click 포함)이 임포트되지 않도록 지연시킵니다.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__()
+        self._args = args
+        self._kwargs = kwargs
+        self._formatter: Optional[logging.Formatter] = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not self._formatter:
+            from uvicorn.logging import DefaultFormatter as UvicornFormatter
+
+            self._formatter = UvicornFormatter(*self._args, **self._kwargs)
+        return self._formatter.format(record)
 
 
 def get_logger(name: str, log_level=logging.INFO):
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import abc
-import asyncio
-from contextlib import AbstractContextManager, ContextDecorator
+from contextlib import AbstractContextManager, ContextDecorator, contextmanager
 from dataclasses import dataclass
 from inspect import Parameter, signature
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
+    ClassVar,
     Generator,
     Generic,
     List,
@@ -24,6 +25,11 @@ from typing import (
 
 from ._errors import FastMSAError
 
+if TYPE_CHECKING:
+    import asyncio
+
+    from fastmsa.loader import DataLoader
+
 
 class Entity(Protocol):
     """Entity 프로토콜 명세."""
@@ -40,6 +46,20 @@ class Aggregate(Entity, Generic[E]):
     items: list[E] = []
     _messages: list[Message]
 
+    version_field: ClassVar[Optional[str]] = None
+    """낙관적 동시성 제어에 사용할 버전 필드 이름.
+
+    지정하면 버전 필드가 변경된 Aggregate 를 저장할 때
+    ``WHERE <version_field> = :old`` 조건으로 버전을 검사하고, 실패하면
+    :class:`ConcurrencyConflict` 가 발생합니다.
+    """
+
+    snapshot_every: ClassVar[Optional[int]] = None
+    """이벤트 소싱 레포지터리에서 이벤트 몇 개마다 스냅샷을 저장할지 지정합니다.
+
+    ``None`` 이면 스냅샷을 저장하지 않습니다. (:mod:`fastmsa.eventsource` 참고)
+    """
+
     def add_message(self, e: Message):
         if not hasattr(self, "_messages"):
             self._messages = list[Message]()
@@ -72,6 +92,26 @@ class Event:
     succeeded or failed.
     """
 
+    coalesce_key: ClassVar[Optional[Sequence[str]]] = None
+    """메세지 큐에서 중복 메세지를 합칠 때 사용할 필드 이름 목록.
+
+    :meth:`fastmsa.event.MessageBus.handle` 은 처리 대기 중인 같은 타입과 키의
+    메세지를 :meth:`merge` 로 합칩니다. (:class:`fastmsa.event.MessageQueue`)
+    """
+
+    coalesce_done: ClassVar[bool] = False
+    """``True`` 면 같은 ``handle()`` 호출에서 이미 처리된 메세지와 완전히 같은
+    메세지를 다시 처리하지 않고 버립니다. :attr:`coalesce_key` 가 있어야 합니다.
+    """
+
+    def merge(self, newer: Any) -> Optional[Any]:
+        """큐에 있는 메세지와 같은 키로 나중에 들어온 ``newer`` 를 합칩니다.
+
+        합친 메세지를 리턴하면 기존 메세지 자리에 들어가고, ``None`` 을 리턴하면
+        두 메세지를 모두 처리합니다. 기본 구현은 완전히 같은 메세지만 합칩니다.
+        """
+        return self if self == newer else None
+
 
 class Command:
     """Command 객체.
@@ -89,9 +129,42 @@ class Command:
     As a result, when they fail, the sender needs to receive error information.
     """
 
+    partition_key: ClassVar[Optional[str]] = None
+    """파티션 키로 사용할 필드 이름.
+
+    :class:`fastmsa.event.KeyedExecutor` 는 파티션 키 값이 같은 커맨드를 같은
+    레인에서 순서대로 실행합니다. 보통 커맨드가 변경하는 Aggregate 의 id 필드를
+    지정합니다.
+    """
+
+    idempotency_key: Optional[str] = None
+    """멱등성 키. 같은 키의 커맨드는 한 번만 실행됩니다. (:mod:`fastmsa.idempotency`)
+
+    데이터 클래스 필드가 아니므로 커맨드를 만든 후에 설정합니다.
+    """
+
+    coalesce_key: ClassVar[Optional[Sequence[str]]] = None
+    """중복 커맨드를 합칠 때 사용할 필드 이름 목록. (:attr:`Event.coalesce_key`)"""
+
+    coalesce_done: ClassVar[bool] = False
+    """:attr:`Event.coalesce_done` 와 같습니다."""
+
+    def merge(self, newer: Any) -> Optional[Any]:
+        """:meth:`Event.merge` 와 같습니다."""
+        return self if self == newer else None
+
 
 Message = Union[Command, Event]
 
+LockMode = Literal["update", "nowait", "skip_locked", "share"]
+"""Aggregate 조회시 사용할 비관적 잠금 모드.
+
+- ``update``: ``SELECT ... FOR UPDATE``
+- ``nowait``: ``SELECT ... FOR UPDATE NOWAIT``
+- ``skip_locked``: ``SELECT ... FOR UPDATE SKIP LOCKED``
+- ``share``: ``SELECT ... FOR SHARE``
+"""
+
 AnyMessageType = Union[Type[Event], Type[Command]]
 MessageHandlerMap = dict[AnyMessageType, list[Callable]]
 
@@ -205,19 +278,41 @@ class AbstractFastMSA(abc.ABC):
 
     def init_fastapi(self):
         """FastMSA 설정을 FastAPI 앱에 적용합니다."""
-        from fastmsa.api import app
+        from fastmsa.api import app, mount_admin_routes
 
         app.title = self.title
+        mount_admin_routes(app)
 
 
 class AbstractRepository(Generic[E], abc.ABC, ContextDecorator):
     """Repository 패턴의 추상 인터페이스 입니다."""
 
     entity_class: Type[E]
+    default_lock: Optional[LockMode] = None
+    """``lock`` 인자 없이 조회할 때 사용할 잠금 모드. UoW 가 설정합니다."""
 
     def __init__(self):
         self.seen = set[E]()
 
+    @property
+    def loader(self) -> DataLoader[E]:
+        """이 레포지터리의 조회를 모아서 :meth:`get_many` 로 실행하는 로더.
+
+        로더의 캐시는 레포지터리와 수명이 같습니다. (하나의 UoW 세션) 잠금 없이
+        id 로 조회하는 :meth:`get` 도 이 캐시를 사용하므로, :meth:`delete` 를
+        구현할 때는 ``self.loader.clear(key)`` 로 캐시를 지워야 합니다.
+        """
+        loader = self.__dict__.get("_loader")
+        if loader is None:
+            from fastmsa.loader import DataLoader
+
+            loader = self.__dict__["_loader"] = DataLoader(self.get_many, self.key_of)
+        return loader
+
+    def key_of(self, item: E) -> Any:
+        """객체의 id. :meth:`get_many` 결과를 요청한 id 와 맞출 때 사용합니다."""
+        return item.id
+
     def __enter__(self) -> AbstractRepository[E]:
         """`module`:contextmanager`의 필수 인터페이스 구현."""
         return self
@@ -236,29 +331,61 @@ class AbstractRepository(Generic[E], abc.ABC, ContextDecorator):
         """레포지터리에 :class:`T` 객체를 추가합니다."""
         self._add(item)
         self.seen.add(item)
+        loader = self.__dict__.get("_loader")
+        if loader is not None and (key := self.key_of(item)) is not None:
+            # 추가 전에 못 찾아서 캐시된 ``None`` 을 새 객체로 바꿉니다.
+            loader.prime(key, item)
 
     @abc.abstractmethod
     def _add(self, item: E) -> None:
         """레포지터리에 :class:`T` 객체를 추가합니다."""
         raise NotImplementedError
 
-    def get(self, id: Any = "", **kwargs: str) -> Optional[E]:
+    def get(
+        self, id: Any = "", lock: Optional[LockMode] = None, **kwargs: str
+    ) -> Optional[E]:
         """주어진 레퍼런스 문자열에 해당하는 :class:`T` 객체를 조회합니다.
 
         객체를 찾았을 경우 `seen` 컬렉셔에 추가합니다.
         못 찾을 경우 ``None`` 을 리턴합니다.
+
+        Args:
+            lock: 조회한 행에 걸 비관적 잠금 모드. 지정하지 않으면
+                :attr:`default_lock` 을 사용합니다. ``by_*`` 조회에서는
+                ``_get_by_*`` 메소드에 ``lock`` 인자로 전달됩니다.
+
+        Raises:
+            FastMSAError: 잠금 모드가 있는데 ``_get_by_*`` 메소드가 ``lock`` 인자를
+                받지 않을 때.
         """
         item: Optional[E] = None
+        lock = lock or self.default_lock
 
         if not kwargs:
-            item = self._get(id)
+            if lock:
+                item = self._get_locked(id, lock=lock)
+            else:
+                # 로더가 이미 찾은 객체는 다시 조회하지 않습니다.
+                item = self.loader.cached(id) or self._get(id)
+            if item and id:
+                self.loader.prime(id, item)
         else:
             # get(by_field=value) 처럼 이름있는 파라메터에 `by_` 가 붙어있는 경우
             # _get_by_field 메소드를 호출하도록 라우팅 합니다.
             k, v = next((k, v) for k, v in kwargs.items())
             if k.startswith("by_"):
-                method_name = "_get_" + k
-                item = getattr(self, method_name)(v)
+                method = getattr(self, "_get_" + k)
+                if not lock:
+                    item = method(v)
+                elif "lock" in signature(method).parameters:
+                    item = method(v, lock=lock)
+                else:
+                    raise FastMSAError(
+                        f"{type(self).__name__}._get_{k}() does not support lock:"
+                        f" {lock!r}"
+                    )
+            elif lock:
+                item = self._get_locked(id="", lock=lock, **kwargs)
             else:
                 item = self._get(id="", **kwargs)
 
@@ -267,6 +394,28 @@ class AbstractRepository(Generic[E], abc.ABC, ContextDecorator):
 
         return item
 
+    def get_many(self, ids: Sequence[Any], lock: Optional[LockMode] = None) -> list[E]:
+        """주어진 id 목록에 해당하는 :class:`T` 객체들을 조회합니다.
+
+        못 찾은 id 는 결과에서 제외됩니다. 기본 구현은 :meth:`get` 을 반복 호출합니다.
+        """
+        items = (self.get(id, lock=lock) for id in ids)
+        return [it for it in items if it]
+
+    def prepare_commit(self) -> None:
+        """UoW 가 커밋하기 직전에 호출됩니다. 기본 구현은 아무것도 하지 않습니다."""
+        return
+
+    def _get_locked(
+        self, id: str = "", lock: LockMode = "update", **kwargs: str
+    ) -> Optional[E]:
+        """잠금을 걸고 객체를 조회합니다.
+
+        잠금을 지원하지 않는 저장소를 위해 기본 구현은 잠금 없이 :meth:`_get` 을
+        호출합니다.
+        """
+        return self._get(id, **kwargs)
+
     @abc.abstractmethod
     def _get(self, id: str = "", **kwargs: str) -> Optional[E]:
         """주어진 레퍼런스 문자열에 해당하는 :class:`T` 객체를 조회합니다.
@@ -319,6 +468,8 @@ class AbstractUnitOfWork(
     """
 
     repos: AggregateReposMap
+    lock: Optional[LockMode] = None
+    """레포지터리 조회시 기본으로 사용할 잠금 모드. 메세지 버스가 커맨드별로 설정합니다."""
 
     def __enter__(self) -> AbstractUnitOfWork:
         """``with`` 블록에 진입했을때 실행되는 메소드입니다."""
@@ -334,8 +485,24 @@ class AbstractUnitOfWork(
             raise FastMSAError("repostory not found for: %r" % key)
         return self.repos[key]
 
+    @contextmanager
+    def batch(self) -> Generator[AbstractUnitOfWork, None, None]:
+        """블록 안에서 실행되는 핸들러들의 변경을 하나의 트랜잭션으로 묶습니다.
+
+        기본 구현은 아무것도 묶지 않습니다.
+        """
+        yield self
+
+    def before_commit(self, hook: Callable[[AbstractUnitOfWork], None]) -> None:
+        """다음 :meth:`commit` 에서 커밋 직전에 한 번 실행할 함수를 등록합니다."""
+        self.__dict__.setdefault("_commit_hooks", []).append(hook)
+
     def commit(self) -> None:
         """세션을 커밋합니다."""
+        for repo in self.repos.values():
+            repo.prepare_commit()
+        for hook in self.__dict__.pop("_commit_hooks", []):
+            hook(self)
         self._commit()
 
     def collect_new_messages(self):
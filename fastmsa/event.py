@@ -6,30 +6,98 @@
     우리의 목표는 병렬 스레드를 지원하는 것이 아니라 개념적으로 작업을 분리하고 각
     UoW를 가능한 한 작게 유지하는 것입니다. 각 사용 사례의 실행 방법에 대한 "레시피"가
     한 곳에 기록되어 있기 때문에 코드베이스를 이해하는 데 도움이 됩니다.
+
+    여러 요청을 병렬로 처리하려면 :class:`KeyedExecutor` 를 사용합니다. 같은
+    Aggregate 에 대한 커맨드는 같은 레인에서 순서대로, 다른 Aggregate 에 대한
+    커맨드는 서로 다른 레인에서 병렬로 실행됩니다.
 """
+import asyncio
+import heapq
+import itertools
 import logging
+import os
+import threading
 from collections import defaultdict
-from typing import Any, Callable, Optional, Type, TypeVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from queue import Full, PriorityQueue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from tenacity import RetryError, Retrying, stop_after_attempt, wait_exponential
-from uvicorn.logging import DefaultFormatter
+from tenacity import (
+    RetryError,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random_exponential,
+)
 
+from fastmsa.cache import MISS
 from fastmsa.core import (
     AbstractFastMSA,
     AbstractMessageBroker,
     AbstractMessageHandler,
     AbstractPubsubClient,
+    AbstractUnitOfWork,
     AnyMessageType,
     Command,
+    ConcurrencyConflict,
     Event,
     FastMSAError,
+    LockMode,
     Message,
     MessageHandlerMap,
 )
-from fastmsa.uow import AbstractUnitOfWork
+from fastmsa.core._logging import DefaultFormatter
+from fastmsa.instrument import sql_scope
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from fastmsa.idempotency import IdempotencyStore
+    from fastmsa.journal import JournalWriter
+    from fastmsa.scheduler import Delay, MessageScheduler, When
 
 MESSAGE_HANDLERS: MessageHandlerMap = defaultdict(list)
 
+current_uow: ContextVar[Optional[AbstractUnitOfWork]] = ContextVar(
+    "fastmsa_current_uow", default=None
+)
+"""현재 실행 컨텍스트(스레드, 비동기 태스크)에 바인딩된 UoW.
+
+:meth:`MessageBus.handle` 에 ``uow`` 인자가 없으면 :attr:`MessageBus.uow_factory`
+보다 먼저 사용됩니다. 바인딩된 UoW 가 없으면 :meth:`MessageBus.handle` 이 새 UoW 를
+만들어 처리하는 동안 바인딩합니다.
+"""
+
+request_idempotency_key: ContextVar[Optional[str]] = ContextVar(
+    "fastmsa_request_idempotency_key", default=None
+)
+"""현재 HTTP 요청의 ``Idempotency-Key`` 헤더 값.
+
+:meth:`MessageBus.handle` 이 처음 처리하는 커맨드에 멱등성 키가 없으면 이 값을
+사용하고 비웁니다. (:mod:`fastmsa.idempotency`)
+"""
+
+defer_events: ContextVar[bool] = ContextVar("fastmsa_defer_events", default=False)
+"""참이면 우선순위와 관계없이 모든 후속 이벤트를 :attr:`MessageBus.drainer` 로
+넘깁니다. (:func:`fastmsa.api.deferred_events`)
+"""
+
 E = TypeVar("E", bound=Event)
 C = TypeVar("C", bound=Command)
 M = TypeVar("M", bound=Message)
@@ -43,6 +111,94 @@ ch.setFormatter(DefaultFormatter())
 logger.addHandler(ch)
 
 
+def coalesce_key_of(message: Message) -> Optional[tuple[Any, ...]]:
+    """메세지 클래스에 선언된 :attr:`Event.coalesce_key` 필드 값들을 리턴합니다."""
+    fields = type(message).coalesce_key
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    return (type(message), *(getattr(message, f) for f in fields))
+
+
+class MessageQueue:
+    """:meth:`MessageBus.handle` 이 처리할 메세지 큐.
+
+    우선순위가 높은 메세지부터, 같은 우선순위에서는 들어온 순서대로 꺼냅니다.
+    ``coalesce_key`` 가 선언된 메세지는 처리 대기 중인 같은 키의 메세지와
+    :meth:`Event.merge` 로 합쳐집니다. ``coalesce_done`` 이 켜진 타입의 메세지는
+    이미 처리된 메세지와 같으면 버려집니다.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[Message] = (),
+        priorities: Optional[dict[AnyMessageType, int]] = None,
+    ):
+        self.priorities = priorities or {}
+        self._items = list[tuple[int, int, list[Message]]]()
+        """``(-우선순위, 순번, 슬롯)`` 힙."""
+        self._seq = itertools.count()
+        self._pending = dict[tuple[Any, ...], list[Message]]()
+        """키별로 마지막에 추가된 메세지의 슬롯. 합친 메세지로 교체됩니다."""
+        self._done = dict[tuple[Any, ...], Message]()
+        self.coalesced = 0
+        """합쳐지거나 버려진 메세지 수."""
+        self.extend(messages)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"MessageQueue{[item[2][0] for item in sorted(self._items)]!r}"
+
+    def append(self, message: Message) -> None:
+        key = coalesce_key_of(message)
+        if key is not None:
+            pending = self._pending.get(key)
+            merged = pending[0].merge(message) if pending else None
+            if merged is not None:
+                pending[0] = merged  # type: ignore
+                self.coalesced += 1
+                return
+            if not pending and self._done.get(key) == message:
+                logger.info("drop message already handled: %r", message)
+                self.coalesced += 1
+                return
+        slot = [message]
+        if key is not None:
+            self._pending[key] = slot
+        priority = self.priorities.get(type(message), 0)
+        heapq.heappush(self._items, (-priority, next(self._seq), slot))
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def popleft(self) -> Message:
+        _, _, slot = heapq.heappop(self._items)
+        message = slot[0]
+        key = coalesce_key_of(message)
+        if key is not None:
+            if self._pending.get(key) is slot:
+                del self._pending[key]
+            if message.coalesce_done:
+                self._done[key] = message
+        return message
+
+
+@dataclass
+class BatchResult:
+    """:meth:`MessageBus.handle_many` 의 처리 결과."""
+
+    results: list[list[Any]]
+    """메세지별 커맨드 결과 목록. 입력 순서와 같습니다."""
+    errors: dict[int, Exception] = field(default_factory=dict)
+    """처리에 실패한 메세지의 위치와 에러."""
+    commits: int = 0
+    """실행된 트랜잭션 수."""
+
+
 class MessageBus(AbstractMessageHandler):
     def __init__(
         self,
@@ -51,12 +207,48 @@ class MessageBus(AbstractMessageHandler):
         uow: Optional[AbstractUnitOfWork] = None,
         pubsub: Optional[AbstractPubsubClient] = None,
         broker: Optional[AbstractMessageBroker] = None,
+        conflict_retries: int = 3,
     ):
+        """메세지 버스를 초기화합니다.
+
+        Args:
+            conflict_retries: 커맨드 핸들러에서 :class:`ConcurrencyConflict` 가
+                발생했을 때 새 UoW 세션으로 핸들러를 다시 실행할 횟수.
+        """
         self.handlers = handlers
         self._msa = msa
+        self.conflict_retries = conflict_retries
+        self.lock_modes = dict[AnyMessageType, LockMode]()
+        """커맨드 타입별로 레포지터리 조회시 사용할 비관적 잠금 모드."""
+        self.batch_commands = set[AnyMessageType]()
+        """커맨드 목록을 한 번에 받는 배치 핸들러가 등록된 커맨드 타입."""
+        self.priorities = dict[AnyMessageType, int]()
+        """메세지 타입별 우선순위. 값이 클수록 후속 메세지 큐에서 먼저 처리됩니다."""
+        self.drainer: Optional[BackgroundDrainer] = None
+        """우선순위가 낮은 이벤트를 넘겨받아 백그라운드에서 처리할 드레이너."""
+        self.executor: Optional[KeyedExecutor] = None
+        """:meth:`submit` 으로 제출된 메세지를 실행할 executor."""
+        self.process_commands = set[AnyMessageType]()
+        """핸들러를 :attr:`process_pool` 에서 실행할 커맨드 타입."""
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        """CPU 를 많이 쓰는 핸들러를 실행할 프로세스 풀. 처음 필요할 때 만듭니다."""
+        self.process_workers: Optional[int] = None
+        """:attr:`process_pool` 의 프로세스 수. ``None`` 이면 CPU 수."""
+        self._pool_lock = threading.Lock()
+        self.journal: Optional[JournalWriter] = None
+        """외부에서 들어온 메세지를 기록할 저널. (:mod:`fastmsa.journal`)"""
+        self.idempotency: Optional[IdempotencyStore] = None
+        """멱등성 키가 있는 커맨드의 결과 저장소. (:mod:`fastmsa.idempotency`)"""
+        self.scheduler: Optional[MessageScheduler] = None
+        """:meth:`schedule` 로 예약된 메세지를 처리하는 스케줄러."""
+        self._inflight = 0
+        self._idle = threading.Condition()
+        self.uow_factory: Optional[Callable[[], AbstractUnitOfWork]] = None
+        """:meth:`handle` 호출마다 새 UoW 를 만드는 함수."""
+        self._uow: Optional[AbstractUnitOfWork] = None
         self.uow, self.broker, self.pubsub = uow, broker, pubsub
         if msa:
-            self.uow = msa.uow
+            self.uow_factory = _uow_factory_of(msa)
             self.broker = msa.broker
             if msa.broker:
                 self.pubsub = msa.broker.client
@@ -70,33 +262,274 @@ class MessageBus(AbstractMessageHandler):
         """`FastMSA` 설정이 바뀌면 관련 의존성을 같이 업데이트합니다."""
         if new_msa:
             self._msa = new_msa
-            self.uow = new_msa.uow
+            self._uow, self.uow_factory = None, _uow_factory_of(new_msa)
             self.broker = new_msa.broker
             if new_msa.broker:
                 self.pubsub = new_msa.broker.client
 
+    @property  # type: ignore
+    def uow(self) -> Optional[AbstractUnitOfWork]:
+        """현재 컨텍스트에서 처리 중인 UoW. 없으면 고정 UoW."""
+        return current_uow.get() or self._uow
+
+    @uow.setter
+    def uow(self, uow: Optional[AbstractUnitOfWork]):
+        """모든 호출이 공유할 고정 UoW 를 설정합니다.
+
+        이전 버전과의 호환을 위한 방식이며, :attr:`uow_factory` 는 해제됩니다.
+        여러 스레드에서 동시에 처리할 경우 하나의 세션을 공유하게 되므로
+        :attr:`uow_factory` 를 사용해야 합니다.
+        """
+        self._uow = uow
+        if uow:
+            self.uow_factory = None
+
     def handle(self, message: Message, uow: Optional[AbstractUnitOfWork] = None):  # type: ignore
-        queue = [message]
-        results = []
+        if self.journal:
+            self.journal.record(message)
+        self._track(1)
+        try:
+            return self._handle(message, uow)
+        finally:
+            self._track(-1)
+
+    def _handle(self, message: Message, uow: Optional[AbstractUnitOfWork] = None):
+        if isinstance(message, Command) and not message.idempotency_key:
+            # HTTP 요청의 `Idempotency-Key` 헤더는 처음 처리하는 커맨드에만 적용합니다.
+            key = request_idempotency_key.get()
+            if key:
+                message.idempotency_key = key
+                request_idempotency_key.set(None)
+
+        with self._bind_uow(uow) as uow:
+            return self._dispatch([message], uow)
 
-        uow = uow or self.uow
+    @contextmanager
+    def _bind_uow(
+        self, uow: Optional[AbstractUnitOfWork]
+    ) -> Iterator[AbstractUnitOfWork]:
+        uow = uow or current_uow.get()
+        token = None
+        if not uow:
+            # 호출마다 새 UoW 를 만들어 후속 메세지 처리가 끝날 때까지 바인딩합니다.
+            uow = self.uow_factory() if self.uow_factory else self._uow
+            token = current_uow.set(uow)
         assert uow is not None
+        try:
+            yield uow
+        finally:
+            if token:
+                current_uow.reset(token)
 
+    def _dispatch(
+        self, messages: Iterable[Message], uow: AbstractUnitOfWork
+    ) -> list[Any]:
+        """메세지와 후속 메세지를 모두 처리하고 커맨드 결과 목록을 리턴합니다."""
+        results = []
+        queue = MessageQueue(messages, self.priorities)
         while queue:
-            message = queue.pop(0)
+            message = queue.popleft()
             logger.debug("handle message: %r, queue: %r", message, queue)
-
-            if isinstance(message, Event):
-                self.handle_event(message, queue, uow)
-            elif isinstance(message, Command):
-                cmd_result = self.handle_command(message, queue, uow)
-                if cmd_result:
-                    results.append(cmd_result)
-            else:
-                raise Exception(f"{message} was not an Event or Command")
+            if self.drainer and self.drainer.defer(message):
+                continue
+            cmd_result = self._handle_message(message, queue, uow)
+            if cmd_result:
+                results.append(cmd_result)
+        if queue.coalesced:
+            logger.debug("coalesced %d messages", queue.coalesced)
         return results
 
-    def handle_event(self, event: Event, queue: list[Message], uow: AbstractUnitOfWork):
+    def _handle_message(
+        self,
+        message: Message,
+        queue: Union[list[Message], MessageQueue],
+        uow: AbstractUnitOfWork,
+    ) -> Any:
+        """메세지 하나를 처리하고 후속 메세지는 ``queue`` 에 추가합니다."""
+        if isinstance(message, Event):
+            self.handle_event(message, queue, uow)  # type: ignore
+            return None
+        if isinstance(message, Command):
+            return self.handle_command(message, queue, uow)  # type: ignore
+        raise Exception(f"{message} was not an Event or Command")
+
+    def handle_many(
+        self,
+        messages: Sequence[Message],
+        uow: Optional[AbstractUnitOfWork] = None,
+        commit_every: int = 500,
+    ) -> BatchResult:
+        """여러 메세지를 ``commit_every`` 개씩 묶어서 하나의 트랜잭션으로 처리합니다.
+
+        같은 Aggregate 에 대한 메세지가 이어지도록 파티션 키별로 모으며, 같은 키의
+        메세지는 타입과 관계없이 입력 순서를 유지합니다. 묶음 안에서 핸들러의
+        ``with uow:`` 블록은 하나의 세션을 공유하고, ``uow.commit()`` 은 묶음이
+        끝날 때 한 번에 커밋됩니다. (:meth:`AbstractUnitOfWork.batch`)
+
+        배치 핸들러(``@on_command(..., batch=True)``)가 등록된 커맨드는 묶음 안에서
+        연속된 같은 타입의 커맨드 목록을 한 번에 전달합니다.
+
+        후속 메세지는 묶음이 커밋된 뒤에 처리되므로, 롤백된 변경에 대한 이벤트가
+        외부로 나가지 않습니다. 묶음 처리 중 에러가 발생하면 묶음을 롤백하고
+        메세지를 하나씩 다시 처리하여, 실패한 메세지의 에러만
+        :attr:`BatchResult.errors` 에 기록합니다.
+        """
+        result = BatchResult([[] for _ in messages])
+        if self.journal:
+            for message in messages:
+                self.journal.record(message)
+        groups = dict[Any, list[int]]()
+        for i, message in enumerate(messages):
+            groups.setdefault(_group_key(message), []).append(i)
+        order = [i for group in groups.values() for i in group]
+
+        self._track(len(messages))
+        try:
+            with self._bind_uow(uow) as uow:
+                for start in range(0, len(order), commit_every):
+                    chunk = order[start : start + commit_every]
+                    try:
+                        with uow.batch():
+                            followups = self._handle_chunk(
+                                messages, chunk, result, uow
+                            )
+                        result.commits += 1
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception("batch failed, handle one by one")
+                        self._handle_each(messages, chunk, result, uow)
+                        continue
+                    self._handle_followups(followups, result, uow)
+        finally:
+            self._track(-len(messages))
+        return result
+
+    def _handle_chunk(
+        self,
+        messages: Sequence[Message],
+        chunk: list[int],
+        result: BatchResult,
+        uow: AbstractUnitOfWork,
+    ) -> dict[int, list[Message]]:
+        """묶음의 메세지를 처리하고 메세지 위치별 후속 메세지를 리턴합니다."""
+        followups = dict[int, list[Message]]()
+        for etype, group in itertools.groupby(chunk, lambda i: type(messages[i])):
+            indexes = list(group)
+            if etype not in self.batch_commands:
+                for i in indexes:
+                    if self.drainer and self.drainer.defer(messages[i]):
+                        continue
+                    followups[i] = []
+                    output = self._handle_message(messages[i], followups[i], uow)
+                    result.results[i] = [output] if output else []
+                continue
+
+            commands = [messages[i] for i in indexes]
+            followups[indexes[0]] = []
+            outputs = self._handle_batch(commands, followups[indexes[0]], uow)
+            for i, output in zip(indexes, outputs):
+                result.results[i] = [output] if output else []
+        return followups
+
+    def _handle_followups(
+        self,
+        followups: dict[int, list[Message]],
+        result: BatchResult,
+        uow: AbstractUnitOfWork,
+    ):
+        """커밋된 묶음의 후속 메세지를 처리합니다."""
+        for i, queue in followups.items():
+            if not queue:
+                continue
+            try:
+                result.results[i].extend(self._dispatch(queue, uow))
+            except Exception as e:  # pylint: disable=broad-except
+                result.errors[i] = e
+
+    def _handle_each(
+        self,
+        messages: Sequence[Message],
+        chunk: list[int],
+        result: BatchResult,
+        uow: AbstractUnitOfWork,
+    ):
+        for i in chunk:
+            try:
+                result.results[i] = self._dispatch([messages[i]], uow)
+                result.commits += 1
+            except Exception as e:  # pylint: disable=broad-except
+                result.errors[i] = e
+
+    def _track(self, delta: int):
+        with self._idle:
+            self._inflight += delta
+            if not self._inflight:
+                self._idle.notify_all()
+
+    @property
+    def inflight(self) -> int:
+        """처리 중이거나 :attr:`executor` 에서 대기 중인 메세지 수."""
+        return self._inflight
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """처리 중인 메세지와 후속 메세지가 모두 처리될 때까지 기다립니다.
+
+        Args:
+            timeout: 최대 대기 시간(초). ``None`` 이면 끝날 때까지 기다립니다.
+
+        Returns:
+            제한 시간 안에 모두 처리되었으면 ``True``.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._inflight, timeout)
+
+    def schedule(
+        self, message: Message, at: "When" = None, after: "Delay" = None
+    ) -> str:
+        """메세지를 ``at`` 시각 또는 ``after`` 초 뒤에 처리하도록 예약합니다.
+
+        :attr:`scheduler` 가 없으면 프로세스 메모리에만 예약을 유지하는 기본
+        스케줄러를 만들어 시작합니다. (:mod:`fastmsa.scheduler`)
+
+        Returns:
+            :meth:`MessageScheduler.cancel <fastmsa.scheduler.MessageScheduler.cancel>`
+            에 사용할 예약 ID.
+        """
+        if not self.scheduler:
+            from fastmsa.scheduler import MessageScheduler
+
+            self.scheduler = MessageScheduler(self)
+            self.scheduler.start()
+        return self.scheduler.schedule(message, at=at, after=after)
+
+    def submit(self, message: Message) -> Future:
+        """메세지를 :attr:`executor` 의 레인에 제출하고 결과 Future 를 리턴합니다.
+
+        executor 가 없으면 현재 스레드에서 바로 처리합니다.
+        """
+        if self.executor:
+            if self.journal:
+                self.journal.record(message)
+            self._track(1)
+            try:
+                future = self.executor.submit(message)
+            except BaseException:
+                self._track(-1)
+                raise
+            future.add_done_callback(lambda _: self._track(-1))
+            return future
+
+        future: Future = Future()
+        try:
+            future.set_result(self.handle(message))
+        except Exception as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+        return future
+
+    async def handle_async(self, message: Message) -> list[Any]:
+        """:meth:`submit` 의 결과를 이벤트 루프를 막지 않고 기다립니다."""
+        return await asyncio.wrap_future(self.submit(message))
+
+    def handle_event(self, event: Event, queue: MessageQueue, uow: AbstractUnitOfWork):
         for handler in self.handlers[type(event)]:
             try:
                 retrying = Retrying(stop=stop_after_attempt(3), wait=wait_exponential())
@@ -117,18 +550,98 @@ class MessageBus(AbstractMessageHandler):
                 continue
 
     def handle_command(
-        self, command: Command, queue: list[Message], uow: AbstractUnitOfWork
+        self, command: Command, queue: MessageQueue, uow: AbstractUnitOfWork
     ):
 
         logger.debug("handling command %s", command)
+        old_lock, uow.lock = uow.lock, self.lock_modes.get(type(command))
+        key = self.idempotency and idempotency_key_of(command)
         try:
-            [handler] = self.handlers[type(command)]
-            result = self.call_handler(command, handler, uow)
+            call: Callable[[], Any]
+            if type(command) in self.process_commands:
+                # 멱등성 키는 워커가 아닌 이 프로세스의 저장소에서 확인합니다.
+                call = partial(self._call_in_process, command, queue)
+            elif type(command) in self.batch_commands:
+                [result] = self._handle_batch([command], queue, uow)
+                return result
+            else:
+                [handler] = self.handlers[type(command)]
+                call = partial(self.call_handler, command, handler, uow)
+
+            # 낙관적 동시성 충돌이 발생하면 핸들러를 다시 실행합니다.
+            # 핸들러가 `with uow:` 블록에 다시 진입할 때 새 세션이 할당됩니다.
+            retrying = Retrying(
+                retry=retry_if_exception_type(ConcurrencyConflict),
+                stop=stop_after_attempt(self.conflict_retries + 1),
+                wait=wait_random_exponential(multiplier=0.01, max=0.5),
+                reraise=True,
+            )
+            for attempt in retrying:
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        logger.info("retrying command on conflict: %r", command)
+                    if key:
+                        result = self._call_idempotent(key, command, call, uow)
+                    else:
+                        result = call()
             queue.extend(uow.collect_new_messages())
             return result
         except Exception:
             logger.exception("Exception handling command %s", command)
             raise
+        finally:
+            uow.lock = old_lock
+
+    def _call_in_process(self, command: Command, queue: MessageQueue) -> Any:
+        """커맨드를 프로세스 풀에서 처리하고 결과를 리턴합니다.
+
+        워커에서 발생한 후속 메세지는 ``queue`` 에 추가됩니다.
+        """
+        if not self.process_pool:
+            with self._pool_lock:
+                if not self.process_pool:
+                    self.process_pool = _create_process_pool(self)
+        future = self.process_pool.submit(_handle_in_process, command)
+        result, messages = future.result()
+        queue.extend(messages)
+        return result
+
+    def _handle_batch(
+        self,
+        commands: list[Command],
+        queue: Union[list[Message], MessageQueue],
+        uow: AbstractUnitOfWork,
+    ) -> list[Any]:
+        """배치 핸들러를 호출하고 커맨드별 결과 목록을 리턴합니다."""
+        etype = type(commands[0])
+        [handler] = self.handlers[etype]
+        with sql_scope("message", etype.__name__, commands, handler):
+            outputs = self._call_handler(commands, handler, uow)  # type: ignore
+        queue.extend(uow.collect_new_messages())
+        return list(outputs) if outputs is not None else [None] * len(commands)
+
+    def _call_idempotent(
+        self,
+        key: str,
+        command: Command,
+        call: Callable[[], Any],
+        uow: AbstractUnitOfWork,
+    ):
+        """같은 멱등성 키로 처리된 결과가 있으면 ``call`` 을 실행하지 않고 리턴합니다."""
+        assert self.idempotency
+        cached = self.idempotency.get(key)
+        if cached is not MISS:
+            logger.info("skip duplicated command: %r", command)
+            return cached
+
+        self.idempotency.begin(key, uow)
+        try:
+            result = call()
+        except BaseException:
+            self.idempotency.abort(key)
+            raise
+        self.idempotency.put(key, result)
+        return result
 
     def call_handler(
         self, message: Message, handler: Callable, uow: AbstractUnitOfWork
@@ -138,6 +651,12 @@ class MessageBus(AbstractMessageHandler):
         예를 들어 `def a_handler(uow, broker)` 와 같은 핸들러가 있을 경우 `uow` 나
         `broker`(외부 메세지 브로커) 같은 이름은 외부 의존성을 가리킵니다.
         """
+        with sql_scope("message", type(message).__name__, message, handler):
+            return self._call_handler(message, handler, uow)
+
+    def _call_handler(
+        self, message: Message, handler: Callable, uow: AbstractUnitOfWork
+    ):
         params = self.params_cache.get(handler)
         if not params:
             return handler(message)
@@ -167,30 +686,304 @@ messagebus = MessageBus(MESSAGE_HANDLERS)
 """전역 메세지 버스."""
 
 
+def _uow_factory_of(msa: AbstractFastMSA) -> Callable[[], AbstractUnitOfWork]:
+    # `FastMSA.uow` 는 접근할 때마다 새 UoW 를 만듭니다.
+    return lambda: msa.uow
+
+
+_process_bus: Optional[MessageBus] = None
+"""프로세스 풀 워커에서 커맨드를 처리하는 메세지 버스."""
+
+
+def _create_process_pool(bus: MessageBus) -> "ProcessPoolExecutor":
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise FastMSAError("process executor requires the 'fork' start method")
+    return ProcessPoolExecutor(
+        bus.process_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=init_process_worker,
+        initargs=(bus,),
+    )
+
+
+def init_process_worker(bus: MessageBus) -> None:
+    """프로세스 풀 워커를 초기화합니다.
+
+    워커는 fork 로 만들어지므로 부모 프로세스의 핸들러 등록과 설정을 그대로
+    가지고 있습니다. 부모로부터 복사된 커넥션 풀은 버리고
+    (:func:`fastmsa.orm.reset_engines_after_fork`), :func:`fastmsa.orm.init_db` 로
+    ORM 매퍼와 세션 팩토리를 미리 초기화합니다.
+    """
+    global _process_bus  # pylint: disable=global-statement
+
+    bus.process_commands = set()  # 워커에서는 바로 처리합니다.
+    bus.process_pool = None
+    # 멱등성 키 확인과 충돌시 재실행은 부모 프로세스에서 합니다.
+    bus.idempotency = None
+    bus.conflict_retries = 0
+    bus.drainer = None
+    bus.scheduler = None
+    if bus.msa:
+        from fastmsa.orm import init_db
+
+        init_db(config=bus.msa)
+    _process_bus = bus
+
+
+def _handle_in_process(command: Command) -> tuple[Any, list[Message]]:
+    bus = _process_bus
+    assert bus, "process worker is not initialized"
+    messages = list[Message]()
+    with bus._bind_uow(None) as uow:
+        result = bus.handle_command(command, messages, uow)  # type: ignore
+    return result, messages
+
+
+def _group_key(message: Message) -> Optional[str]:
+    key = partition_key_of(message) if isinstance(message, Command) else None
+    return None if key is None else str(key)
+
+
+def idempotency_key_of(command: Command) -> Optional[str]:
+    """커맨드의 멱등성 키를 저장소 키로 변환합니다. 키가 없으면 ``None``."""
+    key = command.idempotency_key
+    return f"{type(command).__name__}:{key}" if key else None
+
+
+def partition_key_of(message: Message) -> Optional[Any]:
+    """메세지 클래스에 선언된 :attr:`Command.partition_key` 필드 값을 리턴합니다."""
+    field = getattr(type(message), "partition_key", None)
+    return getattr(message, field) if field else None
+
+
+class KeyedExecutor:
+    """파티션 키 별로 메세지를 단일 스레드 레인에 배정하여 실행합니다.
+
+    같은 파티션 키를 가진 메세지는 항상 같은 레인에서 제출된 순서대로 실행되므로
+    같은 Aggregate 에 대한 동시성 충돌이 발생하지 않습니다. 서로 다른 키는 여러
+    레인에 분산되어 병렬로 실행됩니다. 파티션 키가 없는 메세지는 레인을 돌아가며
+    배정됩니다.
+
+    각 레인은 ``uow_factory`` 로 만든 전용 UoW 를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        lanes: Optional[int] = None,
+        uow_factory: Optional[Callable[[], AbstractUnitOfWork]] = None,
+    ):
+        self.bus = bus
+        self.num_lanes = lanes or os.cpu_count() or 1
+        self.uow_factory = uow_factory or bus.uow_factory
+        self._local = threading.local()
+        self._round_robin = itertools.count()
+        self._lanes = [
+            ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"fastmsa-lane-{i}",
+                initializer=self._init_lane,
+            )
+            for i in range(self.num_lanes)
+        ]
+
+    def __repr__(self):
+        return f"KeyedExecutor[lanes={self.num_lanes}]"
+
+    def _init_lane(self):
+        self._local.uow = self.uow_factory() if self.uow_factory else None
+
+    def _run(self, message: Message) -> list[Any]:
+        # 처리 중인 메세지 수는 `MessageBus.submit` 에서 이미 세고 있습니다.
+        return self.bus._handle(message, self._local.uow)
+
+    def lane_of(self, key: Optional[Any]) -> int:
+        """파티션 키가 배정될 레인 번호를 리턴합니다."""
+        if key is None:
+            return next(self._round_robin) % self.num_lanes
+        return hash(key) % self.num_lanes
+
+    def submit(self, message: Message) -> Future:
+        """메세지를 파티션 키에 해당하는 레인에 제출합니다."""
+        lane = self._lanes[self.lane_of(partition_key_of(message))]
+        return lane.submit(self._run, message)
+
+    def shutdown(self, wait: bool = True):
+        """모든 레인을 종료합니다. ``wait`` 이 참이면 남은 메세지를 모두 처리합니다."""
+        for lane in self._lanes:
+            lane.shutdown(wait=wait)
+
+
+@dataclass
+class DrainerStats:
+    """:class:`BackgroundDrainer` 통계. 드레이너의 잠금 안에서 갱신됩니다."""
+
+    deferred: int = 0
+    """백그라운드로 넘겨받은 메세지 수."""
+    processed: int = 0
+    failed: int = 0
+    overflow: int = 0
+    """큐가 가득 차서 넘겨받지 못하고 요청 스레드에서 처리된 메세지 수."""
+
+
+class BackgroundDrainer:
+    """우선순위가 ``below`` 보다 낮은 이벤트를 백그라운드 스레드에서 처리합니다.
+
+    :attr:`MessageBus.drainer` 로 설정하면 :meth:`MessageBus.handle` 은 이런 이벤트를
+    처리하지 않고 드레이너의 큐에 넣은 뒤, 나머지 메세지만 처리하고 리턴합니다.
+    드레이너의 큐도 우선순위 순서로 처리되며, 이벤트의 후속 메세지는 드레이너
+    스레드에서 이어서 처리됩니다. 처리할 때마다 새 UoW 가 필요하므로 메세지
+    버스에 :attr:`MessageBus.uow_factory` 가 설정되어 있어야 합니다.
+
+    큐가 ``maxsize`` 만큼 차 있으면 이벤트를 요청 스레드에서 바로 처리합니다.
+    넘겨받은 이벤트는 :attr:`MessageBus.inflight` 에 포함되므로
+    :meth:`MessageBus.drain` 은 드레이너의 큐가 빌 때까지 기다립니다.
+    """
+
+    def __init__(
+        self, bus: MessageBus, below: int = 0, workers: int = 1, maxsize: int = 10_000
+    ):
+        self.bus = bus
+        self.below = below
+        self.num_workers = workers
+        self.stats = DrainerStats()
+        self._queue: PriorityQueue[tuple[float, int, Optional[Message]]]
+        self._queue = PriorityQueue(maxsize)
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = list[threading.Thread]()
+
+    def __repr__(self):
+        return f"BackgroundDrainer[below={self.below}, workers={self.num_workers}]"
+
+    @property
+    def pending(self) -> int:
+        """큐에서 대기 중인 메세지 수."""
+        return self._queue.qsize()
+
+    def defer(self, message: Message) -> bool:
+        """백그라운드에서 처리할 이벤트면 큐에 넣고 ``True`` 를 리턴합니다."""
+        priority = self.bus.priorities.get(type(message), 0)
+        if not isinstance(message, Event):
+            return False
+        if priority >= self.below and not defer_events.get():
+            return False
+        if getattr(self._local, "worker", False):
+            return False  # 드레이너 스레드에서는 바로 처리합니다.
+
+        self._start()
+        self.bus._track(1)
+        try:
+            self._queue.put_nowait((-priority, next(self._seq), message))
+        except Full:
+            self.bus._track(-1)
+            with self._lock:
+                self.stats.overflow += 1
+            return False
+        with self._lock:
+            self.stats.deferred += 1
+        return True
+
+    def _start(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.num_workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"fastmsa-drainer-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        self._local.worker = True
+        while True:
+            _, _, message = self._queue.get()
+            if message is None:
+                break
+            try:
+                self.bus._handle(message)
+                with self._lock:
+                    self.stats.processed += 1
+            except Exception:  # pylint: disable=broad-except
+                with self._lock:
+                    self.stats.failed += 1
+                logger.exception("failed to handle deferred message: %r", message)
+            finally:
+                self.bus._track(-1)
+
+    def close(self, timeout: Optional[float] = None):
+        """큐에 남은 메세지를 모두 처리한 뒤 스레드를 종료합니다."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            # 종료 신호는 우선순위가 가장 낮아서 남은 메세지보다 나중에 꺼내집니다.
+            self._queue.put((float("inf"), next(self._seq), None))
+        for thread in threads:
+            thread.join(timeout)
+
+
 def clear_handlers():
     """이벤트 핸들러를 초기화 합니다."""
     MESSAGE_HANDLERS.clear()
 
 
-def on_event(etype: Type[E]) -> Callable[[F], F]:
+def on_event(etype: Type[E], priority: Optional[int] = None) -> Callable[[F], F]:
     """이벤트 핸들러 데코레이터.
 
     함수를 이벤트 핸들러 레지스트리에 등록합니다.
+
+    Args:
+        priority: 이벤트 타입의 우선순위. (:attr:`MessageBus.priorities`)
+            기본값은 ``0`` 이며, 음수로 지정하면 다른 메세지보다 나중에
+            처리되고 :class:`BackgroundDrainer` 가 있으면 백그라운드로 넘겨집니다.
     """
 
     def _wrapper(func: F) -> F:
 
         messagebus.register(etype, func)
+        if priority is not None:
+            messagebus.priorities[etype] = priority
         return func
 
     return _wrapper
 
 
-def on_command(etype: Type[C]) -> Callable[[F], F]:
+def on_command(
+    etype: Type[C],
+    lock: Optional[LockMode] = None,
+    batch: bool = False,
+    priority: Optional[int] = None,
+    executor: Optional[str] = None,
+) -> Callable[[F], F]:
     """커맨드 핸들러 데코레이터.
 
     함수를 커맨드 핸들러 레지스트리에 등록합니다.
+
+    Args:
+        lock: 핸들러 안에서 레포지터리를 조회할 때 기본으로 사용할 비관적 잠금 모드.
+            예를 들어 ``"update"`` 로 지정하면 ``SELECT ... FOR UPDATE`` 로
+            조회하여 경합이 심한 Aggregate 에 대한 요청이 DB에서 대기하게 됩니다.
+        batch: 참이면 핸들러가 커맨드 목록을 받아 커맨드별 결과 목록을
+            리턴합니다. :meth:`MessageBus.handle_many` 에서 연속된 커맨드를 한 번에
+            전달하며, :meth:`MessageBus.handle` 에서는 커맨드 하나의 목록을
+            전달합니다.
+        priority: 커맨드 타입의 우선순위. (:attr:`MessageBus.priorities`)
+        executor: ``"process"`` 로 지정하면 핸들러를 별도 프로세스
+            (:attr:`MessageBus.process_pool`)에서 실행합니다. 계산이 많아 GIL 을
+            오래 잡는 핸들러가 메세지 버스와 API 를 멈추지 않게 합니다. 커맨드와
+            결과, 후속 메세지는 pickle 로 전달되므로 직렬화할 수 있어야 합니다.
     """
+    if executor not in (None, "process"):
+        raise FastMSAError(f"unknown executor: {executor!r}")
+    if executor and batch:
+        raise FastMSAError("batch handlers can't run in the process pool")
 
     def _wrapper(func: F) -> F:
         # 이미 등록된 핸들러가 덮어씌우지지 않도록 방지
@@ -198,6 +991,14 @@ def on_command(etype: Type[C]) -> Callable[[F], F]:
         if handler:
             raise FastMSAError(f"Handler already exists for {etype}: {handler}")
         messagebus.register(etype, func)
+        if lock:
+            messagebus.lock_modes[etype] = lock
+        if batch:
+            messagebus.batch_commands.add(etype)
+        if priority is not None:
+            messagebus.priorities[etype] = priority
+        if executor == "process":
+            messagebus.process_commands.add(etype)
         return func
 
     return _wrapper
@@ -0,0 +1,315 @@
+"""이벤트 소싱 레포지터리.
+
+Aggregate 를 ORM 객체 그래프 대신 이벤트 목록으로 저장합니다.
+:attr:`Aggregate.messages` 에 추가된 이벤트가 커밋할 때 ``fastmsa_events`` 테이블에
+추가되고, 조회할 때는 마지막 스냅샷에 그 이후의 이벤트들을
+:meth:`EventSourced.apply` 로 적용해서 Aggregate 를 복원합니다.
+
+Aggregate 의 상태 변경은 모두 이벤트로 표현되어야 합니다. 커맨드를 처리하는
+메소드는 :meth:`EventSourced.record` 로 이벤트를 적용하고 기록합니다. ::
+
+    class Account(EventSourced):
+        snapshot_every = 100
+
+        def deposit(self, amount: int):
+            self.record(Deposited(self.id, amount))
+
+        def apply(self, event):
+            if isinstance(event, Deposited):
+                self.balance += event.amount
+
+    uow = SqlAlchemyUnitOfWork(
+        [Account], repo_maker={Account: lambda s: EventSourcedRepository(Account, s)}
+    )
+
+같은 Aggregate 에 같은 버전의 이벤트가 동시에 추가되면 :class:`ConcurrencyConflict`
+가 발생하므로 메세지 버스가 커맨드를 다시 실행합니다.
+"""
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Type, TypeVar
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    inspect,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, registry
+
+from fastmsa import serialize
+from fastmsa.core import (
+    AbstractRepository,
+    Aggregate,
+    ConcurrencyConflict,
+    Event,
+    FastMSAError,
+)
+
+A = TypeVar("A", bound=Aggregate)
+
+event_store_metadata = MetaData()
+
+events_table = Table(
+    "fastmsa_events",
+    event_store_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("aggregate_type", String(255), nullable=False),
+    Column("aggregate_id", String(255), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("event_type", String(255), nullable=False, index=True),
+    Column("payload", Text, nullable=False),
+    Column("created", DateTime, nullable=False),
+    UniqueConstraint("aggregate_type", "aggregate_id", "version"),
+)
+"""이벤트 저장 테이블. ``id`` 는 전체 이벤트 스트림에서의 순서입니다."""
+
+snapshots_table = Table(
+    "fastmsa_snapshots",
+    event_store_metadata,
+    Column("aggregate_type", String(255), primary_key=True),
+    Column("aggregate_id", String(255), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("state", LargeBinary, nullable=False),
+    Column("created", DateTime, nullable=False),
+)
+"""Aggregate 별 최신 스냅샷 테이블."""
+
+
+@dataclass
+class StoredEvent:
+    """``fastmsa_events`` 테이블의 행."""
+
+    aggregate_type: str
+    aggregate_id: str
+    version: int
+    event_type: str
+    payload: str
+    created: datetime
+    id: Optional[int] = None
+
+
+@dataclass
+class Snapshot:
+    """``fastmsa_snapshots`` 테이블의 행."""
+
+    aggregate_type: str
+    aggregate_id: str
+    version: int
+    state: bytes
+    created: datetime
+
+
+_registry = registry()
+
+
+def init_event_store(metadata: MetaData) -> None:
+    """이벤트 저장소 테이블을 앱의 :class:`MetaData` 에 추가합니다.
+
+    ORM 매핑 모듈의 ``init_mappers()`` 에서 호출하면 앱의 다른 테이블과 함께
+    생성됩니다.
+    """
+    for table in event_store_metadata.sorted_tables:
+        if table.name not in metadata.tables:
+            table.to_metadata(metadata)
+
+
+def _ensure_mapped() -> None:
+    # `clear_mappers()` 로 매핑이 지워졌을 수 있으므로 매번 확인합니다.
+    if inspect(StoredEvent, raiseerr=False) is None:
+        _registry.dispose()
+        _registry.map_imperatively(StoredEvent, events_table)
+        _registry.map_imperatively(Snapshot, snapshots_table)
+
+
+class EventSourced(Aggregate):
+    """이벤트 소싱으로 저장되는 Aggregate 의 기반 클래스."""
+
+    @classmethod
+    def empty(cls, id: Any) -> EventSourced:
+        """이벤트를 적용하기 전의 빈 Aggregate 를 만듭니다.
+
+        기본 구현은 ``__init__`` 을 호출하지 않고 ``id`` 만 설정합니다. 첫 이벤트에서
+        초기 상태를 설정하거나 이 메소드를 재정의합니다.
+        """
+        agg = cls.__new__(cls)
+        agg.id = id
+        return agg
+
+    def apply(self, event: Event) -> None:
+        """이벤트를 Aggregate 상태에 적용합니다."""
+        raise NotImplementedError
+
+    def record(self, event: Event) -> None:
+        """이벤트를 적용하고 저장할 메세지로 추가합니다."""
+        self.apply(event)
+        self.add_message(event)
+
+
+class EventSourcedRepository(AbstractRepository[A]):
+    """Aggregate 를 이벤트 테이블에 추가 전용으로 저장하는 레포지터리.
+
+    조회 비용은 전체 이벤트 수가 아니라 마지막 스냅샷 이후의 이벤트 수에
+    비례합니다.
+    """
+
+    def __init__(
+        self,
+        entity_class: Type[A],
+        session: Session,
+        snapshot_every: Optional[int] = None,
+    ):
+        """
+        Args:
+            snapshot_every: 이벤트 몇 개마다 스냅샷을 저장할지. 지정하지 않으면
+                :attr:`Aggregate.snapshot_every` 를 사용합니다.
+        """
+        super().__init__()
+        _ensure_mapped()
+        self.entity_class = entity_class
+        self.session = session
+        self.aggregate_type = entity_class.__name__
+        self.snapshot_every = snapshot_every or entity_class.snapshot_every
+        self._versions: dict[int, int] = {}
+        """Aggregate 객체별 저장된 마지막 이벤트 버전."""
+        self._recorded: dict[int, int] = {}
+        """Aggregate 객체별 이미 저장한 메세지 수."""
+
+    def __repr__(self) -> str:
+        return f"EventSourcedRepository[{self.entity_class}]"
+
+    def version_of(self, item: A) -> int:
+        """Aggregate 의 저장된 마지막 이벤트 버전. 새 Aggregate 는 ``0``."""
+        return self._versions.get(id(item), 0)
+
+    def _add(self, item: A) -> None:
+        self._versions.setdefault(id(item), 0)
+
+    def _get(self, id: Any = "", **kwargs: Any) -> Optional[A]:
+        if not id and len(kwargs) == 1:
+            # `get(sku="...")` 처럼 id 필드 이름으로 조회하는 경우.
+            [id] = kwargs.values()
+        elif not id or kwargs:
+            raise FastMSAError(f"{self!r} can only get aggregates by id")
+        return self._load(str(id))
+
+    def _load(self, aggregate_id: str) -> Optional[A]:
+        snapshot = self.session.get(Snapshot, (self.aggregate_type, aggregate_id))
+        version = snapshot.version if snapshot else 0
+        rows = self.session.execute(
+            select(events_table.c.version, events_table.c.payload)
+            .where(
+                events_table.c.aggregate_type == self.aggregate_type,
+                events_table.c.aggregate_id == aggregate_id,
+                events_table.c.version > version,
+            )
+            .order_by(events_table.c.version)
+        ).all()
+        if not snapshot and not rows:
+            return None
+
+        if snapshot:
+            item: Any = self.entity_class.__new__(self.entity_class)
+            item.__dict__.update(pickle.loads(snapshot.state))
+        else:
+            item = self._empty(aggregate_id)
+        for version, payload in rows:
+            item.apply(serialize.loads(payload))
+
+        self._versions[id(item)] = version
+        self._recorded[id(item)] = 0
+        return item
+
+    def _empty(self, aggregate_id: str) -> Any:
+        empty = getattr(self.entity_class, "empty", None)
+        if empty:
+            return empty(aggregate_id)
+        item: Any = self.entity_class.__new__(self.entity_class)
+        item.id = aggregate_id
+        return item
+
+    def prepare_commit(self) -> None:
+        """새로 추가된 이벤트를 저장하고, 필요하면 스냅샷을 갱신합니다."""
+        now = datetime.utcnow()
+        for item in self.seen:
+            recorded = self._recorded.get(id(item), 0)
+            new_events = [m for m in item.messages[recorded:] if isinstance(m, Event)]
+            self._recorded[id(item)] = len(item.messages)
+            if not new_events:
+                continue
+
+            old = self._versions.get(id(item), 0)
+            for version, event in enumerate(new_events, old + 1):
+                self.session.add(
+                    StoredEvent(
+                        self.aggregate_type,
+                        str(item.id),
+                        version,
+                        type(event).__name__,
+                        serialize.dumps(event),
+                        now,
+                    )
+                )
+            new = self._versions[id(item)] = old + len(new_events)
+            every = self.snapshot_every
+            if every and new // every > old // every:
+                self._save_snapshot(item, new, now)
+
+        # 그룹 커밋에 참여하는 세션은 커밋 전까지 DB에 쓰지 않으므로, 충돌은
+        # 리더의 커밋에서 발견됩니다.
+        if self.session.autoflush:
+            try:
+                self.session.flush()
+            except IntegrityError as e:
+                raise ConcurrencyConflict(
+                    f"{self.aggregate_type} was modified concurrently: {e.orig}"
+                ) from e
+
+    def _save_snapshot(self, item: A, version: int, now: datetime) -> None:
+        state = {
+            k: v
+            for k, v in vars(item).items()
+            if k not in ("_messages", "_sa_instance_state")
+        }
+        self.session.merge(
+            Snapshot(
+                self.aggregate_type, str(item.id), version, pickle.dumps(state), now
+            )
+        )
+
+    def delete(self, item: A) -> None:
+        for table in (events_table, snapshots_table):
+            self.session.execute(
+                table.delete().where(
+                    table.c.aggregate_type == self.aggregate_type,
+                    table.c.aggregate_id == str(item.id),
+                )
+            )
+        self.seen.discard(item)
+        self.loader.clear(self.key_of(item))
+
+    def all(self) -> List[A]:
+        ids = self.session.execute(
+            select(events_table.c.aggregate_id)
+            .where(events_table.c.aggregate_type == self.aggregate_type)
+            .distinct()
+        ).scalars()
+        items = [self.get(agg_id) for agg_id in ids]
+        return [it for it in items if it]
+
+    def clear(self) -> None:
+        for table in (events_table, snapshots_table):
+            self.session.execute(
+                table.delete().where(table.c.aggregate_type == self.aggregate_type)
+            )
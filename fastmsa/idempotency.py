@@ -0,0 +1,278 @@
+"""커맨드 멱등성 키와 결과 캐시.
+
+클라이언트의 재시도나 외부 메세지 브로커의 재전송으로 같은 커맨드가 다시
+들어와도 한 번만 실행되도록, 멱등성 키가 있는 커맨드의 결과를 저장해 두고
+같은 키로 다시 들어오면 핸들러를 실행하지 않고 저장된 결과를 리턴합니다. ::
+
+    cmd = commands.Allocate("o1", "LAMP", 10)
+    cmd.idempotency_key = "b1e0..."
+    messagebus.handle(cmd)  # 두 번째부터는 캐시된 결과를 리턴합니다.
+
+키는 커맨드 타입별로 구분됩니다. FastAPI 엔드포인트에서는 ``Idempotency-Key``
+요청 헤더가 요청을 처리하는 동안 처음 실행되는 커맨드의 키로 사용됩니다.
+(:class:`fastmsa.api.IdempotencyKeyMiddleware`,
+:data:`fastmsa.event.request_idempotency_key`)
+
+저장소는 :attr:`MessageBus.idempotency <fastmsa.event.MessageBus.idempotency>`
+에 설정합니다.
+
+- :class:`MemoryIdempotencyStore`: 프로세스 메모리. 단일 프로세스용.
+- :class:`RedisIdempotencyStore`: 여러 프로세스가 공유하며 TTL 로 만료됩니다.
+- :class:`SqlIdempotencyStore`: 키를 핸들러와 같은 트랜잭션에서 기록하므로
+  커밋된 커맨드는 결과를 저장하기 전에 프로세스가 죽어도 다시 실행되지
+  않습니다.
+
+같은 키의 커맨드가 동시에 실행되면 나중 커맨드에서 :class:`ConcurrencyConflict`
+가 발생하고, 메세지 버스가 다시 실행할 때 먼저 실행된 커맨드의 결과를
+리턴합니다. 결과는 pickle 로 저장되므로 직렬화할 수 있어야 합니다.
+"""
+from __future__ import annotations
+
+import pickle
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional, Protocol
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    event,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+
+from fastmsa.cache import MISS, LRUCache
+from fastmsa.core import AbstractUnitOfWork, ConcurrencyConflict
+from fastmsa.orm import SessionMaker, get_sessionmaker
+
+PENDING = b"__fastmsa_pending__"
+
+
+def _in_progress(key: str) -> ConcurrencyConflict:
+    return ConcurrencyConflict(f"command with same idempotency key in progress: {key}")
+
+
+class IdempotencyStore(Protocol):
+    """멱등성 키 저장소."""
+
+    def get(self, key: str) -> Any:
+        """저장된 결과. 없으면 :data:`fastmsa.cache.MISS`.
+
+        Raises:
+            ConcurrencyConflict: 같은 키의 커맨드가 실행 중일 때.
+        """
+        ...
+
+    def begin(self, key: str, uow: AbstractUnitOfWork) -> None:
+        """핸들러를 실행하기 직전에 호출됩니다."""
+        ...
+
+    def put(self, key: str, result: Any) -> None:
+        """핸들러가 성공하면 결과를 저장합니다."""
+        ...
+
+    def abort(self, key: str) -> None:
+        """핸들러가 실패하면 호출됩니다."""
+        ...
+
+
+class MemoryIdempotencyStore:
+    """프로세스 메모리 저장소. 오래된 키부터 ``maxsize`` 개만 유지합니다."""
+
+    def __init__(self, ttl: Optional[float] = 24 * 3600, maxsize: int = 100_000):
+        self.ttl = ttl
+        self._cache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        value = self._cache.get("", (key,))
+        if value is PENDING:
+            raise _in_progress(key)
+        return value
+
+    def begin(self, key: str, uow: AbstractUnitOfWork) -> None:
+        with self._lock:
+            if self._cache.get("", (key,)) is not MISS:
+                raise _in_progress(key)
+            self._cache.set("", (key,), PENDING, self.ttl)
+
+    def put(self, key: str, result: Any) -> None:
+        self._cache.set("", (key,), result, self.ttl)
+
+    def abort(self, key: str) -> None:
+        self._cache.delete("", (key,))
+
+
+class RedisIdempotencyStore:
+    """Redis 저장소. 실행 중 표시는 ``lock_timeout`` 초가 지나면 만료됩니다.
+
+    ``client`` 는 ``get``, ``set(ex=, nx=)``, ``delete`` 를 제공하는 동기식 Redis
+    클라이언트입니다. (예: ``redis.Redis``)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: int = 24 * 3600,
+        lock_timeout: int = 60,
+        prefix: str = "fastmsa:idempotency:",
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return MISS
+        if data == PENDING:
+            raise _in_progress(key)
+        return pickle.loads(data)
+
+    def begin(self, key: str, uow: AbstractUnitOfWork) -> None:
+        if not self.client.set(
+            self.prefix + key, PENDING, ex=self.lock_timeout, nx=True
+        ):
+            raise _in_progress(key)
+
+    def put(self, key: str, result: Any) -> None:
+        self.client.set(self.prefix + key, pickle.dumps(result), ex=self.ttl)
+
+    def abort(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+idempotency_metadata = MetaData()
+
+idempotency_table = Table(
+    "fastmsa_idempotency",
+    idempotency_metadata,
+    Column("key", String(255), primary_key=True),
+    Column("result", LargeBinary, nullable=True),
+    Column("created", DateTime, nullable=False),
+)
+"""처리된 커맨드의 멱등성 키. ``result`` 가 ``NULL`` 이면 결과를 저장하기 전입니다."""
+
+
+def init_idempotency_store(metadata: MetaData) -> None:
+    """멱등성 키 테이블을 앱의 :class:`MetaData` 에 추가합니다.
+
+    ORM 매핑 모듈의 ``init_mappers()`` 에서 호출하면 앱의 다른 테이블과 함께
+    생성됩니다.
+    """
+    for table in idempotency_metadata.sorted_tables:
+        if table.name not in metadata.tables:
+            table.to_metadata(metadata)
+
+
+class SqlIdempotencyStore:
+    """SQL 저장소.
+
+    핸들러가 UoW 를 커밋할 때 같은 트랜잭션에서 키를 추가하고, 핸들러가 끝나면
+    결과를 별도 트랜잭션으로 저장합니다. 결과가 저장되기 전에는 실행 중인 것으로
+    보고 :class:`ConcurrencyConflict` 를 발생시킵니다. ``lock_timeout`` 이 지나도록
+    결과가 없으면 결과를 저장하기 전에 프로세스가 종료된 것으로 보고, 커맨드를
+    다시 실행하지 않고 ``None`` 을 리턴합니다. 핸들러가 커밋한 후에 실패한 경우에는
+    ``None`` 을 결과로 저장합니다.
+
+    키는 ``session.execute()`` 로 추가하므로 그룹 커밋
+    (:class:`fastmsa.uow.GroupCommitCoordinator`) 을 사용하는 UoW 에서는 결과를
+    저장할 때 추가됩니다.
+    """
+
+    def __init__(
+        self,
+        get_session: Optional[SessionMaker] = None,
+        ttl: Optional[timedelta] = timedelta(days=1),
+        lock_timeout: timedelta = timedelta(minutes=1),
+    ):
+        self.get_session = get_session or get_sessionmaker()
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._local = threading.local()
+
+    @property
+    def _active(self) -> set[str]:
+        """현재 스레드에서 실행 중인 커맨드의 키."""
+        if not hasattr(self._local, "keys"):
+            self._local.keys = set[str]()
+        return self._local.keys
+
+    @property
+    def _committed(self) -> set[str]:
+        """현재 스레드에서 핸들러 트랜잭션과 함께 커밋되고 결과가 없는 키."""
+        if not hasattr(self._local, "committed"):
+            self._local.committed = set[str]()
+        return self._local.committed
+
+    def get(self, key: str) -> Any:
+        table = idempotency_table
+        with self.get_session() as session, session.begin():
+            row = session.execute(
+                select(table.c.result, table.c.created).where(table.c.key == key)
+            ).first()
+            if row and self.ttl and row.created < datetime.utcnow() - self.ttl:
+                session.execute(table.delete().where(table.c.key == key))
+                row = None
+        if not row:
+            return MISS
+        if row.result is not None:
+            return pickle.loads(row.result)
+        if row.created > datetime.utcnow() - self.lock_timeout:
+            raise _in_progress(key)
+        return None
+
+    def begin(self, key: str, uow: AbstractUnitOfWork) -> None:
+        self._active.add(key)
+
+        def add_key(uow: AbstractUnitOfWork):
+            # 핸들러가 커밋하지 않고 끝났다면 다른 커맨드의 커밋에서 실행된
+            # 것이므로 무시합니다.
+            session = getattr(uow, "session", None)
+            if key not in self._active or session is None:
+                return
+            if getattr(uow, "group_commit", None):
+                return
+            try:
+                now = datetime.utcnow()
+                session.execute(idempotency_table.insert().values(key=key, created=now))
+            except IntegrityError as e:
+                raise _in_progress(key) from e
+            event.listen(
+                session, "after_commit", lambda _: self._committed.add(key), once=True
+            )
+
+        uow.before_commit(add_key)
+
+    def put(self, key: str, result: Any) -> None:
+        self._active.discard(key)
+        self._committed.discard(key)
+        data = pickle.dumps(result)
+        with self.get_session() as session, session.begin():
+            table = idempotency_table
+            updated = session.execute(
+                table.update().where(table.c.key == key).values(result=data)
+            )
+            if not updated.rowcount:
+                now = datetime.utcnow()
+                values = dict(key=key, result=data, created=now)
+                session.execute(table.insert().values(**values))
+
+    def abort(self, key: str) -> None:
+        self._active.discard(key)
+        # 커밋된 커맨드는 다시 실행되지 않도록 결과 없이 완료합니다.
+        if key in self._committed:
+            self.put(key, None)
+
+    def purge(self, older_than: Optional[timedelta] = None) -> int:
+        """만료된 키를 지우고 지운 개수를 리턴합니다."""
+        expires = datetime.utcnow() - (older_than or self.ttl or timedelta())
+        with self.get_session() as session, session.begin():
+            return session.execute(
+                idempotency_table.delete().where(idempotency_table.c.created < expires)
+            ).rowcount
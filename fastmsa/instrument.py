@@ -0,0 +1,307 @@
+"""SQL 실행 계측 모듈.
+
+SqlAlchemy 엔진의 ``before_cursor_execute``/``after_cursor_execute``/``handle_error``
+이벤트를 이용해 SQL 문장별 실행 시간 히스토그램과 처리 행 수, 실패 횟수,
+메세지/UoW 별 SQL 실행 횟수를 기록하고, 느린 쿼리를 원인이 된 핸들러 및 메세지와
+함께 로그로 남깁니다.
+
+Example: ::
+
+    from fastmsa.instrument import sql_stats
+
+    sql_stats.slow_threshold = 0.1  # 100ms 이상 걸린 쿼리를 로그로 남깁니다.
+    print(sql_stats.snapshot())
+
+같은 통계는 ``GET /_fastmsa/stats/sql`` 엔드포인트로도 조회할 수 있습니다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from fastmsa.logging import get_logger
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+logger = get_logger("fastmsa.instrument")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+"""실행 시간 히스토그램의 버킷 상한값(초)."""
+
+OTHER_STATEMENTS = "<other>"
+"""``max_statements`` 를 넘어선 문장들이 집계되는 키."""
+
+
+@dataclass
+class LatencyHistogram:
+    """실행 시간 히스토그램."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def observe(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        for i, upper in enumerate(LATENCY_BUCKETS):
+            if elapsed <= upper:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": [
+                {"le": "inf" if le == float("inf") else le, "count": n}
+                for le, n in zip(LATENCY_BUCKETS, self.buckets)
+            ],
+        }
+
+
+@dataclass
+class StatementStats:
+    """SQL 문장 하나에 대한 통계."""
+
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    rows: int = 0
+    """영향받은 행 수의 합계. (드라이버가 알려주지 않는 SELECT 는 제외)"""
+    errors: int = 0
+    """실행 중 에러가 발생한 횟수. 실행 시간은 :attr:`latency` 에 포함됩니다."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"rows": self.rows, "errors": self.errors, **self.latency.to_dict()}
+
+
+@dataclass
+class ScopeStats:
+    """메세지나 UoW 같은 실행 범위별 SQL 실행 통계."""
+
+    scopes: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "avg_statements": self.statements / self.scopes if self.scopes else 0.0,
+        }
+
+
+@dataclass
+class SlowQuery:
+    """느린 쿼리 로그 항목."""
+
+    statement: str
+    elapsed: float
+    rows: int
+    handler: Optional[str]
+    message: Optional[str]
+    timestamp: float
+
+
+@dataclass
+class _Scope:
+    kind: str
+    name: str
+    message: Optional[Any] = None
+    handler: Optional[Callable] = None
+    statements: int = 0
+    elapsed: float = 0.0
+
+
+_scopes: ContextVar[tuple[_Scope, ...]] = ContextVar("fastmsa_sql_scopes", default=())
+
+
+class SqlScope:
+    """SQL 실행 통계를 모을 실행 범위.
+
+    ``with`` 블록으로 사용하거나 :meth:`enter`/:meth:`exit` 를 직접 호출합니다.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        message: Optional[Any] = None,
+        handler: Optional[Callable] = None,
+        stats: Optional[SqlInstrument] = None,
+    ):
+        self._scope = _Scope(kind, name, message, handler)
+        self._stats = stats or sql_stats
+        self._token: Any = None
+
+    def enter(self) -> SqlScope:
+        self._token = _scopes.set(_scopes.get() + (self._scope,))
+        return self
+
+    def exit(self) -> None:
+        if self._token is None:
+            return
+        _scopes.reset(self._token)
+        self._token = None
+        self._stats.record_scope(self._scope)
+
+    def __enter__(self) -> SqlScope:
+        return self.enter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.exit()
+
+
+def sql_scope(
+    kind: str,
+    name: str,
+    message: Optional[Any] = None,
+    handler: Optional[Callable] = None,
+) -> SqlScope:
+    """:class:`SqlScope` 를 만듭니다. 계측이 꺼져있어도 안전하게 사용할 수 있습니다."""
+    return SqlScope(kind, name, message, handler)
+
+
+class SqlInstrument:
+    """SqlAlchemy 엔진의 SQL 실행을 계측합니다."""
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.5,
+        max_statements: int = 500,
+        max_slow_queries: int = 100,
+    ):
+        self.slow_threshold = slow_threshold
+        """이 시간(초) 이상 걸린 쿼리는 느린 쿼리 로그에 남깁니다."""
+        self.max_statements = max_statements
+        self.slow_queries: deque[SlowQuery] = deque(maxlen=max_slow_queries)
+        self.statements = dict[str, StatementStats]()
+        self.latency = LatencyHistogram()
+        self.scopes = dict[tuple[str, str], ScopeStats]()
+        self.engines: weakref.WeakSet[Engine] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"SqlInstrument[slow_threshold={self.slow_threshold}]"
+
+    def attach(self, engine: Engine) -> Engine:
+        """엔진에 계측 이벤트 리스너를 등록합니다."""
+        from sqlalchemy import event
+
+        if engine not in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_execute)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+            event.listen(engine, "handle_error", self._handle_error)
+            self.engines.add(engine)
+        return engine
+
+    def detach(self, engine: Engine) -> None:
+        """엔진에서 계측 이벤트 리스너를 제거합니다."""
+        from sqlalchemy import event
+
+        if engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_execute)
+            event.remove(engine, "after_cursor_execute", self._after_execute)
+            event.remove(engine, "handle_error", self._handle_error)
+            self.engines.discard(engine)
+
+    def reset(self) -> None:
+        """모든 통계를 초기화합니다."""
+        with self._lock:
+            self.statements.clear()
+            self.scopes.clear()
+            self.slow_queries.clear()
+            self.latency = LatencyHistogram()
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("fastmsa_query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["fastmsa_query_start"].pop()
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        self.record(statement, elapsed, rows)
+
+    def _handle_error(self, context):
+        conn = context.connection
+        starts = conn.info.get("fastmsa_query_start") if conn is not None else None
+        # 커넥션 연결 실패처럼 실행 전에 발생한 에러는 기록하지 않습니다.
+        if not starts or context.statement is None:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        self.record(context.statement, elapsed, failed=True)
+
+    def record(
+        self, statement: str, elapsed: float, rows: int = 0, failed: bool = False
+    ) -> None:
+        """SQL 문장 하나의 실행 결과를 기록합니다."""
+        key = " ".join(statement.split())
+        scopes = _scopes.get()
+
+        with self._lock:
+            stats = self.statements.get(key)
+            if not stats:
+                if len(self.statements) >= self.max_statements:
+                    key = OTHER_STATEMENTS
+                stats = self.statements.setdefault(key, StatementStats())
+            stats.latency.observe(elapsed)
+            stats.rows += rows
+            stats.errors += failed
+            self.latency.observe(elapsed)
+
+            for scope in scopes:
+                scope.statements += 1
+                scope.elapsed += elapsed
+
+        if elapsed >= self.slow_threshold:
+            self._log_slow_query(key, elapsed, rows, scopes)
+
+    def _log_slow_query(self, statement, elapsed, rows, scopes):
+        msg_scope = next((s for s in reversed(scopes) if s.kind == "message"), None)
+        handler = msg_scope and msg_scope.handler
+        handler_name = handler and f"{handler.__module__}.{handler.__qualname__}"
+        message = msg_scope and repr(msg_scope.message)
+        self.slow_queries.append(
+            SlowQuery(statement, elapsed, rows, handler_name, message, time.time())
+        )
+        logger.warning(
+            "slow query (%.3fs): %s [handler=%s, message=%s]",
+            elapsed,
+            statement,
+            handler_name,
+            message,
+        )
+
+    def record_scope(self, scope: _Scope) -> None:
+        """종료된 실행 범위의 통계를 집계합니다."""
+        with self._lock:
+            stats = self.scopes.setdefault((scope.kind, scope.name), ScopeStats())
+            stats.scopes += 1
+            stats.statements += scope.statements
+            stats.max_statements = max(stats.max_statements, scope.statements)
+            stats.elapsed += scope.elapsed
+
+    def snapshot(self) -> dict[str, Any]:
+        """현재까지의 통계를 JSON 으로 변환 가능한 dict 로 리턴합니다."""
+        with self._lock:
+            scopes: dict[str, dict[str, Any]] = {}
+            for (kind, name), stats in self.scopes.items():
+                scopes.setdefault(kind, {})[name] = stats.to_dict()
+            return {
+                "latency": self.latency.to_dict(),
+                "statements": {k: v.to_dict() for k, v in self.statements.items()},
+                "scopes": scopes,
+                "slow_threshold": self.slow_threshold,
+                "slow_queries": [asdict(it) for it in self.slow_queries],
+            }
+
+
+sql_stats = SqlInstrument()
+"""전역 SQL 계측기. :func:`fastmsa.orm.init_engine` 이 생성한 엔진에 연결됩니다."""
@@ -0,0 +1,296 @@
+"""메세지 저널 기록과 재생.
+
+:attr:`MessageBus.journal` 을 설정하면 외부에서 들어온 메세지(:meth:`MessageBus.handle`,
+:meth:`MessageBus.submit`)가 시각, 상관관계 ID와 함께 추가 전용 바이너리 파일에
+기록됩니다. 핸들러가 발생시킨 후속 메세지는 재생시 다시 만들어지므로 기록하지
+않습니다. 기록한 저널을 :func:`replay` 로 다시 실행하여 운영 환경의 부하를
+로컬에서 재현할 수 있습니다.
+
+파일 형식: ::
+
+    MAGIC | record | record | ...
+    record = header(<IIdH: 길이, crc32, 시각, 상관관계 ID 길이) | 상관관계 ID | JSON
+
+기록은 버퍼링되고 파일 크기가 ``max_bytes`` 를 넘으면 새 파일(``00000002.fmj``)로
+넘어갑니다. 같은 디렉토리에 여러 프로세스가 기록하면 각자 다른 번호의 파일을
+만듭니다. 비정상 종료로 마지막 레코드가 잘린 경우 읽을 때 무시합니다.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Type, Union
+
+from fastmsa import serialize
+from fastmsa.core import Message
+from fastmsa.logging import get_logger
+
+MAGIC = b"FMSAJNL1"
+HEADER = struct.Struct("<IIdH")
+SUFFIX = ".fmj"
+
+logger = get_logger("fastmsa.journal")
+
+correlation_id: ContextVar[Optional[str]] = ContextVar(
+    "fastmsa_correlation_id", default=None
+)
+"""현재 처리 중인 요청의 상관관계 ID. 없으면 기록할 때 새로 만듭니다."""
+
+replaying: ContextVar[bool] = ContextVar("fastmsa_replaying", default=False)
+"""재생 중인 메세지는 저널에 다시 기록하지 않습니다."""
+
+
+def journal_files(path: Union[str, Path]) -> list[Path]:
+    """저널 디렉토리의 파일들을 기록된 순서대로 리턴합니다. 파일이면 그대로."""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(path.glob(f"*{SUFFIX}"))
+    return [path]
+
+
+class JournalWriter:
+    """메세지를 저널 파일에 추가합니다. 여러 스레드에서 사용할 수 있습니다."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_bytes: int = 64 * 1024 * 1024,
+        buffer_size: int = 256 * 1024,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Args:
+            max_bytes: 파일 하나의 최대 크기. 넘으면 새 파일로 넘어갑니다.
+            buffer_size: 쓰기 버퍼 크기.
+            flush_interval: 마지막 flush 이후 이 시간(초)이 지나면 다음 기록에서
+                버퍼를 비웁니다.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._lock = threading.Lock()
+        self._flushed = time.monotonic()
+        files = journal_files(self.directory)
+        # 이전에 기록하던 파일은 끝이 잘렸을 수 있으므로 항상 새 파일로 시작합니다.
+        self._seq = int(files[-1].stem) if files else 0
+        self._file: Any = None
+        self._size = 0
+        self._open_next()
+
+    def __enter__(self) -> JournalWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def path(self) -> Path:
+        """현재 기록 중인 파일 경로."""
+        return self.directory / f"{self._seq:08d}{SUFFIX}"
+
+    def _open_next(self):
+        if self._file:
+            self._file.close()
+        # 여러 프로세스가 같은 디렉토리에 기록할 수 있으므로 다른 프로세스가 먼저
+        # 만든 파일은 건너뛰고 배타적으로 새 파일을 만듭니다.
+        while True:
+            self._seq += 1
+            try:
+                self._file = open(self.path, "xb", buffering=self.buffer_size)
+                break
+            except FileExistsError:
+                continue
+        self._file.write(MAGIC)
+        self._size = len(MAGIC)
+
+    def write(
+        self,
+        message: Message,
+        correlation_id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> str:
+        """메세지를 기록하고 상관관계 ID를 리턴합니다."""
+        cid = correlation_id or uuid.uuid4().hex
+        payload = json.dumps(
+            serialize.to_dict(message),
+            default=serialize._encode,  # pylint: disable=protected-access
+            separators=(",", ":"),
+        ).encode()
+        cid_bytes = cid.encode()
+        header = HEADER.pack(
+            len(payload),
+            zlib.crc32(payload),
+            timestamp if timestamp is not None else time.time(),
+            len(cid_bytes),
+        )
+        with self._lock:
+            if self._file is None:
+                raise ValueError("journal is closed")
+            if self._size >= self.max_bytes:
+                self._open_next()
+            self._file.write(header + cid_bytes + payload)
+            self._size += len(header) + len(cid_bytes) + len(payload)
+            self.records += 1
+            now = time.monotonic()
+            if now - self._flushed >= self.flush_interval:
+                self._file.flush()
+                self._flushed = now
+        return cid
+
+    def record(self, message: Message) -> Optional[str]:
+        """:class:`MessageBus` 에 들어온 외부 메세지를 기록합니다.
+
+        재생 중인 메세지는 기록하지 않습니다. 현재 컨텍스트에 상관관계 ID가 있으면
+        그 ID를 사용합니다.
+        """
+        if replaying.get():
+            return None
+        return self.write(message, correlation_id.get())
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                self._file.flush()
+                self._flushed = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+@dataclass
+class JournalRecord:
+    """저널에 기록된 메세지 하나."""
+
+    timestamp: float
+    correlation_id: str
+    payload: bytes
+
+    def decode(self) -> dict[str, Any]:
+        return json.loads(self.payload)
+
+
+class JournalReader:
+    """저널 파일들을 메모리 맵으로 읽습니다."""
+
+    def __init__(self, path: Union[str, Path], candidates: Iterable[type] = ()):
+        """
+        Args:
+            path: 저널 디렉토리 또는 파일 경로.
+            candidates: 클래스 이름으로 기록된 메세지 타입을 찾을 때 사용할 클래스들.
+        """
+        self.files = journal_files(path)
+        self.candidates = list(candidates)
+        self._types: dict[str, Type[Message]] = {}
+
+    def __iter__(self) -> Iterator[JournalRecord]:
+        for path in self.files:
+            yield from self.read_file(path)
+
+    @staticmethod
+    def read_file(path: Path) -> Iterator[JournalRecord]:
+        """파일 하나의 레코드를 읽습니다. 잘리거나 손상된 끝부분은 무시합니다."""
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if not magic:
+                return
+            if magic != MAGIC:
+                raise ValueError(f"not a journal file: {path}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                offset, end = len(MAGIC), len(buf)
+                while offset + HEADER.size <= end:
+                    size, crc, ts, cid_len = HEADER.unpack_from(buf, offset)
+                    start = offset + HEADER.size + cid_len
+                    payload = buf[start : start + size]
+                    if len(payload) < size or zlib.crc32(payload) != crc:
+                        logger.warning("truncated journal record: %s@%d", path, offset)
+                        return
+                    cid = buf[offset + HEADER.size : start].decode()
+                    yield JournalRecord(ts, cid, payload)
+                    offset = start + size
+
+    def messages(self) -> Iterator[tuple[JournalRecord, Message]]:
+        """레코드와 복원한 메세지를 순서대로 리턴합니다."""
+        for record in self:
+            obj = record.decode()
+            cls = self._types.get(obj["type"])
+            if not cls:
+                cls = serialize.resolve_type(obj["type"], self.candidates)
+                self._types[obj["type"]] = cls
+            yield record, serialize.build(cls, obj.get("data") or {})
+
+
+@dataclass
+class ReplayStats:
+    """재생 결과."""
+
+    messages: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """초당 처리한 메세지 수."""
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+
+@contextmanager
+def _replay_context(cid: str):
+    tokens = correlation_id.set(cid), replaying.set(True)
+    try:
+        yield
+    finally:
+        correlation_id.reset(tokens[0])
+        replaying.reset(tokens[1])
+
+
+def replay(
+    reader: JournalReader,
+    handle: Callable[[Message], Any],
+    speed: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> ReplayStats:
+    """저널의 메세지들을 ``handle`` 로 다시 실행합니다.
+
+    Args:
+        handle: 메세지를 처리할 함수. 보통 ``messagebus.handle`` 이나
+            ``messagebus.submit`` 입니다.
+        speed: ``None`` 이면 최대한 빠르게, 아니면 기록된 시간 간격을 ``speed`` 배
+            빠르게 재현합니다. (``1.0`` 은 기록된 속도 그대로)
+        limit: 재생할 최대 메세지 수.
+    """
+    stats = ReplayStats()
+    first: Optional[float] = None
+    started = time.perf_counter()
+    for record, message in reader.messages():
+        if limit is not None and stats.messages >= limit:
+            break
+        if speed:
+            first = record.timestamp if first is None else first
+            delay = (record.timestamp - first) / speed
+            delay -= time.perf_counter() - started
+            if delay > 0:
+                time.sleep(delay)
+        with _replay_context(record.correlation_id):
+            try:
+                handle(message)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("failed to replay message: %r", message)
+                stats.errors += 1
+        stats.messages += 1
+    stats.elapsed = time.perf_counter() - started
+    return stats
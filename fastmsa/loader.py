@@ -0,0 +1,125 @@
+"""레포지터리 조회를 모아서 실행하는 DataLoader.
+
+비동기 핸들러에서 여러 코루틴이 같은 이벤트 루프 틱에 :meth:`DataLoader.load`
+를 호출하면, 요청된 키들을 모아 한 번의 :meth:`AbstractRepository.get_many`
+(``IN`` 쿼리)로 조회합니다. 조회한 객체는 로더에 캐시되므로 같은 키를 다시
+요청하면 쿼리 없이 돌려줍니다. ::
+
+    with uow:
+        loader = uow[Product].loader
+        products = await asyncio.gather(*(loader.load(sku) for sku in skus))
+
+잠금 없이 id 로 조회하는 :meth:`AbstractRepository.get` 도 로더의 캐시에서
+먼저 찾고, 조회한 객체를 캐시에 넣습니다.
+
+로더는 레포지터리마다 하나씩 만들어지므로 캐시는 UoW 세션(``with uow:`` 블록)
+동안만 유지됩니다. 세션이 바뀌면 이전 세션에서 로드한 ORM 객체를 사용할 수
+없기 때문입니다.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Generic, Iterable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class DataLoader(Generic[T]):
+    """키 목록을 한 번에 조회하는 함수를 감싸서 조회를 모으고 캐시합니다."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[Any]], Iterable[T]],
+        key_of: Callable[[T], Any],
+        max_batch_size: int = 500,
+    ):
+        """
+        Args:
+            batch_fn: 키 목록을 받아 찾은 객체들을 리턴하는 함수. 못 찾은 키는
+                결과에서 빠질 수 있습니다.
+            key_of: 객체의 키를 리턴하는 함수.
+            max_batch_size: 한 번에 조회할 최대 키 수.
+        """
+        self.batch_fn = batch_fn
+        self.key_of = key_of
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        """실행한 ``batch_fn`` 호출 수."""
+        self._cache: dict[Any, Any] = {}
+        self._pending: dict[Any, asyncio.Future] = {}
+
+    def __repr__(self):
+        return f"DataLoader[{self.batch_fn!r}]"
+
+    async def load(self, key: Any) -> Optional[T]:
+        """키에 해당하는 객체를 조회합니다. 못 찾으면 ``None``."""
+        if key in self._cache:
+            return self._cache[key]
+        if key not in self._pending:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # 같은 틱에 요청된 키들이 모두 모인 다음에 조회합니다.
+                loop.call_soon(self.dispatch)
+            self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self.dispatch()
+        return await asyncio.shield(self._pending[key])
+
+    async def load_many(self, keys: Sequence[Any]) -> list[Optional[T]]:
+        """키 목록에 해당하는 객체들을 순서대로 조회합니다."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def dispatch(self) -> None:
+        """대기 중인 키들을 바로 조회합니다."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.batches += 1
+        try:
+            found = self.fetch(list(pending))
+        except Exception as e:  # pylint: disable=broad-except
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def fetch(self, keys: Sequence[Any]) -> dict[Any, Optional[T]]:
+        """키들을 조회해서 캐시에 넣고 ``{키: 객체}`` 로 리턴합니다."""
+        result = {key: None for key in keys}
+        for item in self.batch_fn(list(keys)):
+            result[self.key_of(item)] = item
+        self._cache.update(result)
+        return result
+
+    def get(self, key: Any) -> Optional[T]:
+        """동기 버전의 :meth:`load`. 캐시에 없으면 바로 조회합니다."""
+        if key not in self._cache:
+            self.batches += 1
+            self.fetch([key])
+        return self._cache[key]
+
+    def get_many(self, keys: Sequence[Any]) -> list[Optional[T]]:
+        """동기 버전의 :meth:`load_many`. 캐시에 없는 키들만 한 번에 조회합니다."""
+        missing = [key for key in dict.fromkeys(keys) if key not in self._cache]
+        if missing:
+            self.batches += 1
+            self.fetch(missing)
+        return [self._cache[key] for key in keys]
+
+    def cached(self, key: Any) -> Optional[T]:
+        """캐시된 객체. 캐시에 없거나 못 찾은 키면 ``None``."""
+        return self._cache.get(key)
+
+    def prime(self, key: Any, value: Optional[T]) -> None:
+        """캐시에 값을 미리 넣습니다."""
+        self._cache[key] = value
+
+    def clear(self, key: Any = None) -> None:
+        """키의 캐시를 지웁니다. 키를 지정하지 않으면 모두 지웁니다."""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
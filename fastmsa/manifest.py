@@ -0,0 +1,160 @@
+"""앱 구성 모듈 매니페스트.
+
+`FastMSACommand` 가 앱을 시작할 때마다 ``domain/*.py``, ``adapters/orm*``,
+``routes/*.py``, ``handlers/*.py`` 를 glob 으로 찾고 도메인 모듈마다
+``inspect.getmembers`` 를 실행하는 대신, 한 번 찾은 결과를
+``<module_path>/__pycache__/fastmsa-manifest.json`` 에 저장해두고 재사용합니다.
+
+매니페스트에는 검색한 디렉토리와 모듈 파일의 수정 시각이 함께 기록되며,
+파일이 추가/삭제/수정되면 다음 시작시 자동으로 다시 생성됩니다.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from fastmsa.logging import get_logger
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = Path("__pycache__") / "fastmsa-manifest.json"
+
+logger = get_logger("fastmsa.manifest")
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _module_name(module_name: str, module_path: Path, path: Path) -> str:
+    parts = path.relative_to(module_path).with_suffix("").parts
+    return ".".join([module_name, *parts])
+
+
+def _scan_dir(path: Path) -> list[Path]:
+    if not path.is_dir():
+        return []
+    return sorted(p for p in path.glob("*.py") if not p.name.startswith("_"))
+
+
+@dataclass
+class AppManifest:
+    """앱을 구성하는 모듈 목록."""
+
+    domains: list[str] = field(default_factory=list)
+    """도메인 클래스 목록. ``<module>:<class>`` 형식."""
+    mappers: list[str] = field(default_factory=list)
+    """ORM 매퍼 모듈 목록."""
+    routes: list[str] = field(default_factory=list)
+    """API 라우트 모듈 목록."""
+    handlers: list[str] = field(default_factory=list)
+    """메세지 핸들러 모듈 목록."""
+    mtimes: dict[str, int] = field(default_factory=dict)
+    """매니페스트 생성시 검사한 경로별 수정 시각(ns)."""
+    version: int = MANIFEST_VERSION
+
+    def is_fresh(self) -> bool:
+        """기록된 경로들의 수정 시각이 그대로인지 여부."""
+        return self.version == MANIFEST_VERSION and all(
+            _mtime(Path(p)) == mtime for p, mtime in self.mtimes.items()
+        )
+
+    def load_domains(self) -> list[type]:
+        """도메인 클래스들을 임포트해서 리턴합니다."""
+        domains = list[type]()
+        for path in self.domains:
+            module_name, _, class_name = path.partition(":")
+            module = importlib.import_module(module_name)
+            domains.append(getattr(module, class_name))
+        return domains
+
+    @staticmethod
+    def scan(module_name: str, module_path: Path) -> AppManifest:
+        """앱 디렉토리를 검색해서 매니페스트를 새로 생성합니다."""
+        manifest = AppManifest()
+        dirs = [
+            module_path / "domain",
+            module_path / "adapters",
+            module_path / "adapters" / "orm",
+            module_path / "routes",
+            module_path / "handlers",
+        ]
+
+        def modules(paths: list[Path]) -> list[str]:
+            return [_module_name(module_name, module_path, p) for p in paths]
+
+        for domain_module in modules(_scan_dir(module_path / "domain")):
+            module = importlib.import_module(domain_module)
+            for name, member in vars(module).items():
+                if name.startswith("_") or type(member) != type:
+                    continue
+                if member.__module__ == domain_module:
+                    manifest.domains.append(f"{domain_module}:{name}")
+
+        mapper_file = module_path / "adapters" / "orm.py"
+        mapper_paths = (
+            [mapper_file]
+            if mapper_file.exists()
+            else _scan_dir(module_path / "adapters" / "orm")
+        )
+        manifest.mappers = modules(mapper_paths)
+        manifest.routes = modules(_scan_dir(module_path / "routes"))
+        manifest.handlers = modules(_scan_dir(module_path / "handlers"))
+
+        files = [
+            module_path / (m[len(module_name) + 1 :].replace(".", "/") + ".py")
+            for m in [
+                *(d.partition(":")[0] for d in manifest.domains),
+                *manifest.mappers,
+                *manifest.routes,
+                *manifest.handlers,
+            ]
+        ]
+        manifest.mtimes = {str(p): _mtime(p) for p in [*dirs, *files]}
+        return manifest
+
+    @staticmethod
+    def read(path: Path) -> Optional[AppManifest]:
+        """저장된 매니페스트를 읽습니다. 파일이 없거나 깨졌으면 ``None``."""
+        try:
+            return AppManifest(**json.loads(path.read_text(encoding="utf8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def write(self, path: Path) -> None:
+        """매니페스트를 파일에 저장합니다. 실패해도 앱 시작을 막지 않습니다."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(asdict(self), indent=2), encoding="utf8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("failed to write manifest %s: %s", path, e)
+
+
+def load_manifest(
+    module_name: str, module_path: Path, rebuild: bool = False
+) -> AppManifest:
+    """앱의 매니페스트를 리턴합니다.
+
+    저장된 매니페스트가 최신이면 그대로 사용하고, 아니면 새로 생성해서 저장합니다.
+
+    Args:
+        module_name: 앱 패키지 이름.
+        module_path: 앱 패키지 경로.
+        rebuild: ``True`` 이면 저장된 매니페스트를 무시하고 다시 생성합니다.
+    """
+    path = module_path / MANIFEST_FILE
+    manifest = None if rebuild else AppManifest.read(path)
+    if manifest and manifest.is_fresh():
+        return manifest
+
+    manifest = AppManifest.scan(module_name, module_path)
+    manifest.write(path)
+    return manifest
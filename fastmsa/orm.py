@@ -1,20 +1,38 @@
 """ORM 어댑터 모듈"""
 from __future__ import annotations
 
-import io
-import logging
-import re
+import hashlib
+import os
+import weakref
 from contextlib import AbstractContextManager, contextmanager
-from typing import Any, Callable, Generator, Optional, Type, Union, cast
-
-from sqlalchemy import MetaData, create_engine
-from sqlalchemy.engine import Engine
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator, Literal, Optional, Type, Union, cast
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    create_engine,
+    event,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import clear_mappers as _clear_mappers
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
-from sqlalchemy.pool import Pool, StaticPool
+from sqlalchemy.pool import Pool, QueuePool, StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-from fastmsa.core import AbstractFastMSA
+from fastmsa.core import AbstractFastMSA, Aggregate, ConcurrencyConflict
+from fastmsa.instrument import sql_stats
 from fastmsa.logging import get_logger
 
 logger = get_logger("fastmsa.orm")
@@ -62,6 +80,30 @@ def get_sessionmaker() -> SessionMaker:
 
 _get_session: Optional[SessionMaker] = None  # pylint: disable=invalid-name
 
+SchemaSync = Literal["fingerprint", "always", "never"]
+"""엔진 초기화시 스키마 생성 방식.
+
+- ``fingerprint``: 저장된 스키마 지문이 현재 :class:`MetaData` 와 같으면
+  ``create_all`` 을 건너뜁니다.
+- ``always``: 항상 ``create_all`` 을 실행합니다.
+- ``never``: 스키마를 생성하지 않습니다. (``msa db sync`` 로 별도 실행)
+"""
+
+SCHEMA_TABLE = "fastmsa_schema"
+"""스키마 지문을 저장하는 관리 테이블 이름."""
+
+SCHEMA_LOCK_KEY = 0x66617374
+"""스키마 동기화에 사용하는 PostgreSQL advisory lock 키."""
+
+_schema_meta = MetaData()
+schema_table = Table(
+    SCHEMA_TABLE,
+    _schema_meta,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
 
 def init_db(
     db_url: Optional[str] = None,
@@ -78,15 +120,15 @@ def init_db(
 
     metadata = start_mappers(init_hooks=init_hooks)
 
+    url = db_url if db_url else (config.get_db_url() if config else "sqlite://")
+    poolclass = config.get_db_poolclass() if config else None
     engine = init_engine(
         metadata,
-        db_url if db_url else (config.get_db_url() if config else "sqlite://"),
+        url,
         connect_args=config.get_db_connect_args() if config else None,
-        poolclass=StaticPool,
-        # poolclass=config.get_db_poolclass() if config else None,
+        poolclass=poolclass or default_poolclass(url),
         drop_all=drop_all,
         show_log=show_log,
-        # isolation_level="REPEATABLE READ",
     )
     _get_session = cast(SessionMaker, sessionmaker(engine))
     return _get_session
@@ -110,6 +152,19 @@ def start_mappers(
     return metadata
 
 
+def default_poolclass(url: str) -> Optional[Type[Pool]]:
+    """DB URL 에 맞는 커넥션 풀 클래스.
+
+    메모리 SQLite DB 는 모든 스레드가 같은 DB 를 보도록 커넥션 하나를 공유하는
+    :class:`StaticPool`, SQLite 파일 DB 는 방언의 기본값, 그 외에는 스레드마다
+    별도 커넥션을 쓰는 :class:`QueuePool` 을 사용합니다.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return QueuePool
+    return StaticPool if _is_memory_url(parsed) else None
+
+
 def clear_mappers() -> None:
     """ORM 매핑을 초기화 합니다."""
     _clear_mappers()
@@ -123,14 +178,22 @@ def init_engine(
     show_log: Union[bool, dict[str, Any]] = False,
     isolation_level: Optional[str] = None,
     drop_all: bool = False,
+    instrument: bool = True,
+    sync: SchemaSync = "fingerprint",
+    schema_cache: Optional[Path] = None,
 ) -> Engine:
     """ORM Engine을 초기화 합니다.
 
-    TODO: 상세 설명 추가.
+    Args:
+        show_log: ``True`` 면 생성된 테이블의 ``CREATE`` 문을 출력하고,
+            ``{"all": True}`` 면 스키마 생성 중 실행된 모든 SQL 을 출력합니다.
+        instrument: 엔진을 :data:`fastmsa.instrument.sql_stats` 에 연결하여 SQL
+            실행 통계를 기록합니다.
+        sync: 스키마 생성 방식. 기본값은 스키마 지문이 바뀐 경우에만 테이블을
+            생성하는 ``fingerprint`` 입니다. (:data:`SchemaSync` 참고)
+        schema_cache: 스키마 지문을 캐시할 로컬 파일 경로. 지정하면 지문이 같을 때
+            DB에 질의하지 않고 바로 시작합니다.
     """
-    logger = logging.getLogger("sqlalchemy.engine.base.Engine")
-    out = io.StringIO()
-    logger.addHandler(logging.StreamHandler(out))
     engine = create_engine(
         url,
         connect_args=connect_args or {},
@@ -139,22 +202,248 @@ def init_engine(
         isolation_level=isolation_level,
     )
 
+    statements = list[str]()
+
+    def capture_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    if show_log:
+        event.listen(engine, "before_cursor_execute", capture_statement)
+
     if drop_all:
         meta.drop_all(engine)
 
-    meta.create_all(engine)
+    if drop_all or sync == "always":
+        sync_schema(engine, meta, force=True, cache_file=schema_cache)
+    elif sync == "fingerprint":
+        sync_schema(engine, meta, cache_file=schema_cache)
 
     if show_log:
-        log_txt = out.getvalue()
+        event.remove(engine, "before_cursor_execute", capture_statement)
         if show_log is True:
-            print("".join(re.findall("CREATE.*?\n\n", log_txt, re.DOTALL | re.I)))
+            ddl = [s.strip() for s in statements if s.lstrip()[:6].upper() == "CREATE"]
+            print("\n\n".join(ddl))
         elif isinstance(show_log, dict):
             if show_log.get("all"):
-                print(log_txt)
+                print("\n".join(statements))
+
+    if instrument:
+        sql_stats.attach(engine)
 
+    _engines.add(engine)
     return engine
 
 
+_engines: weakref.WeakSet[Engine] = weakref.WeakSet()
+""":func:`init_engine` 으로 생성된 엔진 목록. fork 후 커넥션 풀을 재생성할 때 사용."""
+
+
+def reset_engines_after_fork() -> None:
+    """fork 된 자식 프로세스에서 부모로부터 복사된 커넥션 풀을 버립니다.
+
+    부모의 커넥션을 닫지 않고(``close=False``) 풀만 새로 만들기 때문에, 자식
+    프로세스는 처음 요청할 때 자신만의 커넥션을 새로 엽니다.
+    """
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_engines_after_fork)
+
+
+def warm_up_pool(engine: Engine, connections: int = 1) -> int:
+    """커넥션 풀에 미리 커넥션을 열어둡니다.
+
+    Args:
+        connections: 미리 열어둘 커넥션 수. 풀의 크기를 넘으면 풀의 크기만큼
+            엽니다.
+
+    Returns:
+        실제로 열린 커넥션 수.
+    """
+    # QueuePool 이 아니면 (NullPool, StaticPool 등) 접속 확인만 합니다.
+    size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    opened = []
+    try:
+        for _ in range(max(1, min(connections, size))):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+_savepoint_engines: weakref.WeakSet[Engine] = weakref.WeakSet()
+
+
+def enable_sqlite_savepoints(engine: Engine) -> None:
+    """pysqlite 엔진에서 ``SAVEPOINT`` 가 바깥 트랜잭션 안에서 동작하도록 합니다.
+
+    pysqlite 는 DML 을 실행할 때 트랜잭션을 시작하므로 그 전에 실행된
+    ``SAVEPOINT`` 가 바깥 트랜잭션이 되고, ``RELEASE`` 시점에 바로 커밋됩니다.
+    드라이버의 트랜잭션 처리를 끄고 SqlAlchemy 트랜잭션이 시작될 때 직접
+    ``BEGIN`` 을 실행합니다. SQLite 가 아닌 엔진은 그대로 둡니다.
+    """
+    if engine.dialect.driver != "pysqlite" or engine in _savepoint_engines:
+        return
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.connection.dbapi_connection.isolation_level = None
+        conn.exec_driver_sql("BEGIN")
+
+    _savepoint_engines.add(engine)
+
+
+def schema_fingerprint(meta: MetaData, engine: Engine) -> str:
+    """DB 방언으로 컴파일한 테이블/인덱스 DDL 의 SHA-256 해시를 리턴합니다."""
+
+    def ddl(element: Any) -> bytes:
+        return str(element.compile(dialect=engine.dialect)).encode()
+
+    digest = hashlib.sha256(engine.url.drivername.encode())
+    for table in sorted(meta.tables.values(), key=lambda t: t.fullname):
+        digest.update(ddl(CreateTable(table)))
+        for index in sorted(table.indexes, key=lambda i: str(i.name)):
+            digest.update(ddl(CreateIndex(index)))
+    return digest.hexdigest()
+
+
+def _is_memory_db(engine: Engine) -> bool:
+    return _is_memory_url(engine.url)
+
+
+def _is_memory_url(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _read_fingerprint(engine: Engine) -> Optional[str]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_table.c.fingerprint)).scalar()
+    except DBAPIError:  # 관리 테이블이 아직 없는 경우
+        return None
+
+
+def _write_fingerprint(conn: Connection, fingerprint: str) -> None:
+    values = dict(fingerprint=fingerprint, updated_at=datetime.utcnow())
+    query = schema_table.update().where(schema_table.c.id == 1).values(**values)
+    if not conn.execute(query).rowcount:
+        conn.execute(schema_table.insert().values(id=1, **values))
+
+
+def _lock_schema(conn: Connection) -> None:
+    """트랜잭션이 끝날 때까지 다른 프로세스의 스키마 동기화를 기다리게 합니다.
+
+    PostgreSQL 은 advisory lock, SQLite 파일 DB 는 ``BEGIN IMMEDIATE`` 의 쓰기
+    잠금을 사용합니다. 그 외의 DB 는 잠그지 않으며 지문을 동시에 추가하다 발생한
+    :class:`IntegrityError` 는 :func:`sync_schema` 가 처리합니다.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(SCHEMA_LOCK_KEY)))
+    elif conn.dialect.name == "sqlite" and not _is_memory_url(conn.engine.url):
+        # enable_sqlite_savepoints() 가 적용된 엔진은 이미 BEGIN 을 실행했습니다.
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def sync_schema(
+    engine: Engine,
+    meta: MetaData,
+    force: bool = False,
+    cache_file: Optional[Path] = None,
+) -> bool:
+    """스키마 지문이 바뀐 경우에만 ``create_all`` 을 실행합니다.
+
+    ``create_all`` 은 테이블마다 존재 여부를 질의하므로 테이블이 많을수록 시작이
+    느려집니다. 대신 :class:`MetaData` 의 지문을 ``fastmsa_schema`` 테이블(과
+    ``cache_file``)에 저장해두고 지문이 같으면 한 번의 질의로 끝냅니다.
+
+    여러 워커가 동시에 시작해도 스키마 생성은 잠금으로 직렬화되며, 잠금을 얻은
+    뒤 지문을 다시 확인하므로 먼저 동기화한 워커만 ``create_all`` 을 실행합니다.
+
+    Returns:
+        ``create_all`` 을 실행했으면 ``True``.
+    """
+    fingerprint = schema_fingerprint(meta, engine)
+    use_cache = cache_file and not _is_memory_db(engine)
+
+    if not force:
+        if use_cache and cache_file and cache_file.exists():
+            if cache_file.read_text().strip() == fingerprint:
+                return False
+        if _read_fingerprint(engine) == fingerprint:
+            if use_cache and cache_file:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(fingerprint)
+            return False
+
+    created = True
+    try:
+        with engine.begin() as conn:
+            _lock_schema(conn)
+            _schema_meta.create_all(conn)
+            query = select(schema_table.c.fingerprint)
+            if not force and conn.execute(query).scalar() == fingerprint:
+                created = False  # 다른 워커가 먼저 동기화했습니다.
+            else:
+                logger.debug("schema changed, creating tables: %s", fingerprint)
+                meta.create_all(conn)
+                _write_fingerprint(conn, fingerprint)
+    except IntegrityError:
+        # 잠금이 없는 DB 에서 다른 워커가 동시에 지문을 추가한 경우.
+        if _read_fingerprint(engine) != fingerprint:
+            raise
+        created = False
+
+    if use_cache and cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(fingerprint)
+    return created
+
+
+@event.listens_for(Session, "before_flush")
+def check_aggregate_versions(session: Session, flush_context: Any, instances: Any):
+    """버전 필드가 변경된 Aggregate 의 버전을 검사합니다.
+
+    :attr:`Aggregate.version_field` 가 지정된 Aggregate 의 버전이 바뀌었다면,
+    flush 전에 버전을 바꾸지 않는 ``UPDATE ... SET <version_field> =
+    <version_field> WHERE <pk> AND <version_field> = :old`` 로 행을 잠그고 이전
+    버전을 확인합니다. 갱신된 행이 없다면 다른 트랜잭션이 먼저 변경한 것이므로
+    :class:`ConcurrencyConflict` 를 발생시킵니다. 새 버전은 flush 의 ``UPDATE``
+    에서 한 번만 기록됩니다.
+    """
+    for obj in session.dirty:
+        if not isinstance(obj, Aggregate) or not obj.version_field:
+            continue
+
+        state = inspect(obj)
+        history = state.attrs[obj.version_field].history
+        if not state.persistent or not history.deleted:
+            continue
+
+        mapper = state.mapper
+        version_col = mapper.columns[obj.version_field]
+        old_version = history.deleted[0]
+        pk_values = mapper.primary_key_from_instance(obj)
+        stmt = (
+            mapper.local_table.update()
+            .where(
+                and_(*[col == val for col, val in zip(mapper.primary_key, pk_values)]),
+                version_col == old_version,
+            )
+            .values({version_col.name: version_col})
+        )
+        if session.connection(mapper=mapper).execute(stmt).rowcount != 1:
+            raise ConcurrencyConflict(
+                f"{type(obj).__name__}{pk_values} was modified concurrently"
+                f" (expected {obj.version_field}={old_version!r})"
+            )
+
+
 def get_scoped_session(engine: Engine) -> Callable[[], ScopedSession]:
     """``with...`` 문으로 자동 리소스가 반환되는 세션을 리턴합니다.
 
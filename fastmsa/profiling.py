@@ -0,0 +1,198 @@
+"""핸들러와 라우트 프로파일링(``msa profile``).
+
+주어진 연산(메세지 처리, API 요청)을 여러 번 반복 실행하면서 다음을 수집합니다.
+
+- cProfile 통계 (``profile.pstats``, ``profile.txt``)
+- flamegraph 호환 collapsed stack (``stacks.collapsed``). 별도 스레드에서 실행 중인
+  스택을 주기적으로 샘플링합니다. ``flamegraph.pl stacks.collapsed > out.svg``
+- tracemalloc 메모리 할당 통계 (``alloc.txt``)
+- SQL 문장별 실행 통계 (``sql.json``, :data:`fastmsa.instrument.sql_stats`)
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from fastmsa.instrument import sql_stats
+
+if TYPE_CHECKING:
+    from sqlalchemy import MetaData
+    from sqlalchemy.engine import Engine
+
+
+class StackSampler:
+    """대상 스레드의 호출 스택을 주기적으로 샘플링합니다."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter[str]()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="fastmsa-stack-sampler", daemon=True
+        )
+
+    def __enter__(self) -> StackSampler:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame:
+                self.stacks[self.collapse(frame)] += 1
+
+    @staticmethod
+    def collapse(frame: Optional[FrameType]) -> str:
+        """프레임을 ``바깥;...;안쪽`` 형식의 collapsed stack 으로 변환합니다."""
+        names = []
+        while frame:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}.{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+@dataclass
+class ProfileReport:
+    """프로파일링 결과."""
+
+    runs: int
+    elapsed: float
+    stats: pstats.Stats
+    stacks: Counter[str] = field(default_factory=Counter)
+    allocations: list[tracemalloc.Statistic] = field(default_factory=list)
+    sql: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def per_run(self) -> float:
+        return self.elapsed / self.runs if self.runs else 0.0
+
+    def stats_text(self, sort="cumulative", limit=30) -> str:
+        out = io.StringIO()
+        self.stats.stream = out  # type: ignore
+        self.stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def collapsed_stacks(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def allocations_text(self, limit=30) -> str:
+        return "".join(f"{stat}\n" for stat in self.allocations[:limit])
+
+    def sql_breakdown(self, limit=10) -> list[tuple[str, dict[str, Any]]]:
+        """총 실행 시간이 긴 순서의 SQL 문장 목록."""
+        statements = self.sql.get("statements", {})
+        return sorted(statements.items(), key=lambda it: -it[1]["total"])[:limit]
+
+    def save(self, out_dir: Path) -> list[Path]:
+        """결과를 ``out_dir`` 에 파일들로 저장하고 경로 목록을 리턴합니다."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "profile.txt": self.stats_text(),
+            "stacks.collapsed": self.collapsed_stacks(),
+            "alloc.txt": self.allocations_text(),
+            "sql.json": json.dumps(self.sql, indent=2),
+        }
+        for name, text in paths.items():
+            (out_dir / name).write_text(text, encoding="utf8")
+        self.stats.dump_stats(str(out_dir / "profile.pstats"))
+        return [out_dir / "profile.pstats", *(out_dir / name for name in paths)]
+
+
+def profile(
+    op: Callable[[], Any],
+    runs: int = 100,
+    sample_interval: float = 0.001,
+    trace_alloc: bool = True,
+) -> ProfileReport:
+    """``op`` 을 ``runs`` 번 실행하면서 프로파일링합니다.
+
+    Args:
+        sample_interval: collapsed stack 샘플링 주기(초).
+        trace_alloc: tracemalloc 으로 메모리 할당을 추적할지 여부. 실행이 느려집니다.
+    """
+    sql_stats.reset()
+    if trace_alloc:
+        tracemalloc.start(25)
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        with StackSampler(interval=sample_interval) as sampler:
+            profiler.enable()
+            for _ in range(runs):
+                op()
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        allocations = []
+        if trace_alloc:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                ]
+            )
+            allocations = snapshot.statistics("lineno")
+    finally:
+        if trace_alloc:
+            tracemalloc.stop()
+
+    return ProfileReport(
+        runs=runs,
+        elapsed=elapsed,
+        stats=pstats.Stats(profiler),
+        stacks=sampler.stacks,
+        allocations=allocations,
+        sql=sql_stats.snapshot(),
+    )
+
+
+def clone_database(src_url: str, metadata: MetaData, copy_data=True) -> Engine:
+    """메모리 SQLite DB 에 스키마를 만들고 원본 DB 의 데이터를 복사합니다.
+
+    Args:
+        src_url: 복사할 원본 DB URL.
+        copy_data: ``False`` 면 빈 스키마만 만듭니다.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    from fastmsa.orm import init_engine
+
+    engine = init_engine(
+        metadata,
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        sync="always",
+    )
+    if not copy_data:
+        return engine
+
+    src = create_engine(src_url)
+    try:
+        with src.connect() as src_conn, engine.begin() as conn:
+            for table in metadata.sorted_tables:
+                rows = [dict(r._mapping) for r in src_conn.execute(table.select())]
+                if rows:
+                    conn.execute(table.insert(), rows)
+    finally:
+        src.dispose()
+    return engine
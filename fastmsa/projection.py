@@ -0,0 +1,518 @@
+"""CQRS 읽기 모델 프로젝션.
+
+핸들러에서 이벤트마다 ``INSERT``/``DELETE`` 와 커밋을 실행하는 대신, 프로젝션을
+선언하면 :class:`ProjectionEngine` 이 이벤트를 작은 배치로 모아서 여러 행을 한
+번에 upsert/삭제합니다. ::
+
+    allocations = Projection("allocations_view", key=["orderid", "sku"])
+
+    @allocations.upsert(events.Allocated)
+    def _(e):
+        return dict(orderid=e.orderid, sku=e.sku, batchref=e.batchref)
+
+    @allocations.delete(events.Deallocated)
+    def _(e):
+        return dict(orderid=e.orderid, sku=e.sku)
+
+    engine = ProjectionEngine(db_engine, [allocations], metadata)
+    engine.attach(messagebus)  # 메세지 버스의 이벤트를 주기적으로 반영
+
+이벤트 저장소(:mod:`fastmsa.eventsource`)나 메세지 저널(:mod:`fastmsa.journal`)을
+원본으로 :meth:`ProjectionEngine.run` 으로 밀린 이벤트를 반영하거나,
+:meth:`ProjectionEngine.rebuild` 로 읽기 모델을 처음부터 다시 만들 수 있습니다.
+반영한 위치는 ``fastmsa_projections`` 테이블에 읽기 모델과 같은 트랜잭션으로
+기록됩니다.
+
+upsert 와 키 삭제는 멱등이므로 같은 이벤트가 여러 번 반영되어도 결과가 같습니다.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    select,
+    tuple_,
+)
+
+from fastmsa.core import Event, FastMSAError
+from fastmsa.logging import get_logger
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine
+
+    from fastmsa.event import MessageBus
+
+logger = get_logger("fastmsa.projection")
+
+EV = TypeVar("EV", bound=Event)
+Row = dict[str, Any]
+Op = tuple[tuple[Any, ...], Optional[Row]]
+"""``(키, 행)``. 행이 ``None`` 이면 삭제."""
+
+checkpoint_metadata = MetaData()
+
+checkpoints_table = Table(
+    "fastmsa_projections",
+    checkpoint_metadata,
+    Column("name", String(255), primary_key=True),
+    Column("position", Integer, nullable=False),
+    Column("updated", DateTime, nullable=False),
+)
+"""프로젝션별로 마지막으로 반영한 원본 위치."""
+
+
+class Projection:
+    """읽기 모델 테이블과 이벤트 → 행 매핑 선언."""
+
+    def __init__(self, table: Union[str, Table], key: Sequence[str]):
+        """
+        Args:
+            table: 대상 테이블 또는 테이블 이름. 이름이면 :class:`ProjectionEngine`
+                의 ``metadata`` 에서 찾습니다.
+            key: 행을 식별하는 컬럼들. upsert 에 ``ON CONFLICT`` 를 사용하려면
+                키 컬럼에 PK 나 유니크 제약이 있어야 합니다.
+        """
+        self.name = table if isinstance(table, str) else table.name
+        self.table = table if isinstance(table, Table) else None
+        self.key = tuple(key)
+        self.upserts: dict[Type[Event], Callable[[Any], Optional[Row]]] = {}
+        self.deletes: dict[Type[Event], Callable[[Any], Optional[Row]]] = {}
+
+    def __repr__(self):
+        return f"Projection[{self.name}]"
+
+    def upsert(
+        self, etype: Type[EV]
+    ) -> Callable[[Callable[[EV], Optional[Row]]], Callable[[EV], Optional[Row]]]:
+        """이벤트를 upsert 할 행으로 변환하는 함수를 등록합니다."""
+
+        def _wrapper(func):
+            self.upserts[etype] = func
+            return func
+
+        return _wrapper
+
+    def delete(
+        self, etype: Type[EV]
+    ) -> Callable[[Callable[[EV], Optional[Row]]], Callable[[EV], Optional[Row]]]:
+        """이벤트를 삭제할 행의 키 값으로 변환하는 함수를 등록합니다."""
+
+        def _wrapper(func):
+            self.deletes[etype] = func
+            return func
+
+        return _wrapper
+
+    @property
+    def event_types(self) -> set[Type[Event]]:
+        return set(self.upserts) | set(self.deletes)
+
+    def op_of(self, event: Event) -> Optional[Op]:
+        """이벤트를 행 변경으로 변환합니다. 관련없는 이벤트면 ``None``."""
+        etype = type(event)
+        if etype in self.upserts:
+            row = self.upserts[etype](event)
+        elif etype in self.deletes:
+            row = self.deletes[etype](event)
+        else:
+            return None
+        if row is None:
+            return None
+        key = tuple(row[k] for k in self.key)
+        return key, (row if etype in self.upserts else None)
+
+
+def collapse(ops: Iterable[Op]) -> dict[tuple[Any, ...], Optional[Row]]:
+    """같은 키에 대한 변경을 합쳐서 키별 최종 상태만 남깁니다."""
+    result: dict[tuple[Any, ...], Optional[Row]] = {}
+    for key, row in ops:
+        prev = result.get(key)
+        result[key] = {**prev, **row} if prev and row else row
+    return result
+
+
+@dataclass
+class ProjectionStats:
+    """프로젝션 반영 통계."""
+
+    events: int = 0
+    """반영한 이벤트 수."""
+    rows: int = 0
+    """실제로 쓰거나 삭제한 행 수 (같은 키의 변경은 합쳐짐)."""
+    batches: int = 0
+    """실행한 트랜잭션 수."""
+    elapsed: float = 0.0
+    position: int = 0
+    """마지막으로 반영한 원본 위치."""
+
+
+def event_store_source(
+    engine: Engine, after: int = 0, page_size: int = 1000
+) -> Iterator[tuple[int, Event]]:
+    """이벤트 저장소의 ``fastmsa_events`` 를 전체 순서(``id``)대로 읽습니다."""
+    from fastmsa import serialize
+    from fastmsa.eventsource import events_table
+
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(events_table.c.id, events_table.c.payload)
+                .where(events_table.c.id > after)
+                .order_by(events_table.c.id)
+                .limit(page_size)
+            ).all()
+        for position, payload in rows:
+            yield position, serialize.loads(payload)  # type: ignore
+        if len(rows) < page_size:
+            return
+        after = rows[-1][0]
+
+
+def journal_source(
+    path: Union[str, Path], after: int = 0, candidates: Iterable[type] = ()
+) -> Iterator[tuple[int, Event]]:
+    """메세지 저널에 기록된 이벤트를 읽습니다. 위치는 저널 레코드의 순번입니다."""
+    from fastmsa.journal import JournalReader
+
+    messages = JournalReader(path, candidates).messages()
+    for position, (_, message) in enumerate(messages, 1):
+        if position > after and isinstance(message, Event):
+            yield position, message
+
+
+class ProjectionEngine:
+    """프로젝션들에 이벤트를 배치 단위로 반영합니다."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        projections: Sequence[Projection],
+        metadata: Optional[MetaData] = None,
+        batch_size: int = 500,
+    ):
+        """
+        Args:
+            metadata: 테이블 이름으로 선언된 프로젝션의 테이블을 찾을 메타데이터.
+            batch_size: 한 트랜잭션에 반영할 최대 이벤트 수.
+        """
+        self.engine = engine
+        self.projections = list(projections)
+        self.batch_size = batch_size
+        for p in self.projections:
+            if p.table is None:
+                if not metadata or p.name not in metadata.tables:
+                    raise FastMSAError(f"table not found for {p!r}")
+                p.table = metadata.tables[p.name]
+        self.by_type: dict[Type[Event], list[Projection]] = {}
+        for p in self.projections:
+            for etype in p.event_types:
+                self.by_type.setdefault(etype, []).append(p)
+        checkpoints_table.create(engine, checkfirst=True)
+
+        self._buffer = list[Event]()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # 반영
+
+    def apply(
+        self, events: Sequence[Event], position: Optional[int] = None
+    ) -> ProjectionStats:
+        """이벤트들을 하나의 트랜잭션으로 반영합니다.
+
+        Args:
+            position: 지정하면 프로젝션들의 체크포인트를 같은 트랜잭션에서 갱신합니다.
+        """
+        stats = self._apply_ops(self.ops_of(events), position)
+        stats.events = len(events)
+        return stats
+
+    def ops_of(self, events: Iterable[Event]) -> dict[Projection, list[Op]]:
+        """이벤트들을 프로젝션별 행 변경 목록으로 변환합니다."""
+        ops: dict[Projection, list[Op]] = {p: [] for p in self.projections}
+        for event in events:
+            for p in self.by_type.get(type(event), ()):
+                op = p.op_of(event)
+                if op:
+                    ops[p].append(op)
+        return ops
+
+    def _apply_ops(
+        self, ops: dict[Projection, list[Op]], position: Optional[int] = None
+    ) -> ProjectionStats:
+        stats = ProjectionStats(batches=1)
+        with self.engine.begin() as conn:
+            for p, p_ops in ops.items():
+                stats.rows += self._write(conn, p, collapse(p_ops))
+            if position is not None:
+                names = [p.name for p in self.projections]
+                self._save_checkpoints(conn, names, position)
+                stats.position = position
+        return stats
+
+    def _write(
+        self,
+        conn: Connection,
+        p: Projection,
+        changes: dict[tuple[Any, ...], Optional[Row]],
+    ) -> int:
+        assert p.table is not None
+        deleted = [k for k, row in changes.items() if row is None]
+        upserted = [row for row in changes.values() if row is not None]
+        if deleted:
+            cols = [p.table.c[k] for k in p.key]
+            where = (
+                cols[0].in_([k[0] for k in deleted])
+                if len(cols) == 1
+                else tuple_(*cols).in_(deleted)
+            )
+            conn.execute(p.table.delete().where(where))
+        # 여러 행 INSERT 는 컬럼 구성이 같은 행끼리만 가능합니다.
+        groups: dict[frozenset[str], list[Row]] = {}
+        for row in upserted:
+            groups.setdefault(frozenset(row), []).append(row)
+        for rows in groups.values():
+            self._upsert(conn, p, rows)
+        return len(changes)
+
+    def _upsert(self, conn: Connection, p: Projection, rows: list[Row]) -> None:
+        assert p.table is not None
+        dialect = conn.dialect.name
+        if dialect in ("postgresql", "sqlite") and _has_unique(p.table, p.key):
+            insert = importlib.import_module(f"sqlalchemy.dialects.{dialect}").insert
+            stmt = insert(p.table).values(rows)
+            update = {c: stmt.excluded[c] for c in rows[0] if c not in p.key}
+            conn.execute(
+                stmt.on_conflict_do_update(index_elements=p.key, set_=update)
+                if update
+                else stmt.on_conflict_do_nothing(index_elements=p.key)
+            )
+            return
+
+        # ON CONFLICT 를 사용할 수 없으면 키로 지운 후 다시 추가합니다.
+        cols = [p.table.c[k] for k in p.key]
+        keys = [tuple(row[k] for k in p.key) for row in rows]
+        conn.execute(p.table.delete().where(tuple_(*cols).in_(keys)))
+        conn.execute(p.table.insert(), rows)
+
+    # 체크포인트
+
+    def checkpoint(self, name: str) -> int:
+        """프로젝션이 마지막으로 반영한 원본 위치. 없으면 ``0``."""
+        with self.engine.connect() as conn:
+            position = conn.execute(
+                select(checkpoints_table.c.position).where(
+                    checkpoints_table.c.name == name
+                )
+            ).scalar()
+        return position or 0
+
+    def _save_checkpoints(
+        self, conn: Connection, names: Sequence[str], position: int
+    ) -> None:
+        now = datetime.utcnow()
+        _delete_checkpoints(conn, names)
+        conn.execute(
+            checkpoints_table.insert(),
+            [dict(name=name, position=position, updated=now) for name in names],
+        )
+
+    # 원본에서 반영
+
+    def run(
+        self,
+        source: Callable[[int], Iterable[tuple[int, Event]]],
+        workers: int = 1,
+        chunk_size: int = 10_000,
+    ) -> ProjectionStats:
+        """원본에서 체크포인트 이후의 이벤트를 읽어서 반영합니다.
+
+        Args:
+            source: 위치를 받아 그 이후의 ``(위치, 이벤트)`` 를 순서대로 리턴하는
+                함수. 예: ``lambda after: event_store_source(engine, after)``
+            workers: 병렬로 반영할 스레드 수. ``chunk_size`` 개의 이벤트를 키의
+                해시로 나누어 반영하므로 같은 키의 변경 순서는 유지됩니다.
+        """
+        started = time.perf_counter()
+        stats = ProjectionStats()
+        after = min(self.checkpoint(p.name) for p in self.projections)
+        stats.position = after
+        chunk = list[tuple[int, Event]]()
+        pool = ThreadPoolExecutor(workers) if workers > 1 else None
+        try:
+            for item in source(after):
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    self._run_chunk(chunk, pool, workers, stats)
+                    chunk = []
+            if chunk:
+                self._run_chunk(chunk, pool, workers, stats)
+        finally:
+            if pool:
+                pool.shutdown()
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def _run_chunk(
+        self,
+        chunk: list[tuple[int, Event]],
+        pool: Optional[ThreadPoolExecutor],
+        workers: int,
+        stats: ProjectionStats,
+    ) -> None:
+        events = [event for _, event in chunk]
+        position = chunk[-1][0]
+        if not pool:
+            for i in range(0, len(events), self.batch_size):
+                batch = events[i : i + self.batch_size]
+                last = position if i + self.batch_size >= len(events) else None
+                self._add_stats(stats, self.apply(batch, last))
+            stats.position = position
+            return
+
+        # 같은 키의 변경이 같은 워커에서 순서대로 반영되도록 키로 나눕니다.
+        parts: list[dict[Projection, list[Op]]] = [{} for _ in range(workers)]
+        for p, p_ops in self.ops_of(events).items():
+            for op in p_ops:
+                part = parts[hash((p.name, op[0])) % workers]
+                part.setdefault(p, []).append(op)
+
+        def apply_part(part: dict[Projection, list[Op]]) -> list[ProjectionStats]:
+            return [
+                self._apply_ops({p: p_ops[i : i + self.batch_size]})
+                for p, p_ops in part.items()
+                for i in range(0, len(p_ops), self.batch_size)
+            ]
+
+        stats.events += len(events)
+        for results in pool.map(apply_part, parts):
+            for result in results:
+                self._add_stats(stats, result)
+        # 모든 워커가 끝난 후에 체크포인트를 갱신합니다.
+        with self.engine.begin() as conn:
+            self._save_checkpoints(conn, [p.name for p in self.projections], position)
+        stats.position = position
+
+    @staticmethod
+    def _add_stats(stats: ProjectionStats, result: ProjectionStats) -> None:
+        stats.events += result.events
+        stats.rows += result.rows
+        stats.batches += result.batches
+
+    def rebuild(
+        self,
+        source: Callable[[int], Iterable[tuple[int, Event]]],
+        workers: int = 4,
+        chunk_size: int = 10_000,
+    ) -> ProjectionStats:
+        """읽기 모델 테이블을 비우고 원본의 처음부터 다시 반영합니다."""
+        names = [p.name for p in self.projections]
+        with self.engine.begin() as conn:
+            for p in self.projections:
+                assert p.table is not None
+                conn.execute(p.table.delete())
+            _delete_checkpoints(conn, names)
+        return self.run(source, workers=workers, chunk_size=chunk_size)
+
+    # 메세지 버스 연동
+
+    def attach(self, bus: MessageBus, interval: float = 0.05) -> None:
+        """메세지 버스의 이벤트를 버퍼에 모아 ``interval`` 초마다 반영합니다.
+
+        버퍼가 ``batch_size`` 만큼 차면 바로 반영합니다. 읽기 모델은 최대
+        ``interval`` 초 늦게 갱신됩니다.
+        """
+        for etype in self.by_type:
+            bus.register(etype, self._enqueue)
+        self._stop.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            args=(interval,),
+            name="fastmsa-projection",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _enqueue(self, event: Event) -> None:
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("failed to apply projections: %r", self)
+
+    def flush(self) -> Optional[ProjectionStats]:
+        """버퍼에 모인 이벤트를 반영합니다.
+
+        반영에 실패하면 이벤트들을 버퍼 앞에 되돌려 놓고 예외를 다시 발생시킵니다.
+        """
+        # 먼저 꺼낸 배치가 먼저 커밋되도록 반영을 직렬화합니다.
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return None
+            try:
+                return self.apply(events)
+            except BaseException:
+                with self._lock:
+                    self._buffer[:0] = events
+                raise
+
+    def close(self) -> None:
+        """주기적인 반영을 멈추고 남은 이벤트를 반영합니다."""
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+
+def _delete_checkpoints(conn: Connection, names: Sequence[str]) -> None:
+    conn.execute(checkpoints_table.delete().where(checkpoints_table.c.name.in_(names)))
+
+
+def _has_unique(table: Table, key: Sequence[str]) -> bool:
+    """키 컬럼들에 PK 나 유니크 제약/인덱스가 있는지 확인합니다."""
+    key_set = set(key)
+    if {c.name for c in table.primary_key.columns} == key_set:
+        return True
+    for constraint in table.constraints:
+        cols = {c.name for c in getattr(constraint, "columns", ())}
+        if cols == key_set and type(constraint).__name__ == "UniqueConstraint":
+            return True
+    return any(
+        idx.unique and {c.name for c in idx.columns} == key_set for idx in table.indexes
+    )
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
+import weakref
 from dataclasses import asdict, dataclass, is_dataclass
-from typing import Callable, Optional, Any
+from typing import Any, Callable, Optional
 
 import aioredis  # type: ignore
 
@@ -87,12 +89,15 @@ class AsyncRedisClient(AbstractPubsubClient):
         self.url = info.url
         self.info = info
         self.redis = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        """커넥션 풀이 묶인 이벤트 루프. 풀을 만들 때 설정됩니다."""
         self.handler = handlers
+        _clients.add(self)
 
     async def subscribe_to(self, *channels):
         str_channels: list[str] = [(ch.__name__ if type(ch) == type else ch) for ch in channels]  # type: ignore
         if not self.redis:
-            self.redis = await aioredis.create_redis_pool(self.url)
+            await self._create_pool()
         self.channels = await self.redis.subscribe(*str_channels)
         assert isinstance(self.channels[0], aioredis.Channel)
         return AsyncRedisListener(self, self.channels, self.handler)
@@ -104,9 +109,13 @@ class AsyncRedisClient(AbstractPubsubClient):
         if is_dataclass(message):
             data = asdict(message)
         if not self.redis:
-            self.redis = await aioredis.create_redis_pool(self.url)
+            await self._create_pool()
         await self.redis.publish(channel, json.dumps(data))
 
+    async def _create_pool(self):
+        self.redis = await aioredis.create_redis_pool(self.url)
+        self.loop = asyncio.get_running_loop()
+
     def publish_message_sync(self, channel, message):
         if type(channel) == type:
             channel = channel.__name__
@@ -118,6 +127,13 @@ class AsyncRedisClient(AbstractPubsubClient):
 
         if loop and loop.is_running():
             loop.create_task(self.publish_message(channel, message))
+        elif self.redis and self.loop and self.loop.is_running():
+            # 루프가 없는 스레드(워커의 동기 핸들러 등)에서는 풀이 묶인 루프에서
+            # 발행합니다. 다른 루프에서 풀을 사용하면 에러가 발생합니다.
+            future = asyncio.run_coroutine_threadsafe(
+                self.publish_message(channel, message), self.loop
+            )
+            future.result()
         else:
             asyncio.run(self.publish_message(channel, message))
 
@@ -127,6 +143,24 @@ class AsyncRedisClient(AbstractPubsubClient):
             await self.redis.wait_closed()
 
 
+_clients: weakref.WeakSet[AsyncRedisClient] = weakref.WeakSet()
+
+
+def reset_clients_after_fork() -> None:
+    """fork 된 자식 프로세스에서 부모의 Redis 커넥션 풀을 버립니다.
+
+    풀은 부모의 소켓과 이벤트 루프에 묶여있으므로 닫지 않고 참조만 끊습니다.
+    다음 요청시 자식 프로세스의 풀이 새로 만들어집니다.
+    """
+    for client in list(_clients):
+        client.redis = None
+        client.loop = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_clients_after_fork)
+
+
 class RedisMessageBroker(AbstractMessageBroker):
     """Redis로 구현된 외부 메세지 브로커입니다."""
 
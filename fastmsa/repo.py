@@ -1,15 +1,24 @@
 """레포지터리 패턴 구현."""
 from __future__ import annotations
 
-from typing import List, Optional, Type, TypeVar
+from typing import Any, List, Optional, Sequence, Type, TypeVar
 
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
-from fastmsa.core import AbstractRepository, Entity
+from fastmsa.core import AbstractRepository, Entity, LockMode
 from fastmsa.orm import get_sessionmaker
 
 E = TypeVar("E", bound=Entity)
 
+FOR_UPDATE_ARGS: dict[str, dict[str, bool]] = {
+    "update": {},
+    "nowait": {"nowait": True},
+    "skip_locked": {"skip_locked": True},
+    "share": {"read": True},
+}
+""":data:`LockMode` 별 ``Query.with_for_update()`` 인자."""
+
 
 class SqlAlchemyRepository(AbstractRepository[E]):
     """SqlAlchemy ORM을 저장소로 하는 :class:`AbstractRepository` 구현입니다."""
@@ -44,8 +53,55 @@ class SqlAlchemyRepository(AbstractRepository[E]):
         filter_by = {k: v for k, v in kwargs.items() if v is not None}
         return self.session.query(self.entity_class).filter_by(**filter_by).first()
 
+    def _get_locked(
+        self, id: str = "", lock: LockMode = "update", **kwargs: str
+    ) -> Optional[E]:
+        for_update = FOR_UPDATE_ARGS[lock]
+        if id:
+            return self.session.get(
+                self.entity_class,
+                id,
+                with_for_update=for_update,
+                populate_existing=True,
+            )
+
+        filter_by = {k: v for k, v in kwargs.items() if v is not None}
+        return (
+            self.session.query(self.entity_class)
+            .filter_by(**filter_by)
+            .with_for_update(**for_update)
+            .populate_existing()
+            .first()
+        )
+
+    def get_many(self, ids: Sequence[Any], lock: Optional[LockMode] = None) -> list[E]:
+        """주어진 id 목록에 해당하는 객체들을 하나의 ``IN`` 쿼리로 조회합니다.
+
+        잠금을 걸 경우 데드락을 피하기 위해 PK 순서로 행을 잠급니다.
+        """
+        if not ids:
+            return []
+
+        lock = lock or self.default_lock
+        [pk] = inspect(self.entity_class).primary_key
+        query = self.session.query(self.entity_class).filter(pk.in_(ids))
+        if lock:
+            query = (
+                query.order_by(pk)
+                .with_for_update(**FOR_UPDATE_ARGS[lock])
+                .populate_existing()
+            )
+        items = query.all()
+        self.seen.update(items)
+        return items
+
+    def key_of(self, item: E) -> Any:
+        [key] = inspect(self.entity_class).primary_key_from_instance(item)
+        return key
+
     def delete(self, item: E) -> None:
         self.session.delete(item)
+        self.loader.clear(self.key_of(item))
 
     def all(self) -> List[E]:
         return self.session.query(self.entity_class).all()
@@ -0,0 +1,497 @@
+"""메세지 예약 실행.
+
+정해진 시각이나 일정 시간이 지난 뒤에 메세지를 처리합니다. ::
+
+    messagebus.schedule(commands.ExpireReservation(orderid), after=30)
+    messagebus.schedule(commands.CheckBatch(ref), at=datetime(2021, 6, 1, 9))
+
+예약된 메세지는 프로세스 메모리의 계층형 타이머 휠(:class:`TimerWheel`)에 O(1)
+로 추가되고, 스케줄러 스레드가 ``tick`` 간격으로 만료된 메세지를 모아
+:meth:`MessageBus.handle_many <fastmsa.event.MessageBus.handle_many>` 로 한 번에
+처리합니다. 주기적으로 실행하려면 핸들러에서 다시 예약합니다.
+
+저장소(:class:`ScheduleStore`)를 지정하면 예약이 저장소에도 기록되므로 프로세스가
+재시작되어도 사라지지 않습니다. 여러 프로세스가 같은 저장소를 사용하면 만료된
+메세지는 저장소에서 먼저 가져간(claim) 프로세스 하나만 처리하며, 다른 프로세스가
+예약한 메세지는 ``poll_interval`` 마다 저장소를 조회해서 가져옵니다.
+
+- :class:`SqlScheduleStore`: ``fastmsa_schedule`` 테이블. 가져간 뒤 ``lease`` 초
+  안에 처리를 끝내지 못한 메세지는 다른 프로세스가 다시 가져갑니다.
+- :class:`RedisScheduleStore`: Redis sorted set. 가져간 프로세스가 처리 전에
+  종료되면 메세지가 사라집니다.
+
+처리에 실패한 메세지는 ``retry_delay`` 부터 두 배씩 늘어나는 간격으로
+``max_retries`` 번까지 다시 처리합니다.
+
+메세지는 pickle 로 저장되므로 직렬화할 수 있어야 합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import pickle
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    Optional,
+    Protocol,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from sqlalchemy import Column, Float, LargeBinary, MetaData, String, Table, select
+
+from fastmsa.core import FastMSAError, Message
+from fastmsa.orm import SessionMaker, get_sessionmaker
+
+if TYPE_CHECKING:
+    from fastmsa.event import MessageBus
+
+logger = logging.getLogger("fastmsa.scheduler")
+
+T = TypeVar("T")
+When = Union[datetime, float, None]
+Delay = Union[timedelta, float, None]
+
+
+def due_time_of(at: When = None, after: Delay = None) -> float:
+    """``at`` 또는 ``after`` 에 해당하는 UNIX 시각.
+
+    ``at`` 은 :class:`datetime` 또는 UNIX 시각이며, 시간대가 없는 :class:`datetime`
+    은 UTC 로 취급합니다. ``after`` 는 지금부터의 초 또는 :class:`timedelta` 입니다.
+    """
+    if (at is None) == (after is None):
+        raise FastMSAError("either 'at' or 'after' should be given")
+    if after is not None:
+        if isinstance(after, timedelta):
+            after = after.total_seconds()
+        return time.time() + after
+    if isinstance(at, datetime):
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        return at.timestamp()
+    return float(at)  # type: ignore
+
+
+class TimerWheel(Generic[T]):
+    """계층형 타이머 휠.
+
+    ``levels`` 개의 휠이 각각 ``slots`` 개의 슬롯을 가지며, 레벨 ``L`` 휠의 슬롯
+    하나는 ``slots ** L`` 틱에 해당합니다. 타이머는 만료까지 남은 틱 수에 맞는
+    레벨의 슬롯에 추가되고, 상위 레벨의 슬롯은 차례가 되면 하위 레벨로 다시
+    나뉩니다. 기본값으로 0.1초 틱에서 약 50일까지 담을 수 있으며, 그보다 먼
+    타이머는 최상위 휠이 한 바퀴 돌 때마다 다시 배치됩니다.
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 256,
+        levels: int = 4,
+        start: Optional[float] = None,
+    ):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.origin = time.time() if start is None else start
+        self.now = 0
+        """마지막으로 처리한 틱."""
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels = [[list[Any]() for _ in range(slots)] for _ in range(levels)]
+        self._overflow = list[tuple[int, T]]()
+        self._ready = list[T]()
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, when: float, item: T) -> None:
+        """``when`` 시각에 만료될 항목을 추가합니다."""
+        due = math.ceil((when - self.origin) / self.tick)
+        self._len += 1
+        if due <= self.now:
+            self._ready.append(item)
+        else:
+            self._place(due, item)
+
+    def _place(self, due: int, item: T) -> None:
+        delta = due - self.now
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                slot = (due // self._spans[level]) % self.slots
+                self._wheels[level][slot].append((due, item))
+                return
+        self._overflow.append((due, item))
+
+    def _cascade(self, level: int) -> None:
+        slot = self._wheels[level][(self.now // self._spans[level]) % self.slots]
+        entries = slot[:]
+        slot.clear()
+        for due, item in entries:
+            self._place(due, item)
+
+    def advance(self, now: Optional[float] = None) -> list[T]:
+        """``now`` 시각까지 만료된 항목들을 꺼내서 리턴합니다."""
+        now = time.time() if now is None else now
+        target = math.floor((now - self.origin) / self.tick)
+        expired, self._ready = self._ready, []
+        if self._len == len(expired):
+            self.now = max(self.now, target)  # 빈 휠은 건너뜁니다.
+        while self.now < target:
+            self.now += 1
+            for level in range(self.levels - 1, 0, -1):
+                if self.now % self._spans[level]:
+                    continue
+                self._cascade(level)
+                if level == self.levels - 1 and self._overflow:
+                    overflow, self._overflow = self._overflow, []
+                    for due, item in overflow:
+                        self._place(due, item)
+            slot = self._wheels[0][self.now % self.slots]
+            expired.extend(item for _, item in slot)
+            slot.clear()
+        self._len -= len(expired)
+        return expired
+
+
+class ScheduleStore(Protocol):
+    """예약된 메세지 저장소."""
+
+    def add(self, timer_id: str, when: float, message: Message) -> None:
+        ...
+
+    def remove(self, timer_ids: Sequence[str]) -> int:
+        """예약을 지우고 지운 개수를 리턴합니다."""
+        ...
+
+    def claim(
+        self, now: float, limit: int, timer_ids: Optional[Sequence[str]] = None
+    ) -> dict[str, Message]:
+        """만료된 메세지를 최대 ``limit`` 개 가져옵니다.
+
+        다른 프로세스가 이미 가져간 메세지는 빠집니다. ``timer_ids`` 가 주어지면
+        그 중에서만 가져옵니다.
+        """
+        ...
+
+    def retry(self, timer_id: str, when: float, message: Message) -> None:
+        """가져간 뒤 처리에 실패한 메세지를 ``when`` 에 다시 가져갈 수 있게 합니다."""
+        ...
+
+
+schedule_metadata = MetaData()
+
+schedule_table = Table(
+    "fastmsa_schedule",
+    schedule_metadata,
+    Column("id", String(32), primary_key=True),
+    Column("due", Float, nullable=False, index=True),
+    Column("message", LargeBinary, nullable=False),
+    Column("owner", String(32), nullable=True),
+)
+"""예약된 메세지. 가져간 메세지는 ``owner`` 가 설정되고 ``due`` 가 연장됩니다."""
+
+
+def init_schedule_store(metadata: MetaData) -> None:
+    """예약 테이블을 앱의 :class:`MetaData` 에 추가합니다.
+
+    ORM 매핑 모듈의 ``init_mappers()`` 에서 호출하면 앱의 다른 테이블과 함께
+    생성됩니다.
+    """
+    for table in schedule_metadata.sorted_tables:
+        if table.name not in metadata.tables:
+            table.to_metadata(metadata)
+
+
+class SqlScheduleStore:
+    """SQL 저장소.
+
+    만료된 행의 ``due`` 를 ``lease`` 초 뒤로 옮기는 ``UPDATE`` 로 가져가므로 같은
+    행은 한 프로세스만 가져갈 수 있고, 처리가 끝나면 행을 지웁니다.
+    """
+
+    def __init__(self, get_session: Optional[SessionMaker] = None, lease: float = 60.0):
+        self.get_session = get_session or get_sessionmaker()
+        self.lease = lease
+
+    def add(self, timer_id: str, when: float, message: Message) -> None:
+        data = pickle.dumps(message)
+        with self.get_session() as session, session.begin():
+            session.execute(
+                schedule_table.insert().values(id=timer_id, due=when, message=data)
+            )
+
+    def remove(self, timer_ids: Sequence[str]) -> int:
+        if not timer_ids:
+            return 0
+        table = schedule_table
+        with self.get_session() as session, session.begin():
+            return session.execute(
+                table.delete().where(table.c.id.in_(list(timer_ids)))
+            ).rowcount
+
+    def claim(
+        self, now: float, limit: int, timer_ids: Optional[Sequence[str]] = None
+    ) -> dict[str, Message]:
+        table = schedule_table
+        owner = uuid.uuid4().hex
+        with self.get_session() as session, session.begin():
+            query = select(table.c.id).where(table.c.due <= now)
+            if timer_ids is not None:
+                query = query.where(table.c.id.in_(list(timer_ids)))
+            ids = session.execute(query.order_by(table.c.due).limit(limit)).scalars()
+            ids = list(ids)
+            if not ids:
+                return {}
+            # 다른 프로세스가 먼저 가져간 행은 due 가 연장되어 있으므로 빠집니다.
+            session.execute(
+                table.update()
+                .where(table.c.id.in_(ids), table.c.due <= now)
+                .values(due=now + self.lease, owner=owner)
+            )
+            rows = session.execute(
+                select(table.c.id, table.c.message).where(table.c.owner == owner)
+            )
+            return {row.id: pickle.loads(row.message) for row in rows}
+
+    def retry(self, timer_id: str, when: float, message: Message) -> None:
+        table = schedule_table
+        with self.get_session() as session, session.begin():
+            session.execute(
+                table.update()
+                .where(table.c.id == timer_id)
+                .values(due=when, owner=None)
+            )
+
+
+class RedisScheduleStore:
+    """Redis 저장소. 만료 시각을 점수로 하는 sorted set 을 사용합니다.
+
+    ``client`` 는 ``zadd``, ``zrangebyscore``, ``zrem``, ``hset``, ``hmget``,
+    ``hdel`` 을 제공하는 동기식 Redis 클라이언트입니다. (예: ``redis.Redis``)
+    ``ZREM`` 이 성공한 프로세스만 메세지를 가져갑니다.
+    """
+
+    def __init__(self, client: Any, prefix: str = "fastmsa:schedule"):
+        self.client = client
+        self.timers_key = prefix + ":timers"
+        self.messages_key = prefix + ":messages"
+
+    def add(self, timer_id: str, when: float, message: Message) -> None:
+        self.client.hset(self.messages_key, timer_id, pickle.dumps(message))
+        self.client.zadd(self.timers_key, {timer_id: when})
+
+    def remove(self, timer_ids: Sequence[str]) -> int:
+        if not timer_ids:
+            return 0
+        removed = self.client.zrem(self.timers_key, *timer_ids)
+        self.client.hdel(self.messages_key, *timer_ids)
+        return removed
+
+    def claim(
+        self, now: float, limit: int, timer_ids: Optional[Sequence[str]] = None
+    ) -> dict[str, Message]:
+        if timer_ids is None:
+            found = self.client.zrangebyscore(
+                self.timers_key, "-inf", now, start=0, num=limit
+            )
+            timer_ids = [i.decode() if isinstance(i, bytes) else i for i in found]
+        claimed = [i for i in timer_ids[:limit] if self.client.zrem(self.timers_key, i)]
+        if not claimed:
+            return {}
+        data = self.client.hmget(self.messages_key, claimed)
+        self.client.hdel(self.messages_key, *claimed)
+        return {i: pickle.loads(d) for i, d in zip(claimed, data) if d is not None}
+
+    def retry(self, timer_id: str, when: float, message: Message) -> None:
+        # 가져갈 때 지웠으므로 다시 추가합니다.
+        self.add(timer_id, when, message)
+
+
+@dataclass
+class SchedulerStats:
+    """:class:`MessageScheduler` 통계."""
+
+    scheduled: int = 0
+    dispatched: int = 0
+    failed: int = 0
+    retried: int = 0
+    cancelled: int = 0
+
+
+class MessageScheduler:
+    """예약된 메세지를 만료 시각에 메세지 버스로 처리합니다.
+
+    :meth:`MessageBus.schedule <fastmsa.event.MessageBus.schedule>` 이 처음 호출될
+    때 기본 스케줄러가 만들어지고 시작됩니다. 저장소를 사용하려면
+    :attr:`MessageBus.scheduler <fastmsa.event.MessageBus.scheduler>` 에 직접
+    설정하고 :meth:`start` 를 호출하거나 :func:`fastmsa.api.install_scheduler` 로
+    앱과 함께 시작합니다.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        store: Optional[ScheduleStore] = None,
+        tick: float = 0.1,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        retry_delay: float = 1.0,
+        max_retries: int = 5,
+    ):
+        """
+        Args:
+            store: 예약 저장소. ``None`` 이면 프로세스 메모리에만 유지합니다.
+            tick: 타이머 휠의 틱 간격(초). 메세지는 만료 후 최대 이만큼 늦게
+                처리됩니다.
+            batch_size: 한 트랜잭션으로 처리할 최대 메세지 수.
+            poll_interval: 다른 프로세스가 예약한 메세지를 저장소에서 조회할
+                간격(초).
+            retry_delay: 처리에 실패한 메세지를 처음 다시 처리할 때까지의
+                간격(초). 실패할 때마다 두 배로 늘어납니다.
+            max_retries: 처리에 실패한 메세지를 다시 처리할 최대 횟수.
+        """
+        self.bus = bus
+        self.store = store
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.wheel = TimerWheel[str](tick)
+        self.stats = SchedulerStats()
+        self._pending: dict[str, tuple[float, Message]] = {}
+        """이 프로세스의 휠에 있는 예약별 만료 시각과 메세지."""
+        self._attempts: dict[str, int] = {}
+        """처리에 실패한 예약별 실패 횟수."""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_poll = 0.0
+
+    def __repr__(self):
+        return f"MessageScheduler[{len(self._pending)} pending, store={self.store!r}]"
+
+    @property
+    def pending(self) -> int:
+        """이 프로세스에서 예약하고 아직 처리하지 않은 메세지 수."""
+        return len(self._pending)
+
+    def schedule(self, message: Message, at: When = None, after: Delay = None) -> str:
+        """메세지를 예약하고 예약 ID 를 리턴합니다."""
+        when = due_time_of(at, after)
+        timer_id = uuid.uuid4().hex
+        if self.store:
+            self.store.add(timer_id, when, message)
+        with self._lock:
+            self._pending[timer_id] = (when, message)
+            self.wheel.add(when, timer_id)
+        self.stats.scheduled += 1
+        return timer_id
+
+    def cancel(self, timer_id: str) -> bool:
+        """예약을 취소합니다. 이미 처리되었거나 없는 예약이면 ``False``."""
+        with self._lock:
+            found = self._pending.pop(timer_id, None) is not None
+            self._attempts.pop(timer_id, None)
+        if self.store:
+            found = bool(self.store.remove([timer_id])) or found
+        if found:
+            self.stats.cancelled += 1
+        return found
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """``now`` 까지 만료된 메세지를 처리하고 처리한 개수를 리턴합니다."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = self.wheel.advance(now)
+            # 다시 예약된 타이머는 휠에 이전 만료 시각의 항목이 남아 있습니다.
+            due = {
+                i: self._pending.pop(i)[1]
+                for i in expired
+                if i in self._pending and self._pending[i][0] <= now + self.wheel.tick
+            }
+        if self.store:
+            due = self.store.claim(now, len(due), list(due)) if due else {}
+            if now - self._last_poll >= self.poll_interval:
+                self._last_poll = now
+                polled = self.store.claim(now, self.batch_size)
+                with self._lock:
+                    for timer_id in polled:
+                        self._pending.pop(timer_id, None)
+                due.update(polled)
+
+        ids, messages = list(due), list(due.values())
+        for start in range(0, len(messages), self.batch_size):
+            chunk = messages[start : start + self.batch_size]
+            chunk_ids = ids[start : start + self.batch_size]
+            result = self.bus.handle_many(chunk, commit_every=self.batch_size)
+            for i, error in result.errors.items():
+                logger.error(
+                    "failed to handle scheduled message %r: %r", chunk[i], error
+                )
+                self._retry(chunk_ids[i], chunk[i], now)
+            self.stats.dispatched += len(chunk) - len(result.errors)
+            self.stats.failed += len(result.errors)
+            # 실패한 예약은 _retry() 가 다시 예약했으므로 처리한 것만 지웁니다.
+            done = [t for i, t in enumerate(chunk_ids) if i not in result.errors]
+            with self._lock:
+                for timer_id in done:
+                    self._attempts.pop(timer_id, None)
+            if self.store:
+                self.store.remove(done)
+        return len(messages)
+
+    def _retry(self, timer_id: str, message: Message, now: float) -> None:
+        with self._lock:
+            attempts = self._attempts.pop(timer_id, 0) + 1
+            if attempts <= self.max_retries:
+                self._attempts[timer_id] = attempts
+        if attempts > self.max_retries:
+            logger.error(
+                "giving up scheduled message %r after %d attempts", message, attempts
+            )
+            if self.store:
+                self.store.remove([timer_id])
+            return
+        when = now + self.retry_delay * 2 ** (attempts - 1)
+        if self.store:
+            self.store.retry(timer_id, when, message)
+        with self._lock:
+            self._pending[timer_id] = (when, message)
+            self.wheel.add(when, timer_id)
+        self.stats.retried += 1
+
+    def start(self) -> None:
+        """스케줄러 스레드를 시작합니다."""
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="fastmsa-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.wheel.tick):
+            try:
+                self.run_pending()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("scheduler failed to run pending messages")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """스케줄러 스레드를 종료합니다. 남은 예약은 저장소에 유지됩니다."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._stop.set()
+            thread.join(timeout)
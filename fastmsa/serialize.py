@@ -0,0 +1,111 @@
+"""메세지 직렬화.
+
+메세지(:class:`Command`, :class:`Event`)를 타입 경로(``<module>:<QualName>``)와 필드
+값으로 이루어진 JSON 으로 변환하고 다시 복원합니다. 메세지를 파일로 기록하거나
+``msa profile`` 로 재생할 때 사용합니다.
+
+Example: ::
+
+    >>> dumps(Allocate("o1", "LAMP", 10))
+    '{"type": "app.domain.commands:Allocate", "data": {"orderid": "o1", ...}}'
+"""
+from __future__ import annotations
+
+import importlib
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Type, Union, get_args, get_type_hints
+
+from fastmsa.core import FastMSAError, Message
+
+
+def type_path(cls: type) -> str:
+    """클래스의 ``<module>:<QualName>`` 경로."""
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve_type(path: str, candidates: Iterable[type] = ()) -> Type[Message]:
+    """타입 경로 또는 클래스 이름으로 메세지 타입을 찾습니다.
+
+    Args:
+        path: ``<module>:<QualName>`` 형식의 경로, 또는 ``candidates`` 에서 찾을
+            클래스 이름.
+        candidates: 이름으로 찾을 때 검색할 클래스들.
+    """
+    if ":" in path:
+        module_name, _, qualname = path.partition(":")
+        obj: Any = importlib.import_module(module_name)
+        for name in qualname.split("."):
+            obj = getattr(obj, name)
+        return obj
+
+    found = [c for c in candidates if c.__name__ == path]
+    if len(found) != 1:
+        raise FastMSAError(
+            f"cannot resolve message type: {path!r} ({len(found)} found)"
+        )
+    return found[0]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode(value: Any, hint: Any) -> Any:
+    if value is None or not isinstance(value, str):
+        return value
+    types = get_args(hint) if getattr(hint, "__origin__", None) is Union else (hint,)
+    if datetime in types:
+        return datetime.fromisoformat(value)
+    if date in types:
+        return date.fromisoformat(value)
+    return value
+
+
+def to_dict(message: Message) -> dict[str, Any]:
+    """메세지를 ``{"type": ..., "data": ...}`` 형식의 dict 로 변환합니다."""
+    if not is_dataclass(message):
+        raise FastMSAError(f"message must be a dataclass: {message!r}")
+    return {
+        "type": type_path(type(message)),
+        "data": {f.name: getattr(message, f.name) for f in fields(message)},
+    }
+
+
+def from_dict(obj: dict[str, Any], candidates: Iterable[type] = ()) -> Message:
+    """:func:`to_dict` 로 만든 dict 에서 메세지를 복원합니다."""
+    cls = resolve_type(obj["type"], candidates)
+    return build(cls, obj.get("data") or {})
+
+
+def build(cls: Type[Message], data: dict[str, Any]) -> Message:
+    """필드 타입에 맞게 날짜 문자열 등을 변환해서 메세지를 생성합니다."""
+    hints = get_type_hints(cls)
+    return cls(**{k: _decode(v, hints.get(k)) for k, v in data.items()})  # type: ignore
+
+
+def dumps(message: Message, indent: Optional[int] = None) -> str:
+    """메세지를 JSON 문자열로 변환합니다."""
+    return json.dumps(to_dict(message), default=_encode, indent=indent)
+
+
+def loads(text: str, candidates: Iterable[type] = ()) -> Message:
+    """:func:`dumps` 로 만든 JSON 문자열에서 메세지를 복원합니다."""
+    return from_dict(json.loads(text), candidates)
+
+
+def load_messages(text: str, candidates: Iterable[type] = ()) -> list[Message]:
+    """메세지 목록을 읽습니다.
+
+    JSON 배열, 객체 하나, 또는 한 줄에 하나씩 기록된 JSON Lines 를 지원합니다.
+    """
+    candidates = list(candidates)
+    try:
+        obj = json.loads(text)
+    except json.JSONDecodeError:
+        obj = [json.loads(line) for line in text.splitlines() if line.strip()]
+    items = obj if isinstance(obj, list) else [obj]
+    return [from_dict(it, candidates) for it in items]
@@ -0,0 +1,120 @@
+"""프로덕션 실행 모드(``msa run --prod``) 지원.
+
+uvicorn 은 ``--workers`` 로 여러 워커를 띄울 때 각 워커 프로세스에서 앱 모듈을 새로
+임포트합니다. ``msa run --prod`` 는 :data:`PROD_ENV` 환경변수를 설정해서 워커가
+:meth:`FastMSACommand.init_app` 에서 :func:`install_prod_hooks` 를 호출하게 합니다.
+
+- 시작시 트래픽을 받기 전에 DB 커넥션 풀과 핸들러 의존성 정보를 미리 준비합니다.
+- SIGTERM 을 받으면 uvicorn 이 진행 중인 HTTP 요청을 마친 뒤 ``shutdown`` 이벤트를
+  발생시키고, 이 때 메세지 버스에서 처리 중인 메세지가 끝날 때까지 기다립니다.
+
+fork 로 만들어진 자식 프로세스의 커넥션 풀 재생성은
+:func:`fastmsa.orm.reset_engines_after_fork` 와
+:func:`fastmsa.redis.reset_clients_after_fork` 가 담당합니다.
+"""
+from __future__ import annotations
+
+import os
+from inspect import signature
+from typing import TYPE_CHECKING, Any, Optional
+
+from fastmsa.logging import get_logger
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy.engine import Engine
+
+    from fastmsa.config import FastMSA
+    from fastmsa.event import MessageBus
+
+PROD_ENV = "FASTMSA_PROD"
+"""프로덕션 모드로 실행 중임을 워커 프로세스에 알리는 환경변수."""
+
+logger = get_logger("fastmsa.server")
+
+
+def is_prod() -> bool:
+    """프로덕션 모드로 실행 중인지 여부."""
+    return os.environ.get(PROD_ENV) == "1"
+
+
+def warm_up_handlers(bus: MessageBus) -> int:
+    """등록된 모든 핸들러의 파라메터 정보를 미리 캐시합니다.
+
+    Returns:
+        캐시된 핸들러 수.
+    """
+    handlers = {h for hs in bus.handlers.values() for h in hs}
+    for handler in handlers:
+        if handler not in bus.params_cache:
+            bus.params_cache[handler] = signature(handler).parameters
+    return len(handlers)
+
+
+def warm_up(
+    bus: MessageBus, engine: Optional[Engine] = None, connections: int = 1
+) -> dict[str, Any]:
+    """트래픽을 받기 전에 ORM 매퍼, 커넥션 풀, 핸들러 정보를 준비합니다.
+
+    Args:
+        engine: 커넥션을 미리 열어둘 엔진. ``None`` 이면 기본 세션 팩토리의
+            엔진을 사용합니다.
+        connections: 미리 열어둘 커넥션 수.
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    from fastmsa.orm import get_sessionmaker, warm_up_pool
+
+    configure_mappers()
+    if not engine:
+        engine = getattr(get_sessionmaker(), "kw", {}).get("bind")
+
+    return {
+        "connections": warm_up_pool(engine, connections) if engine else 0,
+        "handlers": warm_up_handlers(bus),
+    }
+
+
+def install_prod_hooks(
+    app: FastAPI,
+    msa: FastMSA,
+    bus: Optional[MessageBus] = None,
+    engine: Optional[Engine] = None,
+) -> None:
+    """워커 시작시 warm-up 과 종료시 메세지 드레인 훅을 앱에 등록합니다.
+
+    Args:
+        bus: 드레인할 메세지 버스. 기본값은 전역 :data:`messagebus`.
+        engine: warm-up 할 엔진. 기본값은 기본 세션 팩토리의 엔진.
+    """
+    from fastmsa.event import messagebus
+
+    bus = bus or messagebus
+
+    @app.on_event("startup")
+    def _warm_up():
+        result = warm_up(bus, engine, msa.get_warmup_connections())
+        logger.info(
+            "worker %s warmed up: %d connections, %d handlers",
+            os.getpid(),
+            result["connections"],
+            result["handlers"],
+        )
+
+    @app.on_event("shutdown")
+    def _drain():
+        timeout = msa.get_drain_timeout()
+        logger.info(
+            "worker %s draining %d in-flight messages...", os.getpid(), bus.inflight
+        )
+        if not bus.drain(timeout):
+            logger.warning(
+                "worker %s: %d messages still in flight after %.1fs",
+                os.getpid(),
+                bus.inflight,
+                timeout,
+            )
+        if bus.executor:
+            bus.executor.shutdown(wait=False)
+        if bus.process_pool:
+            bus.process_pool.shutdown(wait=False)
@@ -4,14 +4,18 @@ from collections import defaultdict
 from fastmsa.core import AbstractPubsubClient
 
 
-def check_port_opened(port: int):
+def check_port_opened(port: int, host: str = "127.0.0.1", timeout: float = 1.0):
     """e2e 테스트를 위해 포트 오픈 여부를 체크합니다."""
     import socket
 
     a_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    a_socket.settimeout(timeout)
     try:
-        location = ("127.0.0.1", port)
-        result_of_check = a_socket.connect_ex(location)
+        location = (host, port)
+        try:
+            result_of_check = a_socket.connect_ex(location)
+        except OSError:  # 호스트 이름을 찾을 수 없는 경우
+            return False
 
         if result_of_check == 0:
             return True
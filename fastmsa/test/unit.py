@@ -51,8 +51,12 @@ class FakeRepository(AbstractRepository[E]):
 
         return item
 
+    def key_of(self, item: E) -> Any:
+        return getattr(item, self.id_field)
+
     def delete(self, batch: E) -> None:
         self._items.remove(batch)
+        self.loader.clear(self.key_of(batch))
 
     def all(self) -> list[E]:
         return list(self._items)
@@ -151,3 +155,8 @@ class FakeMessageBus(MessageBus):
             pubsub=pubsub or FakePubsubCilent(self.message_published),
             uow=messagebus.uow,
         )
+        self.uow_factory = messagebus.uow_factory
+        self.lock_modes = dict(messagebus.lock_modes)
+        self.batch_commands = set(messagebus.batch_commands)
+        self.priorities = dict(messagebus.priorities)
+        self.process_commands = set(messagebus.process_commands)
@@ -4,7 +4,13 @@ SqlAlchemy를 이용한 기본 구현체를 제공합니다.
 """
 from __future__ import annotations
 
-from typing import Any, Callable, Optional, Sequence, Type
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Generator, Iterable, Optional, Sequence, Type
+
+from sqlalchemy import inspect
 
 from fastmsa.core import (
     AbstractRepository,
@@ -12,8 +18,14 @@ from fastmsa.core import (
     Aggregate,
     AggregateReposMap,
 )
+from fastmsa.instrument import SqlScope, sql_scope
 from fastmsa.logging import get_logger
-from fastmsa.orm import Session, SessionMaker, get_sessionmaker
+from fastmsa.orm import (
+    Session,
+    SessionMaker,
+    enable_sqlite_savepoints,
+    get_sessionmaker,
+)
 from fastmsa.repo import SqlAlchemyRepository
 
 RepoMakerFunc = Callable[[Session], AbstractRepository]
@@ -23,6 +35,174 @@ RepoMakerDict = dict[Type[Aggregate], RepoMakerFunc]
 logger = get_logger("fastmsa.uow")
 
 
+def _aggregate_key(agg: Aggregate) -> Any:
+    """Aggregate 의 식별 키를 리턴합니다.
+
+    ORM 이 로드한 객체는 ``__init__`` 을 거치지 않아 ``id`` 속성이 없을 수 있으므로
+    매퍼의 identity 를 우선 사용합니다.
+    """
+    identity = inspect(agg).identity
+    return identity if identity else getattr(agg, "id", id(agg))
+
+
+@dataclass
+class _CommitRequest:
+    """그룹 커밋을 기다리는 하나의 UoW 커밋 요청."""
+
+    session: Session
+    keys: frozenset[tuple[str, Any]]
+    done: bool = False
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class GroupCommitStats:
+    """그룹 커밋 통계."""
+
+    commits: int = 0
+    """그룹 커밋에 참여한 UoW 커밋 요청 수."""
+    groups: int = 0
+    """실제로 실행된 DB 트랜잭션 수."""
+    failures: int = 0
+    """에러를 돌려받은 커밋 요청 수."""
+
+    @property
+    def avg_group_size(self) -> float:
+        return self.commits / self.groups if self.groups else 0.0
+
+
+class GroupCommitCoordinator:
+    """동시에 들어온 여러 UoW 커밋을 하나의 DB 트랜잭션으로 묶어 커밋합니다.
+
+    ``window`` 초 동안 또는 ``max_batch`` 개의 요청이 모일 때까지 기다린 후,
+    서로 다른 Aggregate 를 변경한 요청들만 골라 하나의 트랜잭션으로 커밋합니다.
+    각 요청은 SAVEPOINT 안에서 적용되므로 한 요청의 실패는 해당 요청에만
+    전달되고, 최종 COMMIT 이 실패하면 그룹의 모든 요청에 에러가 전달됩니다.
+
+    별도의 스레드 없이 먼저 도착한 요청의 스레드가 리더가 되어 커밋을 실행하고,
+    나머지 요청은 결과를 기다립니다.
+
+    주의:
+        참여하는 UoW 는 ``autoflush`` 가 꺼진 세션을 사용하며, 세션에서 추가/변경/
+        삭제된 ORM 객체는 리더 세션으로 옮겨져 커밋됩니다. SQLite(pysqlite) 엔진에는
+        :func:`fastmsa.orm.enable_sqlite_savepoints` 가 적용됩니다. ``session.execute()`` 로 직접
+        실행한 SQL 은 그룹 커밋 대상이 아닙니다.
+    """
+
+    def __init__(
+        self,
+        get_session: Optional[SessionMaker] = None,
+        window: float = 0.002,
+        max_batch: int = 64,
+    ):
+        self.get_session = get_session or get_sessionmaker()
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = GroupCommitStats()
+        self._cond = threading.Condition()
+        self._pending = list[_CommitRequest]()
+        self._leading = False
+
+    def __repr__(self):
+        return f"GroupCommitCoordinator[window={self.window}, max_batch={self.max_batch}]"
+
+    def submit(self, session: Session, aggregates: Iterable[Aggregate] = ()) -> None:
+        """커밋 요청을 제출하고 그룹 커밋이 끝날 때까지 기다립니다.
+
+        Raises:
+            요청이 실패한 경우 해당 요청에서 발생한 예외를 그대로 다시 발생시킵니다.
+        """
+        keys = frozenset((type(agg).__name__, _aggregate_key(agg)) for agg in aggregates)
+        req = _CommitRequest(session, keys)
+
+        with self._cond:
+            self._pending.append(req)
+            self._cond.notify_all()
+            while not req.done:
+                if self._leading:
+                    self._cond.wait()
+                else:
+                    self._lead()
+
+        if req.error:
+            raise req.error
+
+    def _lead(self) -> None:
+        """리더로서 커밋 그룹을 모아 실행합니다. ``self._cond`` 를 잡은 상태로 호출됩니다."""
+        self._leading = True
+        try:
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._take_batch()
+            self._cond.release()
+            try:
+                self._commit_batch(batch)
+            finally:
+                self._cond.acquire()
+
+            for req in batch:
+                req.done = True
+            self.stats.groups += 1
+            self.stats.commits += len(batch)
+            self.stats.failures += sum(1 for req in batch if req.error)
+        finally:
+            self._leading = False
+            self._cond.notify_all()
+
+    def _take_batch(self) -> list[_CommitRequest]:
+        """대기중인 요청 중 서로 충돌하지 않는 요청들을 도착 순서대로 고릅니다."""
+        batch, rest = list[_CommitRequest](), list[_CommitRequest]()
+        keys = set[tuple[str, Any]]()
+        for req in self._pending:
+            if len(batch) < self.max_batch and not (req.keys & keys):
+                batch.append(req)
+                keys |= req.keys
+            else:
+                rest.append(req)
+        self._pending = rest
+        return batch
+
+    def _commit_batch(self, batch: list[_CommitRequest]) -> None:
+        session = self.get_session()
+        enable_sqlite_savepoints(session.get_bind().engine)
+        try:
+            for req in batch:
+                try:
+                    with session.begin_nested():
+                        self._merge_changes(req, session)
+                except Exception as e:  # pylint: disable=broad-except
+                    req.error = e
+            session.commit()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("group commit failed: %r", self)
+            session.rollback()
+            for req in batch:
+                req.error = req.error or e
+        finally:
+            session.close()
+
+    @staticmethod
+    def _merge_changes(req: _CommitRequest, session: Session) -> None:
+        """참여 세션의 변경 사항을 리더 세션으로 옮깁니다.
+
+        ``merge()`` 는 객체마다 SELECT 를 실행하므로, 참여 세션에서 객체를 떼어내어
+        변경 이력을 유지한 채로 리더 세션에 그대로 붙입니다. 읽기만 한 객체는
+        옮기지 않습니다.
+        """
+        src = req.session
+        deleted = list(src.deleted)
+        objs = list(src.new) + list(src.dirty) + deleted
+        src.expunge_all()
+        session.add_all(objs)
+        for obj in deleted:
+            session.delete(obj)
+
+
 class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
     """``SqlAlchemy`` ORM을 이용한 UnitOfWork 패턴 구현입니다."""
 
@@ -32,12 +212,19 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
         agg_classes: Sequence[Type[Aggregate]],
         get_session: Optional[SessionMaker] = None,
         repo_maker: Optional[RepoMakerDict] = None,
+        group_commit: Optional[GroupCommitCoordinator] = None,
     ) -> None:
-        """``SqlAlchemy`` 기반의 UoW를 초기화합니다."""
+        """``SqlAlchemy`` 기반의 UoW를 초기화합니다.
+
+        Args:
+            group_commit: 지정하면 :meth:`commit` 이 세션을 직접 커밋하는 대신
+                :class:`GroupCommitCoordinator` 에 커밋을 위임합니다.
+        """
         super().__init__()
         self.agg_classes = agg_classes
         self.repos: AggregateReposMap = {}
         self.repo_maker = repo_maker or {}
+        self.group_commit = group_commit
 
         if not get_session:
             self.get_session = get_sessionmaker()
@@ -46,6 +233,8 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
 
         self.committed = False
         self.session: Optional[Session] = None
+        self._sql_scope: Optional[SqlScope] = None
+        self._batching = False
 
     def __repr__(self):
         return f"SqlAlchemyUnitOfWork[{self.repo_maker}]"
@@ -55,8 +244,17 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
 
         세션을 할당하고, ``batches`` 레포지터리를 초기화합니다.
         """
+        if self._batching:
+            for repo in self.repos.values():
+                repo.default_lock = self.lock
+            return self
+
         super().__enter__()
+        self._sql_scope = sql_scope("uow", self._scope_name()).enter()
         self.session = self.get_session()
+        if self.group_commit:
+            # 리더 세션과의 락 충돌을 막기 위해 커밋 전까지 DB에 쓰지 않습니다.
+            self.session.autoflush = False
         for agg_class in self.agg_classes:
             repo_maker = self.repo_maker.get(agg_class)
             self.repos[agg_class] = (
@@ -67,6 +265,7 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
                     self.session,
                 )
             )
+            self.repos[agg_class].default_lock = self.lock
         return self
 
     def __exit__(self, *args: Any) -> None:
@@ -74,14 +273,46 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):  # type: ignore
 
         세션을 close합니다.
         """
+        if self._batching:
+            return
         super().__exit__(*args)
         if self.session:
             self.session.close()
+        if self._sql_scope:
+            self._sql_scope.exit()
+            self._sql_scope = None
+
+    @contextmanager
+    def batch(self) -> Generator[AbstractUnitOfWork, None, None]:
+        """블록 안의 ``with uow:`` 블록들이 하나의 세션을 공유합니다.
+
+        블록 안에서 :meth:`commit` 은 변경을 flush 만 하고, 블록이 끝나면 한 번에
+        커밋합니다. 에러가 발생하면 모든 변경을 롤백합니다.
+        """
+        self.__enter__()
+        self._batching = True
+        try:
+            yield self
+            self._batching = False
+            self.commit()
+        finally:
+            self._batching = False
+            self.__exit__(None, None, None)
+
+    def _scope_name(self) -> str:
+        return ",".join(agg_class.__name__ for agg_class in self.agg_classes)
 
     def _commit(self) -> None:
         """세션을 커밋합니다."""
         self.committed = True
-        if self.session:
+        if not self.session:
+            return
+        if self._batching:
+            self.session.flush()
+        elif self.group_commit:
+            aggregates = [agg for repo in self.repos.values() for agg in repo.seen]
+            self.group_commit.submit(self.session, aggregates)
+        else:
             self.session.commit()
 
     def rollback(self) -> None:
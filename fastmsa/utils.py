@@ -4,7 +4,6 @@ from pathlib import Path
 from typing import Generator
 
 from colorama import init as init_colors
-from pkg_resources import resource_isdir, resource_listdir
 
 init_colors()  # For Windows environment
 
@@ -36,6 +35,8 @@ def cwd(path: Path) -> Generator:
 
 
 def scan_resource_dir(basedir: str, files_found: list[str] = None, pkg_name="fastmsa"):
+    from pkg_resources import resource_isdir, resource_listdir
+
     if not files_found:
         files_found = []
 
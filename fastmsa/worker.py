@@ -0,0 +1,239 @@
+"""외부 메세지 브로커 전용 워커(``msa worker``).
+
+API 프로세스와 별도로 외부 메세지 브로커의 채널을 구독하고 메세지를 처리합니다.
+라우트와 FastAPI 없이 도메인, ORM, 핸들러만 초기화하므로 API 와 컨슈머의 용량을
+따로 조정할 수 있습니다.
+
+- ``concurrency``: 프로세스 하나에서 동시에 처리할 메세지 수. 동기 핸들러는 스레드
+  풀에서 실행되며, 스레드마다 별도의 UoW 가 :data:`fastmsa.event.current_uow` 로
+  바인딩됩니다. 핸들러 스레드에서 발행하는 메세지는 워커의 이벤트 루프에서
+  발행됩니다. (:meth:`fastmsa.redis.AsyncRedisClient.publish_message_sync`)
+- ``processes``: 워커 프로세스 수. (:func:`run_workers`)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional, Protocol
+
+from fastmsa.core import AbstractPubsubClient, AbstractUnitOfWork
+from fastmsa.logging import get_logger
+
+logger = get_logger("fastmsa.worker")
+
+
+class Channel(Protocol):
+    """구독한 채널. (``aioredis.Channel`` 호환)"""
+
+    name: bytes
+
+    def iter(self, *, encoding: Optional[str] = None) -> AsyncIterator[Any]:
+        ...
+
+
+@dataclass
+class WorkerStats:
+    """메세지 처리량 통계."""
+
+    consumed: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """초당 처리한 메세지 수."""
+        return self.consumed / self.elapsed if self.elapsed else 0.0
+
+
+class BrokerWorker:
+    """외부 메세지 브로커의 채널들을 구독하고 메세지를 동시에 처리합니다."""
+
+    def __init__(
+        self,
+        client: AbstractPubsubClient,
+        handlers: dict[str, Callable],
+        concurrency: int = 4,
+        uow_factory: Optional[Callable[[], AbstractUnitOfWork]] = None,
+        report_interval: float = 10.0,
+    ):
+        """
+        Args:
+            client: 채널을 구독하고 핸들러에 전달할 클라이언트.
+            handlers: 채널 이름별 핸들러.
+            concurrency: 동시에 처리할 최대 메세지 수.
+            uow_factory: 핸들러 스레드마다 사용할 UoW 를 만드는 함수.
+            report_interval: 처리량을 로그로 남길 주기(초). 0 이면 남기지 않습니다.
+        """
+        self.client = client
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.uow_factory = uow_factory
+        self.report_interval = report_interval
+        self.stats = WorkerStats()
+        self._tasks = set[asyncio.Task]()
+        self._readers = list[asyncio.Task]()
+        self._pool = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="fastmsa-worker",
+            initializer=self._init_thread,
+        )
+
+    def __repr__(self):
+        return f"BrokerWorker[concurrency={self.concurrency}]"
+
+    def _init_thread(self):
+        from fastmsa.event import current_uow
+
+        # `run_in_executor` 는 컨텍스트를 복사하지 않으므로 이 값이 유지됩니다.
+        if self.uow_factory:
+            current_uow.set(self.uow_factory())
+
+    async def run(self) -> WorkerStats:
+        """모든 핸들러 채널을 구독하고 :meth:`stop` 이 호출될 때까지 처리합니다."""
+        listener: Any = await self.client.subscribe_to(*self.handlers.keys())
+        return await self.consume(listener.channels)
+
+    async def consume(self, channels: list[Channel]) -> WorkerStats:
+        """주어진 채널들의 메세지를 모두 처리하고 통계를 리턴합니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.stats = WorkerStats()
+        self._readers = [
+            asyncio.create_task(self._read(ch, semaphore)) for ch in channels
+        ]
+        reporter = asyncio.create_task(self._report()) if self.report_interval else None
+        try:
+            await asyncio.gather(*self._readers, return_exceptions=True)
+            # 채널이 닫혔거나 중지되었으면 처리 중인 메세지를 마저 처리합니다.
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            if reporter:
+                reporter.cancel()
+            self._pool.shutdown(wait=True)
+        self._log_stats("stopped")
+        return self.stats
+
+    def stop(self) -> None:
+        """새 메세지를 더 읽지 않도록 합니다. 처리 중인 메세지는 마저 처리됩니다."""
+        for reader in self._readers:
+            reader.cancel()
+
+    async def _read(self, channel: Channel, semaphore: asyncio.Semaphore):
+        name = channel.name.decode()
+        handler = self.handlers[name]
+        logger.info("worker %s consuming from channel: %s", os.getpid(), name)
+        async for msg in channel.iter(encoding="utf8"):
+            await semaphore.acquire()
+            task = asyncio.create_task(self._dispatch(name, handler, msg))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+
+    async def _dispatch(self, channel_name: str, handler: Callable, msg: str):
+        try:
+            data = json.loads(msg)
+            if asyncio.iscoroutinefunction(handler):
+                await handler(self.client, data)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._pool, handler, self.client, data)
+            self.stats.consumed += 1
+        except Exception as e:  # pylint: disable=broad-except
+            self.stats.failed += 1
+            logger.exception("%s on %s", type(e).__qualname__, channel_name)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self._log_stats("running")
+
+    def _log_stats(self, status: str):
+        logger.info(
+            "worker %s %s: %d consumed (%.1f msg/s), %d failed, %d in flight",
+            os.getpid(),
+            status,
+            self.stats.consumed,
+            self.stats.throughput,
+            self.stats.failed,
+            len(self._tasks),
+        )
+
+
+async def serve(worker: BrokerWorker) -> WorkerStats:
+    """SIGTERM/SIGINT 를 받으면 처리 중인 메세지를 마치고 종료하도록 실행합니다."""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except (NotImplementedError, RuntimeError):  # Windows, 메인 스레드가 아닌 경우
+            pass
+    return await worker.run()
+
+
+def run_worker(path: Path, concurrency: int, report_interval: float) -> None:
+    """``path`` 의 앱을 라우트 없이 초기화하고 브로커 워커를 실행합니다."""
+    from fastmsa.command import FastMSACommand
+    from fastmsa.core import FastMSAError
+    from fastmsa.utils import cwd
+
+    with cwd(path):
+        cmd = FastMSACommand()
+        msa = cmd.init_app(init_routes=False)
+        if not msa.allow_external_event or not msa.broker:
+            raise FastMSAError("External events are not allowed!")
+
+        broker: Any = msa.broker
+        worker = BrokerWorker(
+            broker.client,
+            broker.channel_handlers,
+            concurrency=concurrency,
+            uow_factory=lambda: msa.uow,
+            report_interval=report_interval,
+        )
+        asyncio.run(serve(worker))
+
+
+def run_workers(
+    path: Path, processes: int = 1, concurrency: int = 4, report_interval=10.0
+) -> None:
+    """워커 프로세스들을 실행하고 모두 종료될 때까지 기다립니다."""
+    if processes <= 1:
+        run_worker(path, concurrency, report_interval)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    children = [
+        ctx.Process(
+            target=run_worker,
+            args=(path, concurrency, report_interval),
+            name=f"fastmsa-worker-{i}",
+        )
+        for i in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def terminate(signum, frame):
+        for child in children:
+            if child.is_alive():
+                child.terminate()  # 자식 프로세스에 SIGTERM 전달.
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        terminate(signal.SIGINT, None)
+        for child in children:
+            child.join()
@@ -1,3 +1,6 @@
+from typing import Optional
+
+from fastmsa.core import LockMode
 from fastmsa.repo import SqlAlchemyRepository
 
 from ..domain.aggregates import Product
@@ -7,7 +10,10 @@ class SqlAlchemyProductRepository(SqlAlchemyRepository[Product]):
     def __repr__(self):
         return self.__class__.__name__
 
-    def _get_by_batchref(self, batchref):
-        return next(
+    def _get_by_batchref(self, batchref, lock: Optional[LockMode] = None):
+        product = next(
             (p for p in self.all() for b in p.items if b.reference == batchref), None
         )
+        if product and lock:
+            return self._get_locked(product.sku, lock=lock)
+        return product
@@ -11,6 +11,8 @@ logger = get_logger("tests.app.domain")
 
 
 class Product(Aggregate[Batch]):
+    version_field = "version_number"
+
     def __init__(self, sku: str, items: list[Batch], version_number: int = 0):
         self.id = sku  # Entity 프로토콜을 준수하기 위해 반드시 정의해야 하는 속성.
         self.sku = sku
@@ -7,6 +7,10 @@ from fastmsa.core import Command
 
 @dataclass
 class Allocate(Command):
+    partition_key = "sku"
+    coalesce_key = ("orderid", "sku")
+    coalesce_done = True  # 재할당으로 다시 들어온 같은 할당은 한 번만 처리합니다.
+
     orderid: str
     sku: str
     qty: int
@@ -14,6 +18,8 @@ class Allocate(Command):
 
 @dataclass
 class CreateBatch(Command):
+    partition_key = "sku"
+
     ref: str
     sku: str
     qty: int
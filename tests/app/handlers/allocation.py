@@ -40,7 +40,7 @@ def add_batch(e: commands.CreateBatch, uow: AbstractUnitOfWork):
         uow.commit()
 
 
-@on_command(commands.Allocate)
+@on_command(commands.Allocate, lock="update")
 def allocate(e: commands.Allocate, uow: AbstractUnitOfWork):
     """ETA가 가장 빠른 배치를 찾아 :class:`.OrderLine` 을 할당합니다.
 
@@ -1,7 +1,9 @@
 """FastAPI 엔드포인트 라우팅 모듈입니다."""
 from __future__ import annotations
 
-from fastmsa.api import app
+from fastapi import Depends
+
+from fastmsa.api import app, deferred_events
 from fastmsa.event import messagebus
 from tests.app.domain import commands
 from tests.app.handlers.allocation import InvalidSku
@@ -15,9 +17,15 @@ def add_batch(batch: BatchAddSchema):
     messagebus.handle(event)
 
 
-@app.post("/batches/allocate", status_code=201)
+@app.post(
+    "/batches/allocate", status_code=201, dependencies=[Depends(deferred_events)]
+)
 def post_allocate_batch(req: BatchAllocateSchema):
-    """``POST /allocate`` 엔트포인트 요청을 처리합니다."""
+    """``POST /allocate`` 엔트포인트 요청을 처리합니다.
+
+    드레이너가 설치되어 있으면 ``Allocated`` 같은 후속 이벤트는 응답 후에
+    처리됩니다.
+    """
     try:
         event = commands.Allocate(req.orderid, req.sku, req.qty)
         results = messagebus.handle(event)
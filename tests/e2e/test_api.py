@@ -1,4 +1,5 @@
 """FastAPI 로 구현된 엔드포인트 테스트입니다."""
+import threading
 from datetime import datetime
 from typing import Optional
 
@@ -43,3 +44,35 @@ def test_happy_path_returns_201_and_allocated_batch(client):
     res = client.post(f"/batches/allocate", json=data)
     assert res.status_code == 201
     assert res.json()["batchref"] == earlybatch
+
+
+def test_allocate_responds_before_deferred_events_finish(client, monkeypatch):
+    from fastmsa.event import BackgroundDrainer, messagebus
+    from tests.app.domain import events
+
+    release, handled = threading.Event(), []
+
+    def slow_handler(event: events.Allocated):
+        release.wait(5)
+        handled.append(event.orderid)
+
+    allocated_handlers = [*messagebus.handlers[events.Allocated], slow_handler]
+    monkeypatch.setitem(messagebus.handlers, events.Allocated, allocated_handlers)
+    drainer = BackgroundDrainer(messagebus, workers=1)
+    monkeypatch.setattr(messagebus, "drainer", drainer)
+
+    sku, [batchref], orderid = random_sku(), setup_batches(1), random_orderid()
+    try:
+        post_to_add_batch(client, batchref, sku, 100, None)
+        data = {"orderid": orderid, "sku": sku, "qty": 3}
+        res = client.post("/batches/allocate", json=data)
+
+        # Allocated 이벤트 핸들러가 끝나기 전에 응답합니다.
+        assert res.status_code == 201 and res.json()["batchref"] == batchref
+        assert handled == [] and drainer.stats.deferred == 1
+    finally:
+        release.set()
+        drainer.close(5)
+
+    assert handled == [orderid]
+    assert (drainer.stats.processed, drainer.stats.failed) == (1, 0)
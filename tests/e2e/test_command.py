@@ -4,6 +4,7 @@ TODO: Unit Test로 분리할 부분이 있는지 확인.
 """
 import importlib
 import importlib.util
+import os
 import shutil
 import sys
 import tempfile
@@ -12,6 +13,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from fastmsa.command import TEMPLATE_DIR, FastMSACommand
+from fastmsa.config import FastMSA
+from fastmsa.manifest import MANIFEST_FILE, AppManifest, load_manifest
+from fastmsa.server import PROD_ENV
 from fastmsa.utils import cwd, scan_resource_dir
 
 
@@ -78,3 +82,93 @@ def test_msa_cmd_run_dry(cmd: FastMSACommand):
     with patch("os.get_terminal_size") as mock:
         mock.return_value = MagicMock(columns=50)
         cmd.run(dry_run=True)
+
+
+def test_msa_cmd_manifest_is_cached_until_sources_change(cmd: FastMSACommand):
+    module_name = cmd.msa.module_name
+    manifest = load_manifest(module_name, cmd.msa.module_path)
+    assert f"{module_name}.handlers.sample" in manifest.handlers
+    assert f"{module_name}.adapters.orm.default" in manifest.mappers
+    assert (cmd.msa.module_path / MANIFEST_FILE).exists()
+
+    # 소스가 바뀌지 않았다면 디렉토리 검색 없이 저장된 매니페스트를 사용합니다.
+    with patch.object(AppManifest, "scan", side_effect=AssertionError):
+        assert load_manifest(module_name, cmd.msa.module_path) == manifest
+
+    (cmd.msa.module_path / "handlers" / "extra.py").write_text("")
+    rebuilt = load_manifest(module_name, cmd.msa.module_path)
+    assert f"{module_name}.handlers.extra" in rebuilt.handlers
+
+
+def test_msa_cmd_config_is_memoized(cmd: FastMSACommand):
+    msa = FastMSA.load_from_config(cmd.path)
+    assert FastMSA.load_from_config(cmd.path) is msa
+    assert FastMSA.load_from_config() is msa  # 상대 경로도 같은 캐시를 사용.
+
+    setup_cfg = cmd.path / "setup.cfg"
+    setup_cfg.write_text(setup_cfg.read_text() + "\n")
+    os.utime(setup_cfg, ns=(0, 0))
+    changed = FastMSA.load_from_config(cmd.path)
+    assert changed is not msa
+    assert FastMSA.load_from_config(cmd.path) is changed
+
+    # config.py 가 바뀌면 모듈을 다시 임포트합니다.
+    config_py = cmd.path / changed.module_path / "config.py"
+    config_py.write_text(
+        config_py.read_text() + '\nConfig.get_api_host = lambda self: "0.0.0.0"\n'
+    )
+    os.utime(config_py, ns=(0, 0))
+    reloaded = FastMSA.load_from_config(cmd.path)
+    assert reloaded is not changed and reloaded.get_api_host() == "0.0.0.0"
+
+
+def test_msa_cmd_run_prod_options(cmd: FastMSACommand, monkeypatch):
+    import uvicorn
+
+    monkeypatch.setenv(PROD_ENV, "0")
+    options = cmd.run(
+        dry_run=True,
+        banner=False,
+        prod=True,
+        workers=4,
+        uds="/tmp/fastmsa.sock",
+        http="h11",
+        keep_alive=30,
+    )
+
+    assert options["reload"] is False
+    assert options["workers"] == 4
+    assert options["uds"] == "/tmp/fastmsa.sock"
+    assert options["timeout_keep_alive"] == 30
+    assert os.environ[PROD_ENV] == "1"
+    uvicorn.Config(f"{cmd.msa.module_name}.__main__:app", **options)
+
+
+def test_msa_cmd_profile_message(cmd: FastMSACommand, tmp_path):
+    report = cmd.profile(
+        "SampleEvent", data={"msg": "hello"}, runs=3, db="empty", output=tmp_path
+    )
+    assert report.runs == 3
+    assert (tmp_path / "profile.pstats").exists()
+
+
+def test_msa_cmd_profile_route(cmd: FastMSACommand):
+    report = cmd.profile(route="GET /users", runs=4, db="empty", trace_alloc=False)
+    [(statement, stats)] = report.sql_breakdown()
+    assert statement.startswith("SELECT") and stats["count"] == 4
+
+
+def test_msa_cmd_replay_journal(cmd: FastMSACommand, tmp_path):
+    from fastmsa.event import messagebus
+
+    cmd.open_journal(tmp_path)
+    [event_type] = [d for d in cmd.load_domain() if d.__name__ == "SampleEvent"]
+    try:
+        messagebus.journal.write(event_type(msg="hello"))  # type: ignore
+    finally:
+        messagebus.journal.close()  # type: ignore
+        messagebus.journal = None
+
+    with patch.object(FastMSA, "get_db_url", return_value="sqlite://"):
+        stats = cmd.replay(tmp_path)
+    assert (stats.messages, stats.errors) == (1, 0)
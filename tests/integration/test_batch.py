@@ -0,0 +1,158 @@
+"""커맨드 배치 처리 통합 테스트."""
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import event
+
+from fastmsa.event import MessageBus
+from fastmsa.uow import SqlAlchemyUnitOfWork
+from tests.app.domain import commands, events
+from tests.app.domain.aggregates import Product
+from tests.app.domain.models import Batch
+
+
+def add_batch(cmd: commands.CreateBatch, uow: SqlAlchemyUnitOfWork):
+    if cmd.qty < 0:
+        raise ValueError(cmd.ref)
+    with uow:
+        product = uow[Product].get(cmd.sku)
+        if not product:
+            product = Product(cmd.sku, items=[])
+            uow[Product].add(product)
+        product.items.append(Batch(cmd.ref, cmd.sku, cmd.qty))
+        uow.commit()
+    return cmd.ref
+
+
+@pytest.fixture
+def bus(sqlite_uow: SqlAlchemyUnitOfWork) -> MessageBus:
+    return MessageBus(defaultdict(list), uow=sqlite_uow)
+
+
+@pytest.fixture
+def commits(sqlite_sessionmaker) -> list:
+    commits = []
+    event.listen(sqlite_sessionmaker.kw["bind"], "commit", commits.append)
+    return commits
+
+
+def stored_batches(uow: SqlAlchemyUnitOfWork) -> dict[str, list[str]]:
+    with uow:
+        return {
+            p.sku: sorted(b.reference for b in p.items) for p in uow[Product].all()
+        }
+
+
+def create_batches(n: int, skus: str = "ABC") -> list[commands.CreateBatch]:
+    return [commands.CreateBatch(f"b{i}", skus[i % len(skus)], 10) for i in range(n)]
+
+
+def test_handle_many_commits_once_per_chunk(bus: MessageBus, commits: list):
+    bus.register(commands.CreateBatch, add_batch)
+
+    result = bus.handle_many(create_batches(10), commit_every=4)
+
+    assert result.results == [[f"b{i}"] for i in range(10)]
+    assert result.errors == {} and result.commits == len(commits) == 3
+    assert stored_batches(bus.uow) == {
+        "A": ["b0", "b3", "b6", "b9"],
+        "B": ["b1", "b4", "b7"],
+        "C": ["b2", "b5", "b8"],
+    }
+
+
+def test_failed_chunk_is_retried_one_by_one(bus: MessageBus):
+    bus.register(commands.CreateBatch, add_batch)
+    messages = create_batches(6)
+    messages[4].qty = -1
+
+    result = bus.handle_many(messages, commit_every=3)
+
+    assert list(result.errors) == [4]
+    assert result.results[4] == [] and result.results[1] == ["b1"]
+    assert stored_batches(bus.uow) == {
+        "A": ["b0", "b3"],
+        "B": ["b1"],
+        "C": ["b2", "b5"],
+    }
+
+
+def test_batch_handler_receives_command_list(bus: MessageBus, commits: list):
+    calls = []
+
+    def add_batches(cmds: list[commands.CreateBatch], uow: SqlAlchemyUnitOfWork):
+        calls.append(len(cmds))
+        with uow:
+            products = {p.sku: p for p in uow[Product].get_many([c.sku for c in cmds])}
+            for cmd in cmds:
+                if cmd.sku not in products:
+                    products[cmd.sku] = Product(cmd.sku, items=[])
+                    uow[Product].add(products[cmd.sku])
+                products[cmd.sku].items.append(Batch(cmd.ref, cmd.sku, cmd.qty))
+            uow.commit()
+        return [cmd.ref for cmd in cmds]
+
+    bus.register(commands.CreateBatch, add_batches)
+    bus.batch_commands.add(commands.CreateBatch)
+
+    result = bus.handle_many(create_batches(5, skus="AB"), commit_every=100)
+    assert calls == [5] and len(commits) == 1
+    assert result.results == [[f"b{i}"] for i in range(5)]
+
+    assert bus.handle(commands.CreateBatch("b5", "C", 1)) == ["b5"]
+    assert calls == [5, 1]
+    assert stored_batches(bus.uow) == {
+        "A": ["b0", "b2", "b4"],
+        "B": ["b1", "b3"],
+        "C": ["b5"],
+    }
+
+
+def allocate(cmd: commands.Allocate, uow: SqlAlchemyUnitOfWork):
+    with uow:
+        product = uow[Product].get(cmd.sku)
+        if not product:
+            raise ValueError(f"unknown sku: {cmd.sku}")
+        product.messages.append(events.Allocated(cmd.orderid, cmd.sku, cmd.qty, ""))
+        uow.commit()
+    return cmd.orderid
+
+
+def test_same_key_messages_keep_input_order(bus: MessageBus):
+    bus.register(commands.CreateBatch, add_batch)
+    bus.register(commands.Allocate, allocate)
+    messages = [
+        commands.CreateBatch("b1", "A", 10),
+        commands.Allocate("o1", "A", 1),
+        commands.CreateBatch("b2", "B", 10),
+        commands.Allocate("o2", "B", 1),
+    ]
+
+    result = bus.handle_many(messages)
+
+    assert result.errors == {}
+    assert result.results == [["b1"], ["o1"], ["b2"], ["o2"]]
+
+
+def test_followup_events_are_handled_after_commit(bus: MessageBus, commits: list):
+    published = []
+    bus.register(commands.CreateBatch, add_batch)
+    bus.register(commands.Allocate, allocate)
+
+    def publish(e: events.Allocated):
+        published.append((e.orderid, len(commits)))
+
+    bus.register(events.Allocated, publish)
+    messages = [
+        commands.CreateBatch("b1", "A", 10),
+        commands.Allocate("o1", "A", 1),
+        commands.Allocate("o2", "B", 1),  # 없는 상품이라 실패합니다.
+        commands.Allocate("o3", "A", 1),
+    ]
+
+    result = bus.handle_many(messages, commit_every=2)
+
+    assert list(result.errors) == [2]
+    # 첫 묶음의 이벤트는 커밋 후에 한 번만, 실패한 묶음의 이벤트는 메세지를 하나씩
+    # 다시 처리하면서 커밋된 것만 발행됩니다.
+    assert published == [("o1", 1), ("o3", 2)]
@@ -0,0 +1,119 @@
+"""이벤트 소싱 레포지터리 통합 테스트."""
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import sessionmaker
+
+from fastmsa.core import ConcurrencyConflict, Event
+from fastmsa.eventsource import (
+    EventSourced,
+    EventSourcedRepository,
+    Snapshot,
+    events_table,
+    init_event_store,
+)
+from fastmsa.uow import SqlAlchemyUnitOfWork
+
+
+@dataclass
+class Opened(Event):
+    account_id: str
+
+
+@dataclass
+class Deposited(Event):
+    account_id: str
+    amount: int
+
+
+class Account(EventSourced):
+    snapshot_every = 3
+    applied = 0
+
+    @staticmethod
+    def open(account_id: str) -> "Account":
+        account = Account.empty(account_id)
+        account.record(Opened(account_id))
+        return account  # type: ignore
+
+    def deposit(self, amount: int):
+        self.record(Deposited(self.id, amount))
+
+    def apply(self, event: Event):
+        Account.applied += 1
+        if isinstance(event, Opened):
+            self.balance = 0
+        elif isinstance(event, Deposited):
+            self.balance += event.amount
+
+
+@pytest.fixture
+def get_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    metadata = MetaData()
+    init_event_store(metadata)
+    metadata.create_all(engine)
+    return sessionmaker(engine)
+
+
+def make_uow(get_session) -> SqlAlchemyUnitOfWork:
+    return SqlAlchemyUnitOfWork(
+        [Account],
+        get_session=get_session,
+        repo_maker={Account: lambda s: EventSourcedRepository(Account, s)},
+    )
+
+
+def test_events_are_appended_and_rebuilt_from_snapshot(get_session):
+    uow = make_uow(get_session)
+    with uow:
+        account = Account.open("a1")
+        uow[Account].add(account)
+        for amount in [10, 20, 30]:
+            account.deposit(amount)
+        uow.commit()
+
+    with uow:
+        uow[Account].get("a1").deposit(40)  # type: ignore
+        uow.commit()
+
+    session = get_session()
+    rows = session.execute(events_table.select()).all()
+    assert [r.version for r in rows] == [1, 2, 3, 4, 5]
+    assert [r.event_type for r in rows] == ["Opened"] + ["Deposited"] * 4
+    # 스냅샷은 커밋 시점의 상태로 저장됩니다.
+    assert session.get(Snapshot, ("Account", "a1")).version == 4
+
+    Account.applied = 0
+    with uow:
+        repo = uow[Account]
+        account = repo.get("a1")
+        assert account and account.balance == 100
+        # 스냅샷 이후의 이벤트 1개만 적용합니다.
+        assert Account.applied == 1
+        assert repo.version_of(account) == 5
+        assert repo.get("missing") is None
+        assert [a.id for a in repo.all()] == ["a1"]
+
+        # 삭제한 Aggregate 는 로더 캐시에서도 지워집니다.
+        repo.delete(account)
+        assert repo.get("a1") is None
+
+
+def test_concurrent_append_raises_conflict(get_session):
+    uow = make_uow(get_session)
+    with uow:
+        uow[Account].add(Account.open("a1"))
+        uow.commit()
+
+    uow1, uow2 = make_uow(get_session), make_uow(get_session)
+    with uow1, uow2:
+        uow1[Account].get("a1").deposit(1)  # type: ignore
+        uow2[Account].get("a1").deposit(2)  # type: ignore
+        uow1.commit()
+        with pytest.raises(ConcurrencyConflict):
+            uow2.commit()
+
+    with uow:
+        assert uow[Account].get("a1").balance == 1  # type: ignore
@@ -0,0 +1,116 @@
+"""SQL 멱등성 키 저장소 통합 테스트."""
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from fastmsa.event import MessageBus
+from fastmsa.idempotency import SqlIdempotencyStore, idempotency_metadata
+from fastmsa.idempotency import idempotency_table as table
+from fastmsa.uow import SqlAlchemyUnitOfWork
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+@pytest.fixture
+def store(sqlite_sessionmaker) -> SqlIdempotencyStore:
+    idempotency_metadata.create_all(sqlite_sessionmaker.kw["bind"])
+    return SqlIdempotencyStore(sqlite_sessionmaker)
+
+
+def test_key_is_committed_with_handler_transaction(
+    sqlite_uow: SqlAlchemyUnitOfWork, store: SqlIdempotencyStore
+):
+    calls = []
+
+    def create_batch(cmd: commands.CreateBatch, uow: SqlAlchemyUnitOfWork):
+        calls.append(cmd.ref)
+        with uow:
+            uow[Product].add(Product(cmd.sku, items=[]))
+            uow.commit()
+        if cmd.ref == "crash":
+            raise RuntimeError("crashed before storing the result")
+        return cmd.ref
+
+    bus = MessageBus(defaultdict(list), uow=sqlite_uow)
+    bus.register(commands.CreateBatch, create_batch)
+    bus.idempotency = store
+
+    for _ in range(2):
+        cmd = commands.CreateBatch("b1", "LAMP", 10)
+        cmd.idempotency_key = "k1"
+        assert bus.handle(cmd) == ["b1"]
+
+    cmd = commands.CreateBatch("crash", "SOFA", 10)
+    cmd.idempotency_key = "k2"
+    with pytest.raises(RuntimeError):
+        bus.handle(cmd)
+    # 커밋된 커맨드는 결과가 없어도 다시 실행하지 않습니다.
+    assert bus.handle(cmd) == []
+    assert calls == ["b1", "crash"]
+
+    with sqlite_uow:
+        assert {p.sku for p in sqlite_uow[Product].all()} == {"LAMP", "SOFA"}
+        rows = sqlite_uow.session.execute(select(table.c.key)).scalars().all()
+        assert sorted(rows) == ["CreateBatch:k1", "CreateBatch:k2"]
+
+    assert store.purge(older_than=timedelta(seconds=-1)) == 2
+
+
+def test_concurrent_duplicate_waits_for_result(sqlite_sessionmaker, store):
+    from fastmsa.core import ConcurrencyConflict
+    from tests.conftest import create_uow
+
+    committed, release = threading.Event(), threading.Event()
+
+    def create_batch(cmd: commands.CreateBatch, uow: SqlAlchemyUnitOfWork):
+        with uow:
+            uow[Product].add(Product(cmd.sku, items=[]))
+            uow.commit()
+        committed.set()
+        release.wait(5)
+        return cmd.ref
+
+    handlers: dict = defaultdict(list)
+    buses = [
+        MessageBus(handlers, uow=create_uow(sqlite_sessionmaker), conflict_retries=0)
+        for _ in range(2)
+    ]
+    buses[0].register(commands.CreateBatch, create_batch)  # 핸들러 맵은 공유합니다.
+    for bus in buses:
+        bus.idempotency = store
+
+    def command():
+        cmd = commands.CreateBatch("b1", "LAMP", 10)
+        cmd.idempotency_key = "k1"
+        return cmd
+
+    first = threading.Thread(target=buses[0].handle, args=(command(),))
+    first.start()
+    assert committed.wait(5)
+    # 먼저 실행된 커맨드가 커밋했지만 아직 결과를 저장하지 않았습니다.
+    with pytest.raises(ConcurrencyConflict):
+        buses[1].handle(command())
+
+    release.set()
+    first.join()
+    assert buses[1].handle(command()) == ["b1"]
+
+
+def test_pending_key_without_result_expires(sqlite_sessionmaker, store):
+    from fastmsa.core import ConcurrencyConflict
+
+    def add_pending(key: str, age: timedelta):
+        with sqlite_sessionmaker() as session, session.begin():
+            created = datetime.utcnow() - age
+            session.execute(table.insert().values(key=key, created=created))
+
+    add_pending("running", timedelta(seconds=1))
+    add_pending("crashed", store.lock_timeout + timedelta(seconds=1))
+
+    with pytest.raises(ConcurrencyConflict):
+        store.get("running")
+    # 결과를 저장하기 전에 프로세스가 종료된 커맨드는 다시 실행하지 않습니다.
+    assert store.get("crashed") is None
@@ -0,0 +1,125 @@
+"""SQL 실행 계측 테스트."""
+from collections import defaultdict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from fastmsa.api import mount_admin_routes
+from fastmsa.event import MessageBus
+from fastmsa.instrument import SqlInstrument, SqlScope, sql_stats
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+    return engine
+
+
+@pytest.fixture
+def stats(engine):
+    stats = SqlInstrument(slow_threshold=10)
+    stats.attach(engine)
+    yield stats
+    stats.detach(engine)
+
+
+def test_records_statement_latency_and_rows(engine, stats: SqlInstrument):
+    with engine.connect() as conn:
+        conn.execute("INSERT INTO item (name) VALUES ('a'), ('b')")
+        conn.execute("SELECT * FROM item")
+        conn.execute("SELECT   *\n  FROM item")
+
+    snapshot = stats.snapshot()
+    assert snapshot["latency"]["count"] == 3
+    insert = snapshot["statements"]["INSERT INTO item (name) VALUES ('a'), ('b')"]
+    assert insert["count"] == 1 and insert["rows"] == 2
+    assert snapshot["statements"]["SELECT * FROM item"]["count"] == 2
+    assert sum(b["count"] for b in snapshot["latency"]["buckets"]) == 3
+
+
+def test_counts_statements_per_scope_and_logs_slow_queries(
+    engine, stats: SqlInstrument
+):
+    def handler(message):
+        ...
+
+    stats.slow_threshold = 0.0
+    message = commands.Allocate("o1", "LAMP", 1)
+    for _ in range(2):
+        with SqlScope("message", "Allocate", message, handler, stats=stats):
+            with engine.connect() as conn:
+                conn.execute("SELECT * FROM item")
+                conn.execute("SELECT * FROM item")
+
+    assert stats.scopes[("message", "Allocate")].scopes == 2
+    assert stats.scopes[("message", "Allocate")].statements == 4
+    assert stats.scopes[("message", "Allocate")].max_statements == 2
+    slow = stats.slow_queries[-1]
+    assert slow.handler.endswith("handler")
+    assert slow.message == repr(message)
+
+
+def test_messagebus_records_message_scopes(engine):
+    def allocate(e: commands.Allocate):
+        with engine.connect() as conn:
+            conn.execute("SELECT * FROM item")
+
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.Allocate, allocate)
+    sql_stats.reset()
+    sql_stats.attach(engine)
+    try:
+        bus.handle(commands.Allocate("o1", "LAMP", 1))
+    finally:
+        sql_stats.detach(engine)
+
+    assert sql_stats.snapshot()["scopes"]["message"]["Allocate"]["statements"] == 1
+
+
+def test_sql_stats_endpoint(engine):
+    app = FastAPI()
+    mount_admin_routes(app)
+    sql_stats.reset()
+    sql_stats.attach(engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute("SELECT * FROM item")
+    finally:
+        sql_stats.detach(engine)
+
+    res = TestClient(app).get("/_fastmsa/stats/sql", params={"reset": True})
+
+    assert res.status_code == 200
+    assert res.json()["statements"]["SELECT * FROM item"]["count"] == 1
+    assert sql_stats.snapshot()["statements"] == {}
+
+
+def test_records_failed_statements(engine, stats: SqlInstrument):
+    from sqlalchemy.exc import IntegrityError
+
+    with engine.connect() as conn:
+        conn.execute("INSERT INTO item (id, name) VALUES (1, 'a')")
+        with pytest.raises(IntegrityError):
+            conn.execute("INSERT INTO item (id, name) VALUES (1, 'a')")
+        # 실패한 문장의 시작 시각이 남아있지 않습니다.
+        assert conn.info["fastmsa_query_start"] == []
+
+    statements = stats.snapshot()["statements"]
+    insert = statements["INSERT INTO item (id, name) VALUES (1, 'a')"]
+    assert (insert["count"], insert["errors"]) == (2, 1)
+
+
+def test_does_not_keep_disposed_engines_alive():
+    import gc
+
+    stats = SqlInstrument()
+    stats.attach(create_engine("sqlite://"))
+    gc.collect()
+    assert len(stats.engines) == 0
@@ -90,3 +90,83 @@ def test_retrieving_allocations(session: Session) -> None:
     batch = session.query(models.Batch).one()
 
     assert batch._allocations == {models.OrderLine("order1", "sku1", 12)}
+
+
+def test_sync_schema_skips_create_all_when_fingerprint_matches(tmp_path) -> None:
+    from sqlalchemy import (
+        Column,
+        Integer,
+        MetaData,
+        Table,
+        create_engine,
+        event,
+        inspect,
+    )
+
+    from fastmsa.orm import schema_fingerprint, sync_schema
+
+    meta = MetaData()
+    Table("item", meta, Column("id", Integer, primary_key=True))
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    fingerprint = schema_fingerprint(meta, engine)
+
+    assert sync_schema(engine, meta)
+    assert not sync_schema(engine, meta)
+
+    Table("other", meta, Column("id", Integer, primary_key=True))
+    assert schema_fingerprint(meta, engine) != fingerprint
+    assert sync_schema(engine, meta)
+    assert "other" in inspect(engine).get_table_names()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    cache_file = tmp_path / "schema.fingerprint"
+    assert not sync_schema(engine, meta, cache_file=cache_file)
+    assert len(statements) == 1  # SELECT fingerprint
+
+    statements.clear()
+    assert not sync_schema(engine, meta, cache_file=cache_file)
+    assert statements == []
+
+
+def test_concurrent_workers_sync_schema_once(tmp_path) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sqlalchemy import Column, Integer, MetaData, Table, create_engine, select
+
+    from fastmsa.orm import schema_table, sync_schema
+
+    meta = MetaData()
+    for i in range(20):
+        Table(f"item{i}", meta, Column("id", Integer, primary_key=True))
+    url = f"sqlite:///{tmp_path / 'schema.db'}"
+
+    def start_worker(_):
+        # 워커 프로세스마다 자신의 엔진으로 시작합니다.
+        engine = create_engine(url)
+        try:
+            return sync_schema(engine, meta)
+        finally:
+            engine.dispose()
+
+    with ThreadPoolExecutor(4) as pool:
+        created = list(pool.map(start_worker, range(4)))
+
+    assert created.count(True) == 1
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert len(conn.execute(select(schema_table)).all()) == 1
+
+def test_default_poolclass_isolates_connections_per_thread() -> None:
+    from sqlalchemy.pool import QueuePool, StaticPool
+
+    from fastmsa.orm import default_poolclass
+
+    assert default_poolclass("sqlite://") is StaticPool
+    assert default_poolclass("sqlite:///:memory:") is StaticPool
+    assert default_poolclass("sqlite:////tmp/app.db") is None  # 방언 기본값
+    assert default_poolclass("postgresql://postgres@localhost/app") is QueuePool
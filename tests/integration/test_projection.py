@@ -0,0 +1,178 @@
+"""읽기 모델 프로젝션 통합 테스트."""
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, create_engine, select
+
+from fastmsa import serialize
+from fastmsa.event import MessageBus
+from fastmsa.eventsource import events_table, init_event_store
+from fastmsa.journal import JournalWriter
+from fastmsa.projection import (
+    Projection,
+    ProjectionEngine,
+    event_store_source,
+    journal_source,
+)
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands, events
+from tests.app.domain.aggregates import Product
+
+
+def make_projection(table="allocations_view") -> Projection:
+    allocations = Projection(table, key=["orderid", "sku"])
+
+    @allocations.upsert(events.Allocated)
+    def _(e: events.Allocated):
+        return dict(orderid=e.orderid, sku=e.sku, batchref=e.batchref)
+
+    @allocations.delete(events.Deallocated)
+    def _(e: events.Deallocated):
+        return dict(orderid=e.orderid, sku=e.sku)
+
+    return allocations
+
+
+@pytest.fixture
+def metadata():
+    metadata = MetaData()
+    for name, unique in [("allocations_view", True), ("allocations_plain", False)]:
+        Table(
+            name,
+            metadata,
+            Column("orderid", String(255), primary_key=unique),
+            Column("sku", String(255), primary_key=unique),
+            Column("batchref", String(255)),
+        )
+    init_event_store(metadata)
+    return metadata
+
+
+@pytest.fixture
+def engine(tmp_path, metadata):
+    engine = create_engine(f"sqlite:///{tmp_path / 'views.db'}")
+    metadata.create_all(engine)
+    return engine
+
+
+def view_rows(engine, table="allocations_view"):
+    with engine.connect() as conn:
+        rows = conn.execute(f"SELECT orderid, sku, batchref FROM {table}").all()
+    return sorted(tuple(r) for r in rows)
+
+
+def allocated(orderid, sku, batchref):
+    return events.Allocated(orderid, sku, 1, batchref)
+
+
+@pytest.mark.parametrize("table", ["allocations_view", "allocations_plain"])
+def test_apply_collapses_changes_per_key(engine, metadata, table):
+    projections = ProjectionEngine(engine, [make_projection(table)], metadata)
+
+    stats = projections.apply(
+        [
+            allocated("o1", "LAMP", "b1"),
+            events.Deallocated("o1", "LAMP", 1),
+            allocated("o1", "LAMP", "b2"),
+            allocated("o2", "LAMP", "b1"),
+            allocated("o3", "SOFA", "b3"),
+        ]
+    )
+    projections.apply(
+        [allocated("o3", "SOFA", "b4"), events.Deallocated("o2", "LAMP", 1)]
+    )
+
+    assert (stats.events, stats.rows, stats.batches) == (5, 3, 1)
+    assert view_rows(engine, table) == [("o1", "LAMP", "b2"), ("o3", "SOFA", "b4")]
+
+
+def append_events(engine, messages):
+    with engine.begin() as conn:
+        conn.execute(
+            events_table.insert(),
+            [
+                dict(
+                    aggregate_type="Product",
+                    aggregate_id=f"{m.sku}/{m.orderid}/{type(m).__name__}",
+                    version=1,
+                    event_type=type(m).__name__,
+                    payload=serialize.dumps(m),
+                    created=datetime.utcnow(),
+                )
+                for m in messages
+            ],
+        )
+
+
+def test_run_from_event_store_with_checkpoint_and_rebuild(engine, metadata):
+    projections = ProjectionEngine(engine, [make_projection()], metadata, batch_size=7)
+    source = lambda after: event_store_source(engine, after, page_size=10)  # noqa
+
+    append_events(engine, [allocated(f"o{i}", "LAMP", "b1") for i in range(25)])
+    stats = projections.run(source, chunk_size=20)
+    assert (stats.events, stats.position) == (25, 25)
+    assert projections.checkpoint("allocations_view") == 25
+
+    append_events(
+        engine,
+        [events.Deallocated(f"o{i}", "SKU", 1) for i in range(5)]
+        + [events.Deallocated(f"o{i}", "LAMP", 1) for i in range(5)],
+    )
+    stats = projections.run(source)
+    assert (stats.events, stats.position) == (10, 35)
+    expected = [(f"o{i}", "LAMP", "b1") for i in range(5, 25)]
+    assert view_rows(engine) == sorted(expected)
+
+    stats = projections.rebuild(source, workers=3, chunk_size=8)
+    assert (stats.events, stats.position) == (35, 35)
+    assert view_rows(engine) == sorted(expected)
+
+
+def test_run_from_journal(engine, metadata, tmp_path):
+    with JournalWriter(tmp_path / "journal") as journal:
+        journal.write(commands.Allocate("o1", "LAMP", 1))
+        journal.write(allocated("o1", "LAMP", "b1"))
+
+    projections = ProjectionEngine(engine, [make_projection()], metadata)
+    stats = projections.run(lambda after: journal_source(tmp_path / "journal", after))
+
+    assert (stats.events, stats.position) == (1, 2)
+    assert view_rows(engine) == [("o1", "LAMP", "b1")]
+
+
+def test_attach_to_messagebus(engine, metadata):
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    projections = ProjectionEngine(engine, [make_projection()], metadata, batch_size=3)
+    projections.attach(bus, interval=10)
+
+    for i in range(4):
+        bus.handle(allocated(f"o{i}", "LAMP", "b1"))
+    # batch_size 만큼 모이면 주기를 기다리지 않고 반영합니다.
+    assert len(view_rows(engine)) == 3
+
+    projections.close()
+    assert len(view_rows(engine)) == 4
+    with engine.connect() as conn:
+        assert conn.execute(select(events_table.c.id)).all() == []
+
+
+def test_failed_flush_keeps_events_in_order(engine, metadata, monkeypatch):
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    projections = ProjectionEngine(engine, [make_projection()], metadata)
+    projections.attach(bus, interval=10)
+    bus.handle(allocated("o1", "LAMP", "b1"))
+
+    def fail(events, position=None):
+        raise RuntimeError("DB is down")
+
+    monkeypatch.setattr(projections, "apply", fail)
+    with pytest.raises(RuntimeError):
+        projections.flush()
+    monkeypatch.undo()
+
+    bus.handle(events.Deallocated("o1", "LAMP", 1))
+    bus.handle(allocated("o2", "LAMP", "b1"))
+    projections.close()
+    # 실패한 배치의 이벤트가 이후 이벤트보다 먼저 반영됩니다.
+    assert view_rows(engine) == [("o2", "LAMP", "b1")]
@@ -1,4 +1,8 @@
 # pylint: disable=protected-access
+import asyncio
+
+import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from fastmsa.repo import SqlAlchemyRepository
@@ -45,3 +49,103 @@ def test_repository_can_retrieve_a_batch_with_allocations(session: Session) -> N
     assert retrieved._allocations == {
         OrderLine("order1", "GENERIC-SOFA", 12),
     }
+
+
+def test_repository_get_with_lock(session: Session) -> None:
+    insert_product(session, "GENERIC-SOFA")
+    insert_product(session, "GENERIC-TABLE")
+    insert_product(session, "GENERIC-CHAIR")
+
+    repo = SqlAlchemyRepository(Product, session)
+    product = repo.get("GENERIC-SOFA", lock="update")
+    products = repo.get_many(["GENERIC-TABLE", "GENERIC-SOFA", "NONE"], lock="nowait")
+
+    assert product and product.sku == "GENERIC-SOFA"
+    assert [p.sku for p in products] == ["GENERIC-SOFA", "GENERIC-TABLE"]
+    assert repo.seen == set(products)
+
+
+def test_repository_get_by_passes_lock(session: Session) -> None:
+    from fastmsa.core import FastMSAError
+    from tests.app.adapters.repos import SqlAlchemyProductRepository
+
+    insert_product(session, "GENERIC-SOFA")
+    insert_batch(session, "batch1", "GENERIC-SOFA")
+
+    repo = SqlAlchemyProductRepository(Product, session)
+    product = repo.get(by_batchref="batch1", lock="update")
+    assert product and product.sku == "GENERIC-SOFA"
+
+    repo._get_by_sku = lambda sku: None  # type: ignore
+    with pytest.raises(FastMSAError):
+        repo.get(by_sku="GENERIC-SOFA", lock="update")
+
+
+@pytest.mark.asyncio
+async def test_repository_loader_batches_gets_in_same_tick(session: Session) -> None:
+    for sku in ["GENERIC-SOFA", "GENERIC-TABLE", "GENERIC-CHAIR"]:
+        insert_product(session, sku)
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt),
+    )
+
+    repo = SqlAlchemyRepository(Product, session)
+    skus = ["GENERIC-SOFA", "GENERIC-TABLE", "GENERIC-SOFA", "NONE"]
+    products = await asyncio.gather(*(repo.loader.load(sku) for sku in skus))
+
+    assert [p and p.sku for p in products] == skus[:3] + [None]
+    assert len(statements) == 1 and " IN " in statements[0]
+    assert repo.seen == {products[0], products[1]}
+
+    # 캐시된 키는 다시 조회하지 않습니다.
+    more = repo.loader.get_many(["GENERIC-TABLE", "GENERIC-CHAIR", "NONE"])
+    assert [p and p.sku for p in more] == ["GENERIC-TABLE", "GENERIC-CHAIR", None]
+    assert await repo.loader.load("GENERIC-CHAIR") is more[1]
+    assert len(statements) == 2 and repo.loader.batches == 2
+
+
+def test_repository_get_uses_loader_cache(session: Session) -> None:
+    for sku in ["GENERIC-SOFA", "GENERIC-TABLE", "GENERIC-CHAIR"]:
+        insert_product(session, sku)
+    repo = SqlAlchemyRepository(Product, session)
+    calls = []
+    get = repo._get
+    repo._get = lambda id="", **kwargs: calls.append(id) or get(id, **kwargs)
+
+    [sofa, _] = repo.loader.get_many(["GENERIC-SOFA", "GENERIC-TABLE"])
+    assert repo.get("GENERIC-SOFA") is sofa
+    chair = repo.get("GENERIC-CHAIR")
+    assert repo.get("GENERIC-CHAIR") is chair
+    assert calls == ["GENERIC-CHAIR"]
+
+    repo.delete(chair)
+    assert repo.loader.cached("GENERIC-CHAIR") is None
+
+
+@pytest.mark.asyncio
+async def test_repository_loader_sees_added_item_after_miss(session: Session) -> None:
+    repo = SqlAlchemyRepository(Product, session)
+    assert await repo.loader.load("NEW-LAMP") is None
+
+    lamp = Product("NEW-LAMP", [])
+    repo.add(lamp)
+    assert await repo.loader.load("NEW-LAMP") is lamp
+    assert repo.get("NEW-LAMP") is lamp
+
+
+def test_lock_modes_render_for_update_clauses(session: Session) -> None:
+    from sqlalchemy.dialects import postgresql
+
+    from fastmsa.repo import FOR_UPDATE_ARGS
+
+    def render(lock):
+        query = session.query(Product).with_for_update(**FOR_UPDATE_ARGS[lock])
+        return str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert render("update").endswith("FOR UPDATE")
+    assert render("nowait").endswith("FOR UPDATE NOWAIT")
+    assert render("skip_locked").endswith("FOR UPDATE SKIP LOCKED")
+    assert render("share").endswith("FOR SHARE")
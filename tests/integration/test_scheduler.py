@@ -0,0 +1,89 @@
+"""SQL 예약 저장소 통합 테스트."""
+import time
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import func, select
+
+from fastmsa.event import MessageBus
+from fastmsa.scheduler import (
+    MessageScheduler,
+    SqlScheduleStore,
+    schedule_metadata,
+    schedule_table,
+)
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+@pytest.fixture
+def store(sqlite_sessionmaker) -> SqlScheduleStore:
+    schedule_metadata.create_all(sqlite_sessionmaker.kw["bind"])
+    yield SqlScheduleStore(sqlite_sessionmaker, lease=30)
+    schedule_metadata.drop_all(sqlite_sessionmaker.kw["bind"])
+
+
+def count_rows(store: SqlScheduleStore) -> int:
+    with store.get_session() as session:
+        query = select(func.count()).select_from(schedule_table)
+        return session.execute(query).scalar()
+
+
+def test_each_due_message_is_claimed_by_one_scheduler(store: SqlScheduleStore):
+    handled = []
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.ChangeBatchQuantity, lambda c: handled.append(c.ref))
+    first, second = MessageScheduler(bus, store), MessageScheduler(bus, store)
+
+    for i in range(3):
+        first.schedule(commands.ChangeBatchQuantity(f"b{i}", i), after=10)
+    second.schedule(commands.ChangeBatchQuantity("b3", 3), after=100)
+    assert count_rows(store) == 4
+
+    later = time.time() + 11
+    assert second.run_pending(later) == 3
+    assert first.run_pending(later) == 0
+    assert sorted(handled) == ["b0", "b1", "b2"]
+    assert count_rows(store) == 1
+
+    # 재시작한 프로세스도 저장소에 남은 예약을 처리합니다.
+    restarted = MessageScheduler(bus, store)
+    assert restarted.run_pending(time.time() + 101) == 1
+    assert handled[-1] == "b3" and count_rows(store) == 0
+
+
+def test_claimed_message_is_reclaimed_after_lease(store: SqlScheduleStore):
+    store.add("t1", time.time(), commands.ChangeBatchQuantity("b1", 1))
+
+    now = time.time()
+    assert list(store.claim(now, 10)) == ["t1"]
+    assert store.claim(now + 1, 10) == {}  # 처리 중인 메세지.
+    # 처리하던 프로세스가 종료되어 lease 가 지나면 다시 가져갈 수 있습니다.
+    assert list(store.claim(now + 31, 10)) == ["t1"]
+
+
+def test_failed_message_stays_in_store_until_retried(store: SqlScheduleStore):
+    broken = [True]
+    handled = []
+
+    def flaky(cmd: commands.ChangeBatchQuantity):
+        if broken:
+            raise ValueError("temporary failure")
+        handled.append(cmd.ref)
+
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.ChangeBatchQuantity, flaky)
+    scheduler = MessageScheduler(bus, store, retry_delay=5)
+    scheduler.schedule(commands.ChangeBatchQuantity("b1", 1), after=1)
+
+    now = time.time() + 2
+    assert scheduler.run_pending(now) == 1
+    assert count_rows(store) == 1 and handled == []
+    # 다른 프로세스도 재시도 시각이 지나면 가져갈 수 있습니다.
+    broken.clear()
+    other = MessageScheduler(bus, store)
+    assert other.run_pending(now + 4) == 0
+    assert other.run_pending(now + 5) == 1
+    assert handled == ["b1"] and count_rows(store) == 0
+    assert scheduler.run_pending(now + 6) == 0
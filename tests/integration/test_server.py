@@ -0,0 +1,122 @@
+"""프로덕션 실행 모드 테스트."""
+import threading
+from collections import defaultdict
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.pool import QueuePool
+
+from fastmsa.api import deferred_events, install_deferred_events
+from fastmsa.event import KeyedExecutor, MessageBus
+from fastmsa.orm import init_engine, reset_engines_after_fork
+from fastmsa.server import install_prod_hooks, warm_up
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands, events
+from tests.app.domain.aggregates import Product
+
+
+class FakeConfig:
+    def get_warmup_connections(self) -> int:
+        return 3
+
+    def get_drain_timeout(self) -> float:
+        return 5.0
+
+
+def test_warm_up_opens_connections_and_caches_handler_params(tmp_path):
+    def allocate(e: commands.Allocate, uow):
+        ...
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/warmup.db", poolclass=QueuePool, pool_size=5
+    )
+    bus = MessageBus(defaultdict(list))
+    bus.handlers[commands.Allocate].append(allocate)  # register() 없이 추가.
+
+    result = warm_up(bus, engine, connections=3)
+
+    assert result == {"connections": 3, "handlers": 1}
+    assert engine.pool.checkedin() == 3
+    assert "uow" in bus.params_cache[allocate]
+
+
+def test_reset_engines_after_fork_recreates_pool(tmp_path):
+    engine = init_engine(MetaData(), f"sqlite:///{tmp_path}/fork.db", sync="never")
+    old_pool = engine.pool
+
+    reset_engines_after_fork()
+
+    assert engine.pool is not old_pool
+
+
+def test_prod_hooks_drain_inflight_messages_on_shutdown(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    handled = []
+
+    def allocate(e: commands.Allocate):
+        started.set()
+        release.wait(5)
+        handled.append(e.orderid)
+
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.Allocate, allocate)
+    bus.executor = KeyedExecutor(
+        bus, lanes=1, uow_factory=lambda: FakeUnitOfWork({Product: "sku"})
+    )
+    app = FastAPI()
+    engine = create_engine(f"sqlite:///{tmp_path}/drain.db")
+    install_prod_hooks(app, FakeConfig(), bus, engine)  # type: ignore
+
+    with TestClient(app):
+        futures = [bus.submit(commands.Allocate(f"o{i}", "LAMP", 1)) for i in range(3)]
+        started.wait(5)
+        assert bus.inflight == 3
+        threading.Timer(0.05, release.set).start()
+
+    # 종료(shutdown) 이벤트에서 남은 메세지가 모두 처리될 때까지 기다립니다.
+    assert handled == ["o0", "o1", "o2"]
+    assert all(f.done() for f in futures)
+    assert bus.inflight == 0
+
+
+def test_deferred_events_are_handled_after_response():
+    release = threading.Event()
+    handled = []
+
+    def change_quantity(cmd: commands.ChangeBatchQuantity, uow: FakeUnitOfWork):
+        product = Product(cmd.ref, items=[])
+        product.messages.extend(
+            [events.Deallocated("o1", cmd.ref, 1), events.OutOfStock(cmd.ref)]
+        )
+        uow[Product].seen.add(product)
+        return "ok"
+
+    def out_of_stock(e: events.OutOfStock):
+        release.wait(5)
+        handled.append(e)
+
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.ChangeBatchQuantity, change_quantity)
+    bus.register(events.Deallocated, handled.append)
+    bus.register(events.OutOfStock, out_of_stock)
+    app = FastAPI()
+    drainer = install_deferred_events(app, bus, workers=1)
+
+    @app.post("/batches/{ref}", dependencies=[Depends(deferred_events)])
+    def post_change_quantity(ref: str):
+        [result] = bus.handle(commands.ChangeBatchQuantity(ref, 1))
+        return {"result": result}
+
+    with TestClient(app) as client:
+        assert client.post("/batches/LAMP").json() == {"result": "ok"}
+        # 우선순위와 관계없이 모두 미뤄졌으므로 핸들러가 끝나기 전에 응답합니다.
+        assert drainer.stats.deferred == 2
+        assert not any(isinstance(e, events.OutOfStock) for e in handled)
+        threading.Timer(0.05, release.set).start()
+
+    # 종료 이벤트에서 큐에 남은 이벤트를 모두 처리합니다.
+    assert [type(e) for e in handled] == [events.Deallocated, events.OutOfStock]
+    assert (drainer.stats.deferred, drainer.stats.processed) == (2, 2)
+    assert bus.handle(commands.ChangeBatchQuantity("TABLE", 1)) == ["ok"]
+    assert len(handled) == 4  # 요청 밖에서는 바로 처리합니다.
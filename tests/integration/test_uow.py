@@ -155,3 +155,168 @@ def test_rolls_back_on_error(get_session, cleanup_uow):
     new_session = get_session()
     rows = list(new_session.execute("SELECT * FROM batch WHERE sku=:sku", {"sku": sku}))
     assert rows == []
+
+
+@pytest.fixture
+def file_sessionmaker(tmp_path):
+    """스레드마다 별도 커넥션을 쓰는 파일 기반 SQLite 세션 팩토리."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from fastmsa.orm import clear_mappers, start_mappers
+    from tests.app.adapters.orm import init_mappers
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'uow.db'}", connect_args={"check_same_thread": False}
+    )
+    clear_mappers()
+    metadata = start_mappers(use_exist=False, init_hooks=[init_mappers])
+    metadata.create_all(engine)
+    return sessionmaker(engine)
+
+
+def run_concurrently(*funcs):
+    """주어진 함수들을 동시에 실행하고 (결과, 예외) 리스트를 리턴합니다."""
+    import threading
+
+    barrier = threading.Barrier(len(funcs))
+    outcomes: list[Any] = [None] * len(funcs)
+
+    def run(i, func):
+        barrier.wait()
+        try:
+            outcomes[i] = (func(), None)
+        except Exception as e:
+            outcomes[i] = (None, e)
+
+    threads = [threading.Thread(target=run, args=it) for it in enumerate(funcs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+def test_group_commit_merges_concurrent_commits(file_sessionmaker):
+    from fastmsa.uow import GroupCommitCoordinator
+    from tests.app.domain.models import Batch
+
+    coordinator = GroupCommitCoordinator(file_sessionmaker, window=0.2, max_batch=2)
+
+    def add_product(sku: str):
+        def _add():
+            uow = SqlAlchemyUnitOfWork(
+                [Product], file_sessionmaker, group_commit=coordinator
+            )
+            with uow:
+                uow[Product].add(Product(sku, [Batch(f"{sku}-b", sku, 10)]))
+                uow.commit()
+
+        return _add
+
+    outcomes = run_concurrently(add_product("sku-1"), add_product("sku-2"))
+
+    assert [e for _, e in outcomes] == [None, None]
+    assert coordinator.stats.groups == 1
+    assert coordinator.stats.commits == 2
+    rows = file_sessionmaker().execute("SELECT sku FROM batch ORDER BY sku")
+    assert [r[0] for r in rows] == ["sku-1", "sku-2"]
+
+
+def test_group_commit_fans_back_errors_to_each_caller(file_sessionmaker):
+    from sqlalchemy.exc import IntegrityError
+
+    from fastmsa.uow import GroupCommitCoordinator
+    from tests.app.domain.models import Batch
+
+    session = file_sessionmaker()
+    insert_product(session, "sku-dup")
+    insert_batch(session, "dup-ref", "sku-dup", 10, None)
+    session.commit()
+
+    coordinator = GroupCommitCoordinator(file_sessionmaker, window=0.2, max_batch=2)
+
+    def add_product(sku: str, ref: str):
+        def _add():
+            uow = SqlAlchemyUnitOfWork(
+                [Product], file_sessionmaker, group_commit=coordinator
+            )
+            with uow:
+                uow[Product].add(Product(sku, [Batch(ref, sku, 10)]))
+                uow.commit()
+
+        return _add
+
+    [(_, error1), (_, error2)] = run_concurrently(
+        add_product("sku-bad", "dup-ref"), add_product("sku-good", "good-ref")
+    )
+
+    assert isinstance(error1, IntegrityError)
+    assert error2 is None
+    assert coordinator.stats.groups == 1
+    assert coordinator.stats.failures == 1
+    rows = file_sessionmaker().execute("SELECT reference FROM batch ORDER BY reference")
+    assert [r[0] for r in rows] == ["dup-ref", "good-ref"]
+
+
+def test_concurrent_updates_raise_concurrency_conflict(
+    get_session: SessionMaker, session_with_product: Any
+):
+    from fastmsa.core import ConcurrencyConflict
+
+    ref, sku = random_batchref(), random_sku()
+    session_with_product(ref, sku, 100, None)
+    uow1 = SqlAlchemyUnitOfWork([Product], get_session)
+    uow2 = SqlAlchemyUnitOfWork([Product], get_session)
+
+    with uow1, uow2:
+        product1, product2 = uow1[Product].get(sku), uow2[Product].get(sku)
+        product1.allocate(OrderLine("o1", sku, 10))
+        product2.allocate(OrderLine("o2", sku, 10))
+        uow1.commit()
+        with pytest.raises(ConcurrencyConflict):
+            uow2.commit()
+
+    [[version]] = get_session().execute(
+        "SELECT version_number FROM product WHERE sku=:sku", dict(sku=sku)
+    )
+    assert version == 1
+
+
+def test_version_is_checked_without_writing_it_twice(sqlite_sessionmaker):
+    from sqlalchemy import event
+
+    session = sqlite_sessionmaker()
+    insert_product(session, "sku-v", version_number=3)
+    session.commit()
+    updates = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if statement.startswith("UPDATE product"):
+            updates.append((" ".join(statement.split()), parameters))
+
+    engine = sqlite_sessionmaker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", capture)
+    uow = SqlAlchemyUnitOfWork([Product], sqlite_sessionmaker)
+    with uow:
+        uow[Product].get("sku-v").version_number += 1
+        uow.commit()
+    event.remove(engine, "before_cursor_execute", capture)
+
+    [(guard, guard_params), (_, params)] = updates
+    assert "SET version_number=product.version_number" in guard
+    assert 4 not in guard_params and 4 in params
+
+
+def test_sqlite_savepoint_is_released_into_outer_transaction(file_sessionmaker):
+    from fastmsa.orm import enable_sqlite_savepoints
+
+    session = file_sessionmaker()
+    enable_sqlite_savepoints(session.get_bind())
+    with session.begin_nested():
+        insert_product(session, "sku-sp")
+    # pysqlite 기본 동작에서는 RELEASE 시점에 이미 커밋됩니다.
+    session.rollback()
+
+    rows = file_sessionmaker().execute("SELECT sku FROM product")
+    assert list(rows) == []
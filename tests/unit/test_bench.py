@@ -0,0 +1,101 @@
+"""벤치마크 러너 단위 테스트."""
+import asyncio
+
+import pytest
+
+from fastmsa import bench
+from fastmsa.bench import BENCHMARKS, Benchmark, benchmark, compare
+
+
+@pytest.fixture
+def registered():
+    names = []
+
+    def register(name, **kwargs):
+        names.append(name)
+        return benchmark(name, **kwargs)
+
+    yield register
+    for name in names:
+        BENCHMARKS.pop(name, None)
+
+
+def test_run_sync_and_async_benchmarks(registered, tmp_path):
+    calls = []
+
+    @registered("test.sync")
+    def sync_bench():
+        calls.append("setup")
+        yield lambda: None
+        calls.append("teardown")
+
+    @registered("test.async", group="macro")
+    def async_bench():
+        async def op():
+            await asyncio.sleep(0)
+
+        yield op
+
+    @registered("test.skipped", requires=lambda: "no server")
+    def skipped_bench():
+        yield lambda: None
+
+    results = bench.run(bench.select(["test.*"]), min_time=0.001, repeat=3)
+
+    assert calls == ["setup", "teardown"]
+    assert set(results["results"]) == {"test.sync", "test.async"}
+    assert results["skipped"] == {"test.skipped": "no server"}
+    sync = results["results"]["test.sync"]
+    assert sync["repeat"] == 3 and sync["iterations"] >= 1
+    assert sync["min"] <= sync["median"] and sync["ops"] > 0
+    assert [b.name for b in bench.select(["test.*"], group="macro")] == ["test.async"]
+
+    bench.save_results(results, tmp_path / "bench.json")
+    assert bench.load_results(tmp_path / "bench.json") == results
+
+
+def test_compare_flags_regressions():
+    def results(**medians):
+        return {"results": {k: {"median": v} for k, v in medians.items()}}
+
+    baseline = results(a=1.0, b=1.0, c=1.0, gone=1.0)
+    current = results(a=1.05, b=1.5, c=0.5, added=1.0)
+
+    statuses = {c.name: c.status for c in compare(current, baseline, threshold=0.1)}
+
+    assert statuses == {
+        "a": "ok",
+        "b": "regression",
+        "c": "improvement",
+        "added": "new",
+        "gone": "missing",
+    }
+
+
+@pytest.mark.parametrize("name", ["bus.command", "uow.fake", "repo.sqlite.get"])
+def test_builtin_benchmarks_run(name):
+    bench.load_suites()
+    result = bench.run_benchmark(BENCHMARKS[name], min_time=0.001, repeat=2)
+    assert result.name == name and result.median > 0
+
+
+def test_builtin_api_benchmark_runs():
+    bench.load_suites()
+    b: Benchmark = BENCHMARKS["api.allocate"]
+    assert bench.run_benchmark(b, min_time=0.001, repeat=1).median > 0
+
+
+def test_redis_requirement_probes_configured_host(monkeypatch):
+    import socket
+
+    from fastmsa.bench.app import REDIS_ENV
+    from fastmsa.bench.macro import _requires_redis
+
+    with socket.socket() as server:
+        server.bind(("127.0.0.2", 0))  # localhost 이외의 주소
+        server.listen()
+        host, port = server.getsockname()
+        monkeypatch.setenv(REDIS_ENV, f"{host}:{port}")
+        assert _requires_redis() is None
+
+    assert _requires_redis() == f"Redis is not running at {host}:{port}"
@@ -0,0 +1,109 @@
+"""뷰 캐시 단위 테스트."""
+import fnmatch
+from collections import defaultdict
+
+import pytest
+
+import fastmsa.cache
+from fastmsa.cache import LRUCache, RedisCache, cached_view
+from fastmsa.event import MessageBus
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import events
+from tests.app.domain.aggregates import Product
+
+
+class FakeSyncRedis:
+    """``get``, ``set``, ``delete``, ``scan_iter`` 만 제공하는 Redis 클라이언트."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def scan_iter(self, match="*"):
+        return [k.encode() for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+
+@pytest.fixture
+def bus() -> MessageBus:
+    return MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+
+
+@pytest.mark.parametrize("backend", [None, RedisCache(FakeSyncRedis())])
+def test_cached_view_evicts_matching_entries_on_events(bus: MessageBus, backend):
+    calls = []
+
+    @cached_view(
+        invalidate_on={
+            events.Allocated: "orderid",
+            events.Deallocated: {"orderid": "orderid", "sku": "sku"},
+            events.OutOfStock: None,
+        },
+        backend=backend,
+        bus=bus,
+    )
+    def get_allocation(orderid: str, sku: str, uow=None):
+        calls.append((orderid, sku))
+        return [orderid, sku, len(calls)]
+
+    def query():
+        return [
+            get_allocation(o, s, uow=object()) for o in ["o1", "o2"] for s in "ab"
+        ]
+
+    first = query()
+    assert query() == first and len(calls) == 4
+    assert get_allocation.cache_info().hits == 4
+
+    bus.handle(events.Allocated("o1", "a", 1, "b1"))
+    query()
+    assert calls[4:] == [("o1", "a"), ("o1", "b")]
+
+    bus.handle(events.Deallocated("o2", "b", 1))
+    query()
+    assert calls[6:] == [("o2", "b")]
+
+    bus.handle(events.OutOfStock("a"))
+    query()
+    assert len(calls) == 11
+
+
+def test_lru_cache_size_and_ttl(monkeypatch):
+    cache = LRUCache(maxsize=2)
+    cache.set("v", (1,), "one", None)
+    cache.set("v", (2,), "two", None)
+    cache.get("v", (1,))
+    cache.set("v", (3,), "three", 10)
+
+    assert len(cache) == 2
+    assert cache.get("v", (2,)) is fastmsa.cache.MISS
+    assert cache.get("v", (1,)) == "one"  # 최근에 사용해서 남아있음.
+
+    monkeypatch.setattr(fastmsa.cache.time, "monotonic", lambda: 1e12)
+    assert cache.get("v", (3,)) is fastmsa.cache.MISS  # 만료됨.
+    assert cache.get("v", (1,)) == "one"
+
+
+def test_cached_view_skips_result_invalidated_while_computing(bus: MessageBus):
+    stock = {"a": 1}
+
+    @cached_view(invalidate_on={events.OutOfStock: "sku"}, bus=bus)
+    def get_stock(sku: str):
+        value = stock[sku]
+        if value == 1:
+            # 조회한 뒤 결과를 캐시하기 전에 다른 요청이 데이터를 바꿉니다.
+            stock[sku] = 0
+            bus.handle(events.OutOfStock(sku))
+        return value
+
+    assert get_stock("a") == 1
+    assert get_stock("a") == 0
+    assert get_stock.cache_info().misses == 2
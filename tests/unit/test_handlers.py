@@ -94,3 +94,67 @@ class TestChangeBatchQuantity:
         assert batch1.available_quantity == 5
         # and 20 will be reallocated to the next batch
         assert batch2.available_quantity == 30
+
+
+class TestConcurrencyConflict:
+    def test_command_is_retried_on_conflict(self, uow: FakeUnitOfWork):
+        from collections import defaultdict
+
+        from fastmsa.core import ConcurrencyConflict
+
+        calls = []
+
+        def flaky_allocate(e: commands.Allocate, uow: FakeUnitOfWork):
+            calls.append(e)
+            if len(calls) < 3:
+                raise ConcurrencyConflict("conflict")
+            return "batch1"
+
+        bus = MessageBus(defaultdict(list), uow=uow, conflict_retries=2)
+        bus.register(commands.Allocate, flaky_allocate)
+
+        assert ["batch1"] == bus.handle(commands.Allocate("o1", "LAMP", 10))
+        assert len(calls) == 3
+
+    def test_gives_up_after_max_retries(self, uow: FakeUnitOfWork):
+        from collections import defaultdict
+
+        from fastmsa.core import ConcurrencyConflict
+
+        def always_conflict(e: commands.Allocate, uow: FakeUnitOfWork):
+            raise ConcurrencyConflict("conflict")
+
+        bus = MessageBus(defaultdict(list), uow=uow, conflict_retries=1)
+        bus.register(commands.Allocate, always_conflict)
+
+        with pytest.raises(ConcurrencyConflict):
+            bus.handle(commands.Allocate("o1", "LAMP", 10))
+
+
+class TestLockMode:
+    def test_lock_mode_is_applied_per_command_type(self, uow: FakeUnitOfWork):
+        from collections import defaultdict
+
+        locks = []
+
+        def allocate(e: commands.Allocate, uow: FakeUnitOfWork):
+            locks.append(uow.lock)
+
+        def add_batch(e: commands.CreateBatch, uow: FakeUnitOfWork):
+            locks.append(uow.lock)
+
+        bus = MessageBus(defaultdict(list), uow=uow)
+        bus.register(commands.Allocate, allocate)
+        bus.register(commands.CreateBatch, add_batch)
+        bus.lock_modes[commands.Allocate] = "skip_locked"
+
+        bus.handle(commands.Allocate("o1", "LAMP", 10))
+        bus.handle(commands.CreateBatch("b1", "LAMP", 10))
+
+        assert locks == ["skip_locked", None]
+        assert uow.lock is None
+
+    def test_fake_repository_ignores_lock(self, uow: FakeUnitOfWork):
+        uow[Product].add(Product("LAMP", []))
+        assert uow[Product].get("LAMP", lock="nowait") is not None
+        assert [p.sku for p in uow[Product].get_many(["LAMP", "NONE"])] == ["LAMP"]
@@ -0,0 +1,96 @@
+"""커맨드 멱등성 키 단위 테스트."""
+from collections import defaultdict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastmsa.api import IdempotencyKeyMiddleware
+from fastmsa.core import ConcurrencyConflict
+from fastmsa.event import MessageBus
+from fastmsa.idempotency import MemoryIdempotencyStore, RedisIdempotencyStore
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+class FakeSyncRedis:
+    """``get``, ``set(ex=, nx=)``, ``delete`` 만 제공하는 Redis 클라이언트."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+
+@pytest.fixture
+def bus() -> MessageBus:
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.conflict_retries = 0
+    return bus
+
+
+def allocate(orderid, key=None):
+    cmd = commands.Allocate(orderid, "LAMP", 1)
+    cmd.idempotency_key = key
+    return cmd
+
+
+@pytest.mark.parametrize(
+    "store", [MemoryIdempotencyStore(), RedisIdempotencyStore(FakeSyncRedis())]
+)
+def test_duplicated_command_returns_cached_result(bus: MessageBus, store):
+    calls = []
+
+    def handler(cmd: commands.Allocate):
+        calls.append(cmd.orderid)
+        if cmd.orderid == "fail":
+            raise ValueError(cmd.orderid)
+        return f"batch-{len(calls)}"
+
+    bus.register(commands.Allocate, handler)
+    bus.idempotency = store
+
+    assert bus.handle(allocate("o1", key="k1")) == ["batch-1"]
+    assert bus.handle(allocate("o1", key="k1")) == ["batch-1"]
+    assert bus.handle(allocate("o1")) == ["batch-2"]  # 키가 없으면 매번 실행
+    with pytest.raises(ValueError):
+        bus.handle(allocate("fail", key="k2"))
+    with pytest.raises(ValueError):
+        bus.handle(allocate("fail", key="k2"))  # 실패한 커맨드는 다시 실행
+    assert calls == ["o1", "o1", "fail", "fail"]
+
+    # 실행 중인 키로 들어온 커맨드는 충돌로 처리합니다.
+    store.begin("Allocate:k3", bus.uow)
+    with pytest.raises(ConcurrencyConflict):
+        bus.handle(allocate("o3", key="k3"))
+
+
+def test_idempotency_key_header(bus: MessageBus):
+    calls = []
+    bus.register(commands.Allocate, lambda cmd: calls.append(cmd) or len(calls))
+    bus.idempotency = MemoryIdempotencyStore()
+
+    app = FastAPI()
+    app.add_middleware(IdempotencyKeyMiddleware)
+
+    @app.post("/allocate/{orderid}")
+    def post_allocate(orderid: str):
+        return bus.handle(allocate(orderid)) + bus.handle(allocate(orderid))
+
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "abc"}
+    assert client.post("/allocate/o1", headers=headers).json() == [1, 2]
+    assert client.post("/allocate/o1", headers=headers).json() == [1, 3]
+    assert client.post("/allocate/o1").json() == [4, 5]
+    assert calls[0].idempotency_key == "abc" and calls[1].idempotency_key is None
@@ -0,0 +1,72 @@
+"""임포트 시간 회귀 테스트.
+
+CLI 와 워커 프로세스가 빠르게 시작할 수 있도록, 무거운 의존성이 실제로 필요할
+때까지 임포트되지 않는지 ``python -X importtime`` 으로 확인합니다.
+"""
+import subprocess
+import sys
+
+import pytest
+
+BASELINE_MODULE = "sqlalchemy"
+"""임포트 시간 비교 기준. ``fastmsa.command`` 는 의존성 지연 전에 이 모듈을
+임포트했으므로 지연 전의 임포트 시간은 항상 이보다 길었습니다."""
+
+HEAVY_MODULES = [
+    "aioredis",
+    "fastapi",
+    "jinja2",
+    "pkg_resources",
+    "pydantic",
+    "sqlalchemy",
+    "starlette",
+    "uvicorn",
+]
+
+
+def import_time(module: str) -> int:
+    """새 인터프리터에서 ``module`` 을 임포트하는데 걸린 누적 시간(μs)."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(res.stderr.splitlines()):
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+def loaded_modules(module: str) -> set[str]:
+    res = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {name.split(".")[0] for name in res.stdout.split()}
+
+
+@pytest.mark.parametrize("module", ["fastmsa.command", "fastmsa.event"])
+def test_heavy_dependencies_are_deferred(module: str):
+    assert loaded_modules(module) & set(HEAVY_MODULES) == set()
+
+
+def test_command_import_time_budget():
+    # 머신 속도에 따라 달라지지 않도록 같은 실행에서 잰 기준 모듈과 비교합니다.
+    # 측정 잡음을 줄이기 위해 번갈아 측정하고 가장 빠른 값을 사용합니다.
+    samples = [
+        (import_time("fastmsa.command"), import_time(BASELINE_MODULE))
+        for _ in range(3)
+    ]
+    elapsed, baseline = (min(times) for times in zip(*samples))
+    assert elapsed < baseline / 2, (
+        f"import took {elapsed / 1000:.1f}ms"
+        f" ({BASELINE_MODULE}: {baseline / 1000:.1f}ms)"
+    )
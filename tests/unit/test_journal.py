@@ -0,0 +1,105 @@
+"""메세지 저널 단위 테스트."""
+from collections import defaultdict
+
+from fastmsa.core import Event
+from fastmsa.event import MessageBus
+from fastmsa.journal import (
+    JournalReader,
+    JournalWriter,
+    correlation_id,
+    journal_files,
+    replay,
+)
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands, events
+from tests.app.domain.aggregates import Product
+
+
+def test_write_rotate_and_read(tmp_path):
+    with JournalWriter(tmp_path, max_bytes=200) as journal:
+        cids = [journal.write(commands.Allocate(f"o{i}", "LAMP", i)) for i in range(5)]
+
+    assert len(journal_files(tmp_path)) > 1
+    records = list(JournalReader(tmp_path).messages())
+    assert [r.correlation_id for r, _ in records] == cids
+    assert [m for _, m in records] == [
+        commands.Allocate(f"o{i}", "LAMP", i) for i in range(5)
+    ]
+
+    # 비정상 종료로 잘린 마지막 레코드는 무시합니다.
+    last = journal_files(tmp_path)[-1]
+    last.write_bytes(last.read_bytes()[:-3])
+    assert len(list(JournalReader(tmp_path))) == 4
+
+    # 새로 연 저널은 기존 파일에 이어쓰지 않고 다음 파일로 시작합니다.
+    with JournalWriter(tmp_path) as journal:
+        assert journal.path.name == f"{int(last.stem) + 1:08d}.fmj"
+
+
+def test_writers_sharing_directory_do_not_truncate_each_other(tmp_path):
+    # 운영 환경의 워커 프로세스들처럼 같은 디렉토리에 동시에 기록합니다.
+    first = JournalWriter(tmp_path, max_bytes=200)
+    second = JournalWriter(tmp_path, max_bytes=200)
+    assert first.path != second.path
+
+    with first, second:
+        for i in range(6):
+            first.write(commands.Allocate(f"a{i}", "LAMP", i))
+            second.write(commands.Allocate(f"b{i}", "LAMP", i))
+
+    orders = sorted(m.orderid for _, m in JournalReader(tmp_path).messages())
+    assert orders == sorted([f"a{i}" for i in range(6)] + [f"b{i}" for i in range(6)])
+
+
+def test_bus_journals_external_messages_and_replays(tmp_path):
+    def allocate(cmd: commands.Allocate, uow: FakeUnitOfWork):
+        with uow:
+            product = Product(cmd.sku, [])
+            uow[Product].add(product)
+            product.messages.append(events.Allocated(cmd.orderid, cmd.sku, 1, "b"))
+
+    handled = []
+
+    def make_bus():
+        bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+        bus.register(commands.Allocate, allocate)
+        bus.register(events.Allocated, handled.append)
+        return bus
+
+    bus = make_bus()
+    bus.journal = JournalWriter(tmp_path)
+    token = correlation_id.set("req-1")
+    bus.handle(commands.Allocate("o1", "LAMP", 1))
+    correlation_id.reset(token)
+    bus.handle(commands.Allocate("o2", "LAMP", 1))
+    bus.journal.close()
+
+    # 핸들러가 발생시킨 후속 이벤트는 기록하지 않습니다.
+    records = [(r.correlation_id, m) for r, m in JournalReader(tmp_path).messages()]
+    assert len(records) == 2 and records[0][0] == "req-1"
+    assert all(not isinstance(m, Event) for _, m in records)
+    assert len(handled) == 2
+
+    replayed = make_bus()
+    replayed.journal = JournalWriter(tmp_path / "replayed")
+    stats = replay(JournalReader(tmp_path), replayed.handle)
+    replayed.journal.close()
+
+    assert (stats.messages, stats.errors) == (2, 0)
+    assert len(handled) == 4
+    assert not list(JournalReader(tmp_path / "replayed"))
+
+
+def test_replay_recorded_pacing(tmp_path):
+    with JournalWriter(tmp_path) as journal:
+        for i in range(3):
+            journal.write(commands.Allocate(f"o{i}", "LAMP", 1), timestamp=i * 0.1)
+
+    handled = []
+    stats = replay(JournalReader(tmp_path), handled.append, speed=2.0)
+
+    assert len(handled) == 3
+    assert 0.1 <= stats.elapsed < 0.5
+
+    stats = replay(JournalReader(tmp_path), handled.append, limit=2)
+    assert stats.messages == 2 and stats.elapsed < 0.1
@@ -0,0 +1,277 @@
+"""메세지 버스 실행 정책 단위 테스트."""
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+import pytest
+
+from fastmsa.core import Command
+from fastmsa.event import (
+    BackgroundDrainer,
+    KeyedExecutor,
+    MessageBus,
+    MessageQueue,
+    partition_key_of,
+)
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands, events
+from tests.app.domain.aggregates import Product
+
+
+@pytest.fixture
+def bus(uow: FakeUnitOfWork) -> MessageBus:
+    return MessageBus(defaultdict(list), uow=uow)
+
+
+class TestKeyedExecutor:
+    def test_partition_key_of(self):
+        assert partition_key_of(commands.Allocate("o1", "LAMP", 10)) == "LAMP"
+        assert partition_key_of(commands.ChangeBatchQuantity("b1", 10)) is None
+
+    def test_same_key_runs_in_order_on_one_lane(self, bus: MessageBus):
+        handled = defaultdict(list)
+
+        def allocate(e: commands.Allocate):
+            handled[e.sku].append((e.orderid, threading.current_thread().name))
+            return e.orderid
+
+        bus.register(commands.Allocate, allocate)
+        executor = KeyedExecutor(
+            bus, lanes=4, uow_factory=lambda: FakeUnitOfWork({Product: "sku"})
+        )
+        skus = ["LAMP", "SOFA", "DESK"]
+        futures = [
+            executor.submit(commands.Allocate(f"o{i}", sku, 1))
+            for i in range(20)
+            for sku in skus
+        ]
+        results = [f.result() for f in futures]
+        executor.shutdown()
+
+        assert results == [[f"o{i}"] for i in range(20) for _ in skus]
+        for sku in skus:
+            orderids, threads = zip(*handled[sku])
+            assert list(orderids) == [f"o{i}" for i in range(20)]
+            assert len(set(threads)) == 1
+            assert threads[0].endswith(f"lane-{executor.lane_of(sku)}_0")
+
+    def test_each_lane_uses_its_own_uow(self, bus: MessageBus):
+        uows = []
+
+        def allocate(e: commands.Allocate, uow: FakeUnitOfWork):
+            uows.append(uow)
+
+        bus.register(commands.Allocate, allocate)
+        executor = KeyedExecutor(
+            bus, lanes=2, uow_factory=lambda: FakeUnitOfWork({Product: "sku"})
+        )
+        keys = ["a", "b", "c", "d"]
+        lanes = {executor.lane_of(k) for k in keys}
+        for k in keys:
+            executor.submit(commands.Allocate("o1", k, 1)).result()
+        executor.shutdown()
+
+        assert bus.uow not in uows
+        assert len(set(map(id, uows))) == len(lanes)
+
+    def test_submit_without_executor_runs_inline(self, bus: MessageBus):
+        bus.register(commands.Allocate, lambda e: e.sku)
+        assert bus.submit(commands.Allocate("o1", "LAMP", 1)).result() == ["LAMP"]
+
+
+class TestUowFactory:
+    def test_each_handle_call_gets_its_own_uow(self, bus: MessageBus):
+        uows = defaultdict(list)
+        bound = []
+        barrier = threading.Barrier(4)
+
+        def allocate(e: commands.Allocate, uow: FakeUnitOfWork):
+            uows[e.orderid].append(uow)
+            if e.qty:
+                barrier.wait(timeout=5)  # 모든 스레드가 동시에 처리 중입니다.
+                bound.append(bus.uow is uow)
+                bus.handle(commands.Allocate(e.orderid, "", 0))
+
+        bus.register(commands.Allocate, allocate)
+        legacy = bus.uow
+        bus.uow_factory = lambda: FakeUnitOfWork({Product: "sku"})
+
+        threads = [
+            threading.Thread(target=bus.handle, args=(commands.Allocate(o, "A", 1),))
+            for o in "abcd"
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert bound == [True] * 4
+        assert all(len(set(map(id, u))) == 1 for u in uows.values())  # 같은 호출 공유
+        assert len({id(u[0]) for u in uows.values()}) == 4
+        assert legacy not in [u[0] for u in uows.values()]
+        assert bus.uow is legacy  # 처리가 끝나면 바인딩이 해제됩니다.
+
+        # 이전 방식으로 고정 UoW 를 설정하면 팩토리 대신 사용합니다.
+        bus.uow = legacy
+        assert bus.uow_factory is None
+        bus.handle(commands.Allocate("e", "A", 0))
+        assert uows["e"] == [legacy]
+
+
+@dataclass
+class SetQuantity(Command):
+    coalesce_key = "ref"
+
+    ref: str
+    qty: int
+
+    def merge(self, newer: "SetQuantity") -> "SetQuantity":
+        return newer  # 나중 값이 이전 값을 대체합니다.
+
+
+class TestCoalescing:
+    def test_message_queue_merges_pending_messages(self):
+        queue = MessageQueue(
+            [SetQuantity("b1", 1), SetQuantity("b2", 1), SetQuantity("b1", 3)]
+        )
+        assert [queue.popleft(), queue.popleft()] == [
+            SetQuantity("b1", 3),
+            SetQuantity("b2", 1),
+        ]
+        queue.extend([commands.Allocate("o1", "A", 1), commands.Allocate("o1", "A", 1)])
+        assert queue.popleft() == commands.Allocate("o1", "A", 1) and not queue
+
+        # coalesce_done 이 켜진 타입은 이미 처리된 메세지와 같은 메세지를 버립니다.
+        queue.extend([commands.Allocate("o1", "A", 1), commands.Allocate("o1", "A", 2)])
+        assert len(queue) == 1 and queue.coalesced == 3
+        queue.popleft()
+
+        # 그 외의 타입은 처리 대기 중인 메세지만 합칩니다.
+        queue.append(SetQuantity("b1", 3))
+        assert queue.popleft() == SetQuantity("b1", 3) and queue.coalesced == 3
+
+    def test_reallocation_cascade_is_coalesced(self, bus: MessageBus):
+        allocated = []
+
+        def change_quantity(cmd: commands.ChangeBatchQuantity, uow: FakeUnitOfWork):
+            product = Product(cmd.ref, items=[])
+            for i in range(cmd.qty):
+                product.messages.append(commands.Allocate(f"o{i}", "A", 1))
+                product.messages.append(events.Deallocated(f"o{i}", "A", 1))
+            uow[Product].seen.add(product)
+
+        def reallocate(e: events.Deallocated, uow: FakeUnitOfWork):
+            product = Product(e.sku, items=[])
+            product.messages.append(commands.Allocate(e.orderid, e.sku, e.qty))
+            uow[Product].seen.add(product)
+
+        bus.register(commands.ChangeBatchQuantity, change_quantity)
+        bus.register(events.Deallocated, reallocate)
+        bus.register(commands.Allocate, lambda cmd: allocated.append(cmd.orderid))
+
+        bus.handle(commands.ChangeBatchQuantity("b1", 5))
+        assert allocated == [f"o{i}" for i in range(5)]
+
+
+class TestPriorities:
+    @pytest.fixture
+    def handled(self, bus: MessageBus) -> list:
+        handled = []
+
+        def change_quantity(cmd: commands.ChangeBatchQuantity, uow: FakeUnitOfWork):
+            product = Product(cmd.ref, items=[])
+            product.messages.extend(
+                [
+                    events.OutOfStock("A"),
+                    events.Deallocated("o1", "A", 1),
+                    commands.Allocate("o1", "A", 1),
+                ]
+            )
+            uow[Product].seen.add(product)
+
+        bus.register(commands.ChangeBatchQuantity, change_quantity)
+        bus.register(events.OutOfStock, lambda e: handled.append(type(e).__name__))
+        bus.register(events.Deallocated, lambda e: handled.append(type(e).__name__))
+        bus.register(commands.Allocate, lambda c: handled.append(type(c).__name__))
+        bus.priorities.update({events.OutOfStock: -10, commands.Allocate: 10})
+        return handled
+
+    def test_queue_is_ordered_by_priority(self, bus: MessageBus, handled: list):
+        bus.handle(commands.ChangeBatchQuantity("b1", 1))
+        assert handled == ["Allocate", "Deallocated", "OutOfStock"]
+
+    def test_low_priority_events_are_deferred(self, bus: MessageBus, handled: list):
+        release = threading.Event()
+        bus.handlers[events.OutOfStock].insert(0, lambda e: release.wait(5))
+        bus.drainer = BackgroundDrainer(bus, below=0)
+
+        bus.handle(commands.ChangeBatchQuantity("b1", 1))
+        assert handled == ["Allocate", "Deallocated"] and bus.inflight == 1
+
+        release.set()
+        assert bus.drain(timeout=5)
+        bus.drainer.close()
+        assert handled[-1] == "OutOfStock"
+        assert (bus.drainer.stats.deferred, bus.drainer.stats.processed) == (1, 1)
+
+
+class TestProcessExecutor:
+    def test_handler_runs_in_worker_process(self, bus: MessageBus):
+        handled = []
+
+        def change_quantity(cmd: commands.ChangeBatchQuantity, uow: FakeUnitOfWork):
+            product = Product(cmd.ref, items=[])
+            product.messages.append(events.OutOfStock(cmd.ref))
+            uow[Product].seen.add(product)
+            return os.getpid()
+
+        bus.register(commands.ChangeBatchQuantity, change_quantity)
+        bus.register(events.OutOfStock, lambda e: handled.append((e, os.getpid())))
+        bus.process_commands.add(commands.ChangeBatchQuantity)
+        bus.process_workers = 1
+        try:
+            [pid] = bus.handle(commands.ChangeBatchQuantity("b1", 1))
+            assert bus.handle(commands.ChangeBatchQuantity("b2", 1)) == [pid]
+        finally:
+            bus.process_pool.shutdown()  # type: ignore
+
+        assert pid != os.getpid()
+        # 워커에서 발생한 후속 이벤트는 부모 프로세스에서 처리됩니다.
+        assert handled == [
+            (events.OutOfStock("b1"), os.getpid()),
+            (events.OutOfStock("b2"), os.getpid()),
+        ]
+
+    def test_idempotency_key_is_stored_in_parent(self, bus: MessageBus):
+        from fastmsa.idempotency import MemoryIdempotencyStore
+
+        bus.register(commands.ChangeBatchQuantity, lambda cmd: os.urandom(8).hex())
+        bus.process_commands.add(commands.ChangeBatchQuantity)
+        bus.process_workers = 2
+        bus.idempotency = store = MemoryIdempotencyStore()
+        try:
+            results = []
+            for _ in range(3):
+                cmd = commands.ChangeBatchQuantity("b1", 1)
+                cmd.idempotency_key = "k1"
+                results += bus.handle(cmd)
+        finally:
+            bus.process_pool.shutdown()  # type: ignore
+
+        # 워커마다 복사된 저장소가 아닌 부모 프로세스의 저장소에 기록됩니다.
+        assert results == [results[0]] * 3
+        assert store.get("ChangeBatchQuantity:k1") == results[0]
+
+    def test_errors_are_raised_in_parent(self, bus: MessageBus):
+        def change_quantity(cmd: commands.ChangeBatchQuantity):
+            raise ValueError(cmd.ref)
+
+        bus.register(commands.ChangeBatchQuantity, change_quantity)
+        bus.process_commands.add(commands.ChangeBatchQuantity)
+        bus.process_workers = 1
+        try:
+            with pytest.raises(ValueError, match="b1"):
+                bus.handle(commands.ChangeBatchQuantity("b1", 1))
+        finally:
+            bus.process_pool.shutdown()  # type: ignore
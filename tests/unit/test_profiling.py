@@ -0,0 +1,40 @@
+"""프로파일링 단위 테스트."""
+import time
+
+from fastmsa.profiling import StackSampler, profile
+
+
+def slow_function():
+    time.sleep(0.01)
+
+
+def test_profile_collects_stats_and_stacks(tmp_path):
+    report = profile(slow_function, runs=5, sample_interval=0.001)
+
+    assert report.runs == 5 and report.per_run >= 0.01
+    assert "slow_function" in report.stats_text()
+    assert any("test_profiling.slow_function" in s for s in report.stacks)
+    assert report.allocations is not None
+
+    paths = report.save(tmp_path)
+    assert {p.name for p in paths} == {
+        "profile.pstats",
+        "profile.txt",
+        "stacks.collapsed",
+        "alloc.txt",
+        "sql.json",
+    }
+    line = (tmp_path / "stacks.collapsed").read_text().splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_collapse_orders_frames_outermost_first():
+    import sys
+
+    def inner():
+        return StackSampler.collapse(sys._getframe())
+
+    frames = inner().split(";")
+    assert frames[-1].startswith("tests.unit.test_profiling.inner:")
+    assert "test_collapse_orders_frames_outermost_first" in frames[-2]
@@ -0,0 +1,139 @@
+"""메세지 예약 실행 단위 테스트."""
+import random
+import time
+from collections import defaultdict
+
+import pytest
+
+from fastmsa.event import MessageBus
+from fastmsa.scheduler import MessageScheduler, RedisScheduleStore, TimerWheel
+from fastmsa.test.unit import FakeUnitOfWork
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+class FakeSyncRedis:
+    """sorted set 과 hash 명령만 제공하는 Redis 클라이언트."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = defaultdict(dict)
+        self.hashes: dict[str, dict[str, bytes]] = defaultdict(dict)
+
+    def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    def zrangebyscore(self, key, min, max, start=None, num=None):
+        items = sorted(self.zsets[key].items(), key=lambda it: it[1])
+        found = [k.encode() for k, score in items if score <= max]
+        return found[start : start + num] if num is not None else found
+
+    def zrem(self, key, *members):
+        return sum(1 for m in members if self.zsets[key].pop(m, None) is not None)
+
+    def hset(self, key, field, value):
+        self.hashes[key][field] = value
+
+    def hmget(self, key, fields):
+        return [self.hashes[key].get(f) for f in fields]
+
+    def hdel(self, key, *fields):
+        return sum(1 for f in fields if self.hashes[key].pop(f, None) is not None)
+
+
+@pytest.fixture
+def bus() -> MessageBus:
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.handled = []  # type: ignore
+    bus.register(commands.ChangeBatchQuantity, bus.handled.append)  # type: ignore
+    return bus
+
+
+def test_timer_wheel_expires_each_item_once_on_time():
+    # 작은 휠(2레벨 x 4슬롯 = 16틱)로 하위 레벨 이동과 범위 초과를 확인합니다.
+    wheel = TimerWheel[int](tick=1.0, slots=4, levels=2, start=0.0)
+    rand = random.Random(0)
+    dues = [rand.uniform(0, 100) for _ in range(300)]
+    for i, due in enumerate(dues):
+        wheel.add(due, i)
+
+    fired = {}
+    now = 0.0
+    while now < 110:
+        now += rand.uniform(0.1, 3.0)
+        for i in wheel.advance(now):
+            assert i not in fired
+            fired[i] = now
+
+    assert sorted(fired) == list(range(300))
+    # 만료 시각이 지난 뒤 처음 advance() 할 때 꺼내집니다. (틱 1초, 간격 최대 3초)
+    assert all(dues[i] <= t < dues[i] + 1 + 3.0 for i, t in fired.items())
+    assert len(wheel) == 0
+
+
+def test_schedule_and_cancel(bus: MessageBus):
+    scheduler = bus.scheduler = MessageScheduler(bus)
+    bus.schedule(commands.ChangeBatchQuantity("b1", 1), after=60)
+    timer_id = bus.schedule(commands.ChangeBatchQuantity("b2", 2), after=30)
+    bus.schedule(commands.ChangeBatchQuantity("b3", 3), at=time.time() + 120)
+
+    assert scheduler.cancel(timer_id) and not scheduler.cancel(timer_id)
+    assert scheduler.run_pending() == 0
+    assert scheduler.run_pending(time.time() + 61) == 1
+    assert [c.ref for c in bus.handled] == ["b1"]  # type: ignore
+    assert scheduler.run_pending(time.time() + 121) == 1
+    assert (scheduler.stats.dispatched, scheduler.pending) == (2, 0)
+
+
+def test_default_scheduler_runs_in_background(bus: MessageBus):
+    bus.schedule(commands.ChangeBatchQuantity("b1", 1), after=0.05)
+
+    deadline = time.time() + 5
+    while not bus.handled and time.time() < deadline:  # type: ignore
+        time.sleep(0.01)
+    bus.scheduler.close()  # type: ignore
+    assert [c.ref for c in bus.handled] == ["b1"]  # type: ignore
+
+
+def test_redis_store_dispatches_each_message_once(bus: MessageBus):
+    store = RedisScheduleStore(FakeSyncRedis())
+    first, second = MessageScheduler(bus, store), MessageScheduler(bus, store)
+    for i in range(5):
+        first.schedule(commands.ChangeBatchQuantity(f"b{i}", i), after=10)
+
+    later = time.time() + 11
+    # 다른 프로세스가 예약한 메세지를 먼저 가져가면 예약한 쪽에서는 처리하지 않습니다.
+    assert second.run_pending(later) == 5
+    assert first.run_pending(later) == 0
+    refs = sorted(c.ref for c in bus.handled)  # type: ignore
+    assert refs == [f"b{i}" for i in range(5)]
+
+
+def test_failed_message_is_retried_with_backoff(bus: MessageBus):
+    broken = [True]
+
+    def flaky(cmd: commands.CreateBatch):
+        if broken:
+            raise ValueError("temporary failure")
+        bus.handled.append(cmd)  # type: ignore
+
+    bus.register(commands.CreateBatch, flaky)
+    store = RedisScheduleStore(FakeSyncRedis())
+    scheduler = MessageScheduler(bus, store, retry_delay=10, max_retries=2)
+    scheduler.schedule(commands.CreateBatch("b1", "LAMP", 1), after=1)
+    scheduler.schedule(commands.ChangeBatchQuantity("b2", 2), after=1)
+
+    now = time.time() + 2
+    assert scheduler.run_pending(now) == 2
+    # 처리한 예약만 지우고 실패한 예약은 다시 예약합니다.
+    assert [c.ref for c in bus.handled] == ["b2"]  # type: ignore
+    assert scheduler.pending == 1 and len(store.client.zsets[store.timers_key]) == 1
+
+    assert scheduler.run_pending(now + 9) == 0
+    assert scheduler.run_pending(now + 10) == 1
+    # 다시 실패하면 두 배 간격 뒤에 처리합니다.
+    broken.clear()
+    assert scheduler.run_pending(now + 29) == 0
+    assert scheduler.run_pending(now + 30) == 1
+    assert [c.ref for c in bus.handled] == ["b2", "b1"]  # type: ignore
+    assert (scheduler.stats.failed, scheduler.stats.retried) == (2, 2)
+    assert scheduler.pending == 0 and not store.client.zsets[store.timers_key]
@@ -0,0 +1,34 @@
+"""메세지 직렬화 단위 테스트."""
+import json
+from datetime import datetime
+
+import pytest
+
+from fastmsa import serialize
+from fastmsa.core import FastMSAError
+from tests.app.domain import commands, events
+
+
+def test_message_roundtrip_with_datetime():
+    cmd = commands.CreateBatch("b1", "LAMP", 10, eta=datetime(2021, 5, 1, 12, 30))
+
+    text = serialize.dumps(cmd)
+
+    assert json.loads(text)["type"] == "tests.app.domain.commands:CreateBatch"
+    assert serialize.loads(text) == cmd
+
+
+def test_resolve_type_by_name():
+    candidates = [commands.Allocate, events.Allocated]
+    assert serialize.resolve_type("Allocate", candidates) is commands.Allocate
+    with pytest.raises(FastMSAError):
+        serialize.resolve_type("Unknown", candidates)
+
+
+def test_load_messages_supports_list_and_json_lines():
+    msgs = [commands.Allocate("o1", "LAMP", 1), commands.Allocate("o2", "LAMP", 2)]
+    as_list = json.dumps([serialize.to_dict(m) for m in msgs])
+    as_lines = "\n".join(serialize.dumps(m) for m in msgs)
+
+    assert serialize.load_messages(as_list) == msgs
+    assert serialize.load_messages(as_lines) == msgs
@@ -0,0 +1,128 @@
+"""외부 메세지 브로커 워커 단위 테스트."""
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+
+from fastmsa.event import MessageBus
+from fastmsa.redis import AsyncRedisClient, RedisConnectInfo
+from fastmsa.test.e2e import FakeRedisClient
+from fastmsa.test.unit import FakeUnitOfWork
+from fastmsa.worker import BrokerWorker
+from tests.app.domain import commands
+from tests.app.domain.aggregates import Product
+
+
+class FakeChannel:
+    """``aioredis.Channel`` 처럼 메세지를 돌려주는 채널. ``None`` 을 넣으면 닫힙니다."""
+
+    def __init__(self, name: str, messages=()):
+        self.name = name.encode()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        for msg in messages:
+            self.put(msg)
+
+    def put(self, msg):
+        self.queue.put_nowait(msg if msg is None else json.dumps(msg))
+
+    async def iter(self, *, encoding=None):
+        while (msg := await self.queue.get()) is not None:
+            yield msg
+
+
+@pytest.mark.asyncio
+async def test_worker_consumes_concurrently_with_uow_per_thread():
+    running, max_running = 0, 0
+    lock = threading.Lock()
+    uows = set()
+
+    def allocate(e: commands.Allocate, uow: FakeUnitOfWork):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        uows.add(id(uow))
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    bus = MessageBus(defaultdict(list), uow=FakeUnitOfWork({Product: "sku"}))
+    bus.register(commands.Allocate, allocate)
+
+    def on_allocate(client, data):
+        bus.handle(commands.Allocate(**data))
+
+    worker = BrokerWorker(
+        FakeRedisClient(),
+        {"Allocate": on_allocate},
+        concurrency=4,
+        uow_factory=lambda: FakeUnitOfWork({Product: "sku"}),
+        report_interval=0,
+    )
+    messages = [dict(orderid=f"o{i}", sku="LAMP", qty=1) for i in range(8)]
+    channel = FakeChannel("Allocate", [*messages, None])
+
+    stats = await worker.consume([channel])
+
+    assert stats.consumed == 8 and stats.failed == 0
+    assert max_running == 4
+    assert id(bus.uow) not in uows
+    assert len(uows) <= 4
+
+
+@pytest.mark.asyncio
+async def test_worker_counts_failures_and_drains_on_stop():
+    handled = []
+
+    async def on_message(client, data):
+        await asyncio.sleep(0.05)
+        if data["fail"]:
+            raise ValueError("boom")
+        handled.append(data)
+
+    worker = BrokerWorker(
+        FakeRedisClient(), {"ch": on_message}, concurrency=2, report_interval=0
+    )
+    channel = FakeChannel("ch", [{"fail": False}, {"fail": True}])
+    consuming = asyncio.create_task(worker.consume([channel]))
+    await asyncio.sleep(0.01)
+
+    worker.stop()  # 채널이 닫히지 않았어도 처리 중인 메세지는 마저 처리합니다.
+    stats = await consuming
+
+    assert handled == [{"fail": False}]
+    assert stats.consumed == 1 and stats.failed == 1
+
+
+class FakeRedisPool:
+    """메세지를 발행한 이벤트 루프를 기록하는 aioredis 풀."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, data):
+        self.published.append((channel, json.loads(data), asyncio.get_running_loop()))
+
+
+@pytest.mark.asyncio
+async def test_sync_handler_publishes_on_pool_loop():
+    client = AsyncRedisClient(RedisConnectInfo("localhost", 6379))
+    # 워커 루프에서 구독하면서 만들어진 풀을 흉내냅니다.
+    client.redis, client.loop = FakeRedisPool(), asyncio.get_running_loop()
+
+    def on_allocate(client, data):
+        assert threading.current_thread() is not threading.main_thread()
+        client.publish_message_sync("Allocated", data)
+
+    worker = BrokerWorker(client, {"Allocate": on_allocate}, report_interval=0)
+    channel = FakeChannel("Allocate", [{"orderid": "o1"}, None])
+
+    stats = await worker.consume([channel])
+
+    assert stats.consumed == 1 and stats.failed == 0
+    assert client.redis.published == [
+        ("Allocated", {"orderid": "o1"}, asyncio.get_running_loop())
+    ]